@@ -8,9 +8,11 @@ Para usar este script:
 
 import csv
 from decimal import Decimal
+from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from ThreePhaseCoils.models import MotorConfiguration  # AJUSTE O NOME DO SEU APP AQUI
+from ThreePhaseDiagram.harmonicos import harmonicos_do_catalogo
 
 
 class Command(BaseCommand):
@@ -27,6 +29,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Limpa todos os dados existentes antes de importar'
         )
+        parser.add_argument(
+            '--sem-diagramas',
+            action='store_true',
+            help='Não pré-renderiza os diagramas após a importação'
+        )
 
     def handle(self, *args, **options):
         csv_file = options['csv_file']
@@ -94,6 +101,25 @@ class Command(BaseCommand):
             raise CommandError(f'Arquivo não encontrado: {csv_file}')
         except Exception as e:
             raise CommandError(f'Erro ao importar: {e}')
+        
+        # Recalcular a análise harmônica do catálogo (cache por versão do catálogo)
+        try:
+            self.stdout.write(
+                self.style.SUCCESS(f'✓ Análise harmônica: {len(harmonicos_do_catalogo())} configurações')
+            )
+        except Exception as e:
+            self.stdout.write(
+                self.style.WARNING(f'Análise harmônica não recalculada: {e}')
+            )
+        
+        # Pré-renderizar os diagramas do catálogo importado
+        if not options['sem_diagramas']:
+            try:
+                call_command('pre_renderizar_diagramas', stdout=self.stdout, stderr=self.stderr)
+            except Exception as e:
+                self.stdout.write(
+                    self.style.WARNING(f'Diagramas não pré-renderizados: {e}')
+                )
     
     def mostrar_estatisticas(self):
         """Mostra estatísticas sobre os dados importados."""
@@ -1,3 +1,74 @@
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from .models import MotorConfiguration
+from .views import calcular_passo_polar_e_fluxo, obter_potencia_cv_padrao
+
+
+class ProjetoMotorApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        MotorConfiguration.objects.create(
+            S=36, P=4, g_type='g=P', Camada='dupla', q=Decimal('3'), tipo_q='inteiro',
+            n_bob_info='9', y=8, zeta=Decimal('0.9452'), Classificacao_zeta='excelente',
+            Observacao_passo='recomendado',
+        )
+
+    def test_projeto_completo(self):
+        response = self.client.get('/api/projeto/', {'diametro': 110, 'comprimento': 90, 'polos': 4, 'S': 36})
+        self.assertEqual(response.status_code, 200)
+        dados = response.json()
+
+        self.assertEqual(dados['entrada']['rede'], '380/660 V')
+        self.assertEqual(dados['potencia_cv_padrao'], obter_potencia_cv_padrao(dados['potencia']['potencia_cv']))
+        configuracao, = dados['configuracoes']
+        self.assertEqual(configuracao['num_grupos'], 4)
+        self.assertEqual([o['k1'] for o in configuracao['opcoes_construcao']], [1, 2, 4])
+
+        # Espiras por fase: ZF = 50·V·k·k1 / (2,22·Φ·60·ζ), com k = 2 (camada dupla)
+        _, fi = calcular_passo_polar_e_fluxo(110, 90, 4)
+        serie = configuracao['opcoes_construcao'][0]
+        self.assertAlmostEqual(serie['espiras_por_fase'], 50 * 380 * 2 / (2.22 * fi * 60 * 0.9452), places=1)
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get('/api/projeto/', {'diametro': 110}).status_code, 400)
+        resposta = self.client.get('/api/projeto/', {'diametro': 110, 'comprimento': 90, 'polos': 4, 'S': 36, 'V': 127})
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('erro', resposta.json())
+
+    def test_polos_e_frequencia_invalidos(self):
+        base = {'diametro': 110, 'comprimento': 90, 'polos': 4, 'S': 36}
+        for ajuste in ({'polos': 0}, {'polos': -4}, {'polos': 3}, {'frequencia': 0}, {'frequencia': -60}):
+            resposta = self.client.get('/api/projeto/', {**base, **ajuste})
+            self.assertEqual(resposta.status_code, 400, ajuste)
+            self.assertIn('erro', resposta.json())
+
+    def test_sem_configuracoes(self):
+        resposta = self.client.get('/api/projeto/', {'diametro': 110, 'comprimento': 90, 'polos': 4, 'S': 48})
+        self.assertEqual(resposta.status_code, 404)
+
+
+class ImportarMotorConfigTests(TestCase):
+    CSV = (
+        'S,P,g_type,Camada,q,tipo_q,n_bob_info,y,zeta,Classificacao_zeta,Observacao_passo\n'
+        '36,4,g=P,dupla,3,inteiro,9,8,0.9452,excelente,recomendado\n'
+    )
+
+    def test_falha_na_analise_harmonica_nao_interrompe_a_importacao(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8') as arquivo:
+            arquivo.write(self.CSV)
+            arquivo.flush()
+            saida = StringIO()
+            with mock.patch(
+                'ThreePhaseCoils.management.commands.importar_motor_config.harmonicos_do_catalogo',
+                side_effect=RuntimeError('cache indisponível'),
+            ):
+                call_command('importar_motor_config', arquivo.name, sem_diagramas=True, stdout=saida)
+
+        self.assertEqual(MotorConfiguration.objects.count(), 1)
+        self.assertIn('Análise harmônica não recalculada: cache indisponível', saida.getvalue())
@@ -11,4 +11,7 @@ urlpatterns = [
     path('api/g-types/', views.api_get_g_types, name='api_get_g_types'),
     path('api/passos/', views.api_get_passos, name='api_get_passos'),
     path('api/configuracao/', views.api_get_info_configuracao, name='api_get_info_configuracao'),
+    
+    # API de projeto completo (potência → carcaça → bobinagem)
+    path('api/projeto/', views.api_projeto_motor, name='api_projeto_motor'),
 ]
\ No newline at end of file
@@ -1,7 +1,11 @@
+import bisect
+from urllib.parse import urlencode
 from django.shortcuts import render
+from django.urls import reverse
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from ThreePhaseCoils.models import MotorConfiguration
+from ThreePhaseDiagram.ligacoes import gerar_ligacoes
 from .forms import ConfiguracaoMotorForm
 
 # ========================================
@@ -113,6 +117,179 @@ def get_awg_for_area(area_mm2, mode='next_larger'):
     
     return None
 
+
+# ========================================
+# 📐 FUNÇÕES DE DIMENSIONAMENTO DA BOBINAGEM
+# ========================================
+# Tensão de fase → rede de alimentação correspondente
+REDES_POR_TENSAO = {
+    220: '220/380 V',
+    380: '380/660 V',
+    440: '440/760 V',
+}
+
+# Potências padronizadas (CV) ordenadas, derivadas das opções do formulário
+POTENCIAS_CV_PADRAO = sorted(float(valor) for valor, _ in ConfiguracaoMotorForm.POTENCIA_CV_CHOICES)
+
+
+def obter_potencia_cv_padrao(potencia_cv):
+    """
+    Retorna a potência padronizada (CV) mais próxima da potência informada.
+    """
+    indice = bisect.bisect_left(POTENCIAS_CV_PADRAO, potencia_cv)
+    candidatas = POTENCIAS_CV_PADRAO[max(indice - 1, 0):indice + 1]
+    return min(candidatas, key=lambda p: abs(p - potencia_cv))
+
+
+def calcular_passo_polar_e_fluxo(Di_mm, L_mm, P):
+    """
+    Calcula o passo polar (tp, em cm) e o fluxo magnético (Φ, em Wb) do núcleo.
+
+    Depende apenas das dimensões do núcleo e do número de polos, portanto pode
+    ser reaproveitado para todas as configurações de um mesmo motor.
+    """
+    Di = Di_mm / 10  # Converter para cm
+    L = L_mm / 10    # Converter para cm
+    tp = (3.14 * Di) / P
+    fi = (5 * tp * L) / 1000
+    return tp, fi
+
+
+def obter_k1_opcoes(num_grupos):
+    """Retorna as ligações paralelas possíveis (k1) para o número de grupos."""
+    return [1] + [k1 for k1 in (2, 3, 4) if num_grupos % k1 == 0]
+
+
+def calcular_opcoes_construcao(S, P, Camada, g_type, y, zeta, n_bob_info, V, potencia_cv, fi):
+    """
+    Calcula as opções de construção (espiras, fio e ligações) de uma configuração.
+
+    Args:
+        S, P, Camada, g_type, y: Parâmetros da configuração do catálogo
+        zeta (float): Fator de enrolamento da configuração
+        n_bob_info (str): Bobinas por grupo
+        V (int): Tensão de fase
+        potencia_cv (float): Potência nominal em CV
+        fi (float): Fluxo magnético por polo (Wb)
+
+    Returns:
+        dict: {'num_grupos', 'k', 'k1_opcoes', 'resultados_zf', 'opcoes_construcao'}
+    """
+    num_grupos = P if g_type == 'g=P' else P // 2
+    k1_opcoes = obter_k1_opcoes(num_grupos)
+    k = 1 if Camada == 'única' else 2
+
+    # Potência considerada para cálculo da corrente com FP = 0.9 e Rend = 0.9
+    Pot = (potencia_cv / (0.9 * 0.9)) * 736
+    I = Pot / (3 * V)
+    if potencia_cv <= 10:
+        d = 7
+    elif potencia_cv <= 50:
+        d = 5.5
+    else:
+        d = 5
+
+    resultados_zf = {}
+    for k1 in k1_opcoes:
+        ZF = (50 * V * k * k1) / (2.22 * fi * 60 * zeta)
+        Z = round((3 * ZF) / S)
+        A = I / (d * k1)
+        resultados_zf[k1] = {
+            'zf': round(ZF, 2),
+            'z': Z,
+            'corrente': round(I, 2),
+            'densidade': d,
+            'area_fio': round(A, 3),
+            'awg': get_awg_for_area(A, mode='next_larger')
+        }
+
+    g_type_descricao = "fim com fim" if g_type == "g=P" else "fim com início"
+    opcoes_construcao = []
+
+    # Para cada k1 calculado, criar uma opção
+    for idx, k1 in enumerate(k1_opcoes, 1):
+        ZF = resultados_zf[k1]['zf']
+        Z = resultados_zf[k1]['z']
+        awg_completo = resultados_zf[k1]['awg']
+
+        if isinstance(awg_completo, dict):
+            awg_bitola = str(awg_completo.get('awg', awg_completo.get('descricao', '18')))
+        else:
+            # Se for string ou número
+            awg_str = str(awg_completo)
+
+            # Remover informações entre parênteses se existir
+            if '(' in awg_str:
+                awg_bitola = awg_str.split('(')[0]
+            else:
+                awg_bitola = awg_str
+
+            # Remover " AWG" se existir
+            awg_bitola = awg_bitola.replace(' AWG', '').replace('AWG', '').strip()
+
+        # Calcular número de grupos em série e paralelo
+        grupos_serie = num_grupos // k1
+        grupos_paralelo = k1
+
+        # Extrair informação de bobinas por grupo
+        bobinas_por_grupo = n_bob_info
+
+        opcao = {
+            'numero': idx,
+            'k1': k1,
+            'grupos_total': num_grupos,
+            'grupos_serie': grupos_serie,
+            'grupos_paralelo': grupos_paralelo,
+            'bobinas_por_grupo': bobinas_por_grupo,
+            'passo': y,
+            'espiras_por_bobina': Z,
+            'espiras_por_fase': ZF,
+            'fio_awg': awg_bitola,
+            'g_type': g_type,
+            'g_type_descricao': g_type_descricao,
+            'camada': Camada,
+            'descricao': '',
+            'ligacoes': gerar_ligacoes(num_grupos, k1, g_type),
+            'ligacoes_svg_url': '{}?{}'.format(
+                reverse('ligacoes_svg'),
+                urlencode({'num_grupos': num_grupos, 'k1': k1, 'g_type': g_type})
+            ),
+        }
+
+        # Criar descrição personalizada
+        if k1 == 1:
+            opcao['descricao'] = (
+                f"Todos os grupos ligados em série. "
+                f"Realize a bobinagem montando {num_grupos} grupos, "
+                f"cada grupo com {bobinas_por_grupo} bobinas, "
+                f"utilizando passo polar 1:{y+1}. "
+                f"Cada bobina implemente com {Z} espiras "
+                f"com fio {awg_bitola} AWG. "
+                f"Implemente ligação do tipo {g_type_descricao}."
+            )
+        else:
+            opcao['descricao'] = (
+                f"Para cada fase, ligue {grupos_serie} grupos em série "
+                f"e cada conjunto conecte em paralelo ({k1} circuitos paralelos). "
+                f"Realize a bobinagem montando {num_grupos} grupos, "
+                f"cada grupo com {bobinas_por_grupo} bobinas, "
+                f"utilizando passo polar 1:{y+1}. "
+                f"Cada bobina implemente com {Z} espiras "
+                f"com fio {awg_bitola} AWG. "
+                f"Implemente ligação do tipo {g_type_descricao}."
+            )
+
+        opcoes_construcao.append(opcao)
+
+    return {
+        'num_grupos': num_grupos,
+        'k': k,
+        'k1_opcoes': k1_opcoes,
+        'resultados_zf': resultados_zf,
+        'opcoes_construcao': opcoes_construcao,
+    }
+
+
 def calculo_espiras(request):
     if request.method == 'POST':
         form = ConfiguracaoMotorForm(request.POST)
@@ -236,220 +413,77 @@ def calculo_espiras(request):
                 print(f"Comprimento: {L_mm} mm = {L} cm")
                 print("===========================================\n")
                 
-                # 2. Calcular tp (passo polar)
-                tp = (3.14 * Di) / P
+                # 2. Calcular tp (passo polar) e 3. fluxo magnético (fi)
+                tp, fi = calcular_passo_polar_e_fluxo(Di_mm, L_mm, P)
                 print("========== CÁLCULO DO PASSO POLAR (tp) ==========")
                 print(f"Equação: tp = (3.14 × Di) / P")
                 print(f"tp = (3.14 × {Di}) / {P}")
                 print(f"tp = {tp:.4f} cm")
                 print("=================================================\n")
                 
-                # 3. Calcular fluxo magnético (fi)
-                fi = (5 * tp * L) / 1000
                 print("========== CÁLCULO DO FLUXO MAGNÉTICO (Φ) ==========")
                 print(f"Equação: Φ = (5000 × tp × L) / 1000")
                 print(f"Φ = (5 × {tp:.4f} × {L}) / 1000")
                 print(f"Φ = {fi:.4f} Wb (Weber)")
                 print("====================================================\n")
                 
-                # 4. Verificar ligações paralelas possíveis
-                print("========== VERIFICAÇÃO DE LIGAÇÕES PARALELAS ==========")
-                
-                # Calcular número de grupos
-                if g_type == 'g=P':
-                    num_grupos = P
-                    print(f"Tipo de ligação: g=P")
-                else:  # g=P/2
-                    num_grupos = P // 2
-                    print(f"Tipo de ligação: g=P/2")
-                
-                print(f"Número de grupos: {num_grupos}")
-                
-                # Verificar divisibilidade
-                k1_opcoes = [1]  # k1=1 sempre é possível
+                # 4. Identificar tensão para cálculo
+                V = int(form.cleaned_data['V'])
+                rede = REDES_POR_TENSAO[V]
                 
-                if num_grupos % 2 == 0:
-                    k1_opcoes.append(2)
-                    print(f"✓ Divisível por 2: {num_grupos}/2 = {num_grupos//2} (k1=2 possível)")
-                else:
-                    print(f"✗ Não divisível por 2 (k1=2 não possível)")
+                print("========== TENSÃO SELECIONADA ==========")
+                print(f"Rede: {rede}")
+                print(f"Tensão de fase (V) = {V} V")
+                print("========================================\n")
                 
-                if num_grupos % 3 == 0:
-                    k1_opcoes.append(3)
-                    print(f"✓ Divisível por 3: {num_grupos}/3 = {num_grupos//3} (k1=3 possível)")
-                else:
-                    print(f"✗ Não divisível por 3 (k1=3 não possível)")
-
-                if num_grupos % 4 == 0:
-                    k1_opcoes.append(4)
-                    print(f"✓ Divisível por 4: {num_grupos}/4 = {num_grupos//4} (k1=4 possível)")
-                else:
-                    print(f"✗ Não divisível por 4 (k1=4 não possível)")
+                # 5. Ligações paralelas, espiras por fase (ZF), espiras por bobina (Z) e fio
+                zeta_valor = float(config.zeta)
+                Pot_cv = float(form.cleaned_data['potencia_cv'])
+                bobinagem = calcular_opcoes_construcao(
+                    S, P, Camada, g_type, y, zeta_valor, config.n_bob_info, V, Pot_cv, fi
+                )
+                num_grupos = bobinagem['num_grupos']
+                k1_opcoes = bobinagem['k1_opcoes']
+                k = bobinagem['k']
                 
+                print("========== VERIFICAÇÃO DE LIGAÇÕES PARALELAS ==========")
+                print(f"Tipo de ligação: {g_type}")
+                print(f"Número de grupos: {num_grupos}")
+                for divisor in (2, 3, 4):
+                    if divisor in k1_opcoes:
+                        print(f"✓ Divisível por {divisor}: {num_grupos}/{divisor} = {num_grupos//divisor} (k1={divisor} possível)")
+                    else:
+                        print(f"✗ Não divisível por {divisor} (k1={divisor} não possível)")
                 print(f"\nLigações paralelas possíveis (k1): {' ou '.join(map(str, k1_opcoes))}")
                 print("=======================================================\n")
                 
-                # 5. Verificar coeficiente K (camada)
-                if Camada == 'única':
-                    k = 1
-                else:  # dupla
-                    k = 2
-                
                 print("========== COEFICIENTE DE CAMADA (k) ==========")
                 print(f"Tipo de camada: {Camada}")
                 print(f"Coeficiente k = {k}")
                 print("===============================================\n")
                 
-                # 6. Identificar tensão para cálculo
-                tensao_string = form.cleaned_data['V']
-                if tensao_string == '220':
-                    V = 220
-                    rede = "220/380 V"
-                elif tensao_string == '380':
-                    V = 380
-                    rede = "380/660 V"
-                else:  # 440
-                    V = 440
-                    rede = "440/760 V"
-                
-                print("========== TENSÃO SELECIONADA ==========")
-                print(f"Rede: {rede}")
-                print(f"Tensão de fase (V) = {V} V")
-                print("========================================\n")
-                
-                # 7. Calcular número de espiras por fase (ZF) para cada k1
-                zeta_valor = float(config.zeta)
-                
                 print("========== CÁLCULO DE ESPIRAS POR FASE (ZF) ==========")
                 print(f"Equação: ZF = (50 × V × k × k1) / (2.22 × Φ × 60 × ζ)")
                 print(f"Valores: V={V}, k={k}, Φ={fi:.4f}, ζ={zeta_valor}")
                 print()
-                
-                resultados_zf = {}
-                ZF_resultados = {}
-                for k1 in k1_opcoes:
+                for k1, resultado_k1 in bobinagem['resultados_zf'].items():
                     print("======================================================\n")
-                    ZF = (50 * V * k * k1) / (2.22 * fi * 60 * zeta_valor)
-                    ZF_resultados[k1] = ZF
                     print(f"Para k1 = {k1} (ligação paralela {k1}):")
-                    print(f"  ZF = (50 × {V} × {k} × {k1}) / (2.22 × {fi:.4f} × 60 × {zeta_valor})")
-                    print(f"  ZF = {ZF:.2f} espiras por fase")
-                    # 8. Calcular número de espiras por bobina (Z)
-                    print(" Calculo de espiras por bobina:")
-                    print(f"  S = {S:.2f} ranhuras")
-                    print(f"Equação: Z = (3 × ZF) / S")
-                    Z = round((3 * ZF) / S)
-                    print(f"Espíras por bobina = {Z:.2f}")
-                    print()
-                    print(" Potência considerada para calculo da corrente com FP = 0.9 e Rend=0.9:")
-                    Pot_cv = float(form.cleaned_data['potencia_cv'])
-                    Pot = ((Pot_cv)/(0.9*0.9))*736 
-                    print(f"  Potência considerada = {Pot:.2f} whats")
-                    print(" Calculo de corrente de fase:")
-                    I = Pot/(3*V)
-                    print(f"  I = {I:.2f} ampéres")
-                    print(" Calculo da área A do fio considerando I/densidade:")
-                    if Pot_cv <= 10 :
-                        d=7
-                        print(f"  d = {d:.2f} ampéres/mm2")
-                    elif Pot_cv <= 50 :
-                        d=5.5
-                        print(f"  d = {d:.2f} ampéres/mm2")
-                    else:
-                        d=5
-                        print(f"  d = {d:.2f} ampéres/mm2")
-                    A = I/(d*k1)
-                    print(f"  Utilize fio = {A:.3f} mm2")
-                    awg_sugerido = get_awg_for_area(A, mode='next_larger')
+                    print(f"  ZF = {resultado_k1['zf']:.2f} espiras por fase")
+                    print(f"  Espíras por bobina (Z = 3 × ZF / S) = {resultado_k1['z']}")
+                    print(f"  I = {resultado_k1['corrente']:.2f} ampéres (FP = 0.9 e Rend = 0.9)")
+                    print(f"  d = {resultado_k1['densidade']:.2f} ampéres/mm2")
+                    print(f"  Utilize fio = {resultado_k1['area_fio']:.3f} mm2")
+                    awg_sugerido = resultado_k1['awg']
                     if awg_sugerido:
                         print(f"  Sugestão: {awg_sugerido['descricao']} (área: {awg_sugerido['area_mm2']:.3f} mm²)")
                     else:
-                        print(f"  Área {A:.3f} mm² fora da faixa. Consulte tabela manual.")
+                        print(f"  Área {resultado_k1['area_fio']:.3f} mm² fora da faixa. Consulte tabela manual.")
                     print()
-
-                    # Armazenar resultado
-                    resultados_zf[k1] = {
-                        'zf': round(ZF, 2),
-                        'z': Z,
-                        'awg': awg_sugerido
-                    }
                 
                 print("======================================================\n")
                 
-                g_type_descricao = "fim com fim" if g_type == "g=P" else "fim com início"
-                # Estruturar opções de construção
-                opcoes_construcao = []
-
-                # Para cada k1 calculado, criar uma opção
-                for idx, k1 in enumerate(k1_opcoes, 1):
-                    # Buscar os dados calculados para este k1
-                    ZF = resultados_zf[k1]['zf']
-                    Z = resultados_zf[k1]['z']
-                    awg_completo = resultados_zf[k1]['awg']
-                    
-                    if isinstance(awg_completo, dict):
-                        awg_bitola = str(awg_completo.get('awg', awg_completo.get('descricao', '18')))
-                    else:
-                        # Se for string ou número
-                        awg_str = str(awg_completo)
-                        
-                        # Remover informações entre parênteses se existir
-                        if '(' in awg_str:
-                            awg_bitola = awg_str.split('(')[0]
-                        else:
-                            awg_bitola = awg_str
-                        
-                        # Remover " AWG" se existir
-                        awg_bitola = awg_bitola.replace(' AWG', '').replace('AWG', '').strip()
-                    
-                    # Calcular número de grupos em série e paralelo
-                    grupos_serie = num_grupos // k1
-                    grupos_paralelo = k1
-                    
-                    # Extrair informação de bobinas por grupo
-                    bobinas_por_grupo = config.n_bob_info
-                    
-                    opcao = {
-                        'numero': idx,
-                        'k1': k1,
-                        'grupos_total': num_grupos,
-                        'grupos_serie': grupos_serie,
-                        'grupos_paralelo': grupos_paralelo,
-                        'bobinas_por_grupo': bobinas_por_grupo,
-                        'passo': y,
-                        'espiras_por_bobina': Z,
-                        'espiras_por_fase': ZF,
-                        'fio_awg': awg_bitola,
-                        'g_type': g_type,
-                        'g_type_descricao': g_type_descricao,
-                        'camada': Camada,
-                        'descricao': ''
-                    }
-                    
-                    # Criar descrição personalizada
-                    if k1 == 1:
-                        opcao['descricao'] = (
-                            f"Todos os grupos ligados em série. "
-                            f"Realize a bobinagem montando {num_grupos} grupos, "
-                            f"cada grupo com {bobinas_por_grupo} bobinas, "
-                            f"utilizando passo polar 1:{y+1}. "
-                            f"Cada bobina implemente com {Z} espiras "
-                            f"com fio {awg_bitola} AWG. "
-                            f"Implemente ligação do tipo {g_type_descricao}."
-                        )
-                    else:
-                        opcao['descricao'] = (
-                            f"Para cada fase, ligue {grupos_serie} grupos em série "
-                            f"e cada conjunto conecte em paralelo ({k1} circuitos paralelos). "
-                            f"Realize a bobinagem montando {num_grupos} grupos, "
-                            f"cada grupo com {bobinas_por_grupo} bobinas, "
-                            f"utilizando passo polar 1:{y+1}. "
-                            f"Cada bobina implemente com {Z} espiras "
-                            f"com fio {awg_bitola} AWG. "
-                            f"Implemente ligação do tipo {g_type_descricao}."
-                        )
-                    
-                    opcoes_construcao.append(opcao)
+                opcoes_construcao = bobinagem['opcoes_construcao']
 
                 # ========================================
                 # 📊 PREPARAR CONTEXTO COMPLETO
@@ -657,8 +691,11 @@ def api_get_passos(request):
         - g_type (str): Tipo de g
         
     Retorna:
-        JSON com lista de passos, zeta e número de bobinas
+        JSON com lista de passos, zeta, fatores de enrolamento harmônicos e número de bobinas
     """
+    # Importar aqui para evitar circular imports
+    from ThreePhaseDiagram.harmonicos import harmonicos_do_catalogo
+    
     S = request.GET.get('S')
     P = request.GET.get('P')
     Camada = request.GET.get('Camada')
@@ -687,12 +724,16 @@ def api_get_passos(request):
             }, status=404)
         
         # Montar lista de passos
+        harmonicos = harmonicos_do_catalogo()
         passos = []
         for config in configs:
+            analise = harmonicos.get((config.S, config.P, config.Camada, config.g_type, config.y), {})
             passos.append({
                 'value': config.y,
                 'label': f'Passo {config.y} (ζ={config.zeta})',
                 'zeta': float(config.zeta),
+                'fatores_harmonicos': analise.get('fatores_harmonicos'),
+                'distorcao_fmm': analise.get('distorcao_fmm'),
                 'n_bobinas': config.n_bob_info,
                 'classificacao': config.Classificacao_zeta,
                 'recomendado': config.Observacao_passo == 'recomendado'
@@ -762,4 +803,114 @@ def api_get_info_configuracao(request):
             'erro': 'Configuração não encontrada'
         }, status=404)
     except Exception as e:
-        return JsonResponse({'erro': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'erro': str(e)}, status=500)
+
+@require_http_methods(["GET"])
+def api_projeto_motor(request):
+    """
+    API que encadeia o projeto completo do motor em uma única chamada:
+    estimativa de potência → avaliação de carcaça → potência padronizada (CV)
+    → bobinagem de todas as configurações do catálogo para o S e P informados.
+    
+    Parâmetros:
+        - diametro (float): Diâmetro do núcleo em mm
+        - comprimento (float): Comprimento do núcleo em mm
+        - polos (int): Número de polos
+        - S (int): Número de ranhuras
+        - frequencia (int, opcional): Frequência da rede (padrão: 60)
+        - V (int, opcional): Tensão de fase (padrão: 380)
+        
+    Retorna:
+        JSON com a potência estimada, a carcaça sugerida e as opções de
+        construção de cada configuração
+    """
+    from ThreePhasePower.views import calcular_potencia_motor
+    
+    diametro = request.GET.get('diametro')
+    comprimento = request.GET.get('comprimento')
+    polos = request.GET.get('polos')
+    S = request.GET.get('S')
+    frequencia = request.GET.get('frequencia', 60)
+    V = request.GET.get('V', 380)
+    
+    if not all([diametro, comprimento, polos, S]):
+        return JsonResponse({
+            'erro': 'Parâmetros diametro, comprimento, polos e S obrigatórios'
+        }, status=400)
+    
+    try:
+        diametro = float(diametro)
+        comprimento = float(comprimento)
+        polos = int(polos)
+        S = int(S)
+        frequencia = int(frequencia)
+        V = int(V)
+    except ValueError:
+        return JsonResponse({'erro': 'Parâmetros numéricos inválidos'}, status=400)
+    
+    if diametro <= 0 or comprimento <= 0:
+        return JsonResponse({'erro': 'Diâmetro e comprimento devem ser positivos'}, status=400)
+    
+    if polos <= 0 or polos % 2 or frequencia <= 0:
+        return JsonResponse({
+            'erro': 'Polos deve ser um inteiro par positivo e frequência deve ser positiva'
+        }, status=400)
+    
+    if V not in REDES_POR_TENSAO:
+        return JsonResponse({'erro': f'Tensão inválida: {V}'}, status=400)
+    
+    try:
+        # 1. Estimativa de potência e avaliação de carcaça
+        potencia = calcular_potencia_motor(diametro, comprimento, polos, frequencia)
+        potencia_cv_padrao = obter_potencia_cv_padrao(potencia['potencia_cv'])
+        
+        # 2. Grandezas comuns a todas as configurações (calculadas uma única vez)
+        tp, fi = calcular_passo_polar_e_fluxo(diametro, comprimento, polos)
+        
+        # 3. Bobinagem para cada configuração do catálogo
+        configs = MotorConfiguration.objects.filter(S=S, P=polos)
+        
+        configuracoes = []
+        for config in configs:
+            zeta = float(config.zeta)
+            bobinagem = calcular_opcoes_construcao(
+                config.S, config.P, config.Camada, config.g_type, config.y,
+                zeta, config.n_bob_info, V, potencia_cv_padrao, fi
+            )
+            configuracoes.append({
+                'Camada': config.Camada,
+                'g_type': config.g_type,
+                'y': config.y,
+                'zeta': zeta,
+                'n_bobinas': config.n_bob_info,
+                'classificacao': config.Classificacao_zeta,
+                'recomendado': config.is_recomendado(),
+                'num_grupos': bobinagem['num_grupos'],
+                'opcoes_construcao': bobinagem['opcoes_construcao'],
+            })
+        
+        if not configuracoes:
+            return JsonResponse({
+                'erro': f'Nenhuma configuração encontrada para S={S} e P={polos}'
+            }, status=404)
+        
+        return JsonResponse({
+            'entrada': {
+                'diametro_mm': diametro,
+                'comprimento_mm': comprimento,
+                'polos': polos,
+                'S': S,
+                'frequencia': frequencia,
+                'V': V,
+                'rede': REDES_POR_TENSAO[V],
+            },
+            'potencia': potencia,
+            'potencia_cv_padrao': potencia_cv_padrao,
+            'calculos': {
+                'tp': round(tp, 4),
+                'fluxo': round(fi, 4),
+            },
+            'configuracoes': configuracoes,
+        })
+    except Exception as e:
+        return JsonResponse({'erro': str(e)}, status=500)
@@ -0,0 +1,91 @@
+"""
+Cache em disco dos diagramas SVG, endereçado pelo conteúdo da configuração.
+
+A chave é o SHA-256 de (versão do renderizador, S, P, Camada, g_type, y), então
+um mesmo diagrama é gerado uma única vez e alterações no renderizador invalidam
+automaticamente as entradas antigas.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+from .distribuicao import calcular_distribuicao
+from .renderizacao import VERSAO_RENDERIZADOR, renderizar_svg
+
+
+def _diretorio_cache():
+    return Path(getattr(settings, 'DIAGRAMA_CACHE_DIR', Path(settings.MEDIA_ROOT) / 'diagramas'))
+
+
+def chave_diagrama(S, P, Camada, g_type, y):
+    """Retorna a chave (hex) do diagrama de uma configuração."""
+    conteudo = f'{VERSAO_RENDERIZADOR}|{S}|{P}|{Camada}|{g_type}|{y}'
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+def caminho_diagrama(chave):
+    """Caminho do arquivo em cache; subdiretório pelos dois primeiros caracteres."""
+    return _diretorio_cache() / chave[:2] / f'{chave}.svg'
+
+
+def ler_diagrama_em_cache(chave):
+    """Retorna o SVG (bytes) em cache ou None."""
+    try:
+        return caminho_diagrama(chave).read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def gravar_diagrama(chave, svg):
+    """Grava o SVG (bytes) no cache sob a chave dada."""
+    _gravar_atomicamente(caminho_diagrama(chave), svg)
+
+
+def gerar_svg(S, P, Camada, g_type, y):
+    """Gera o SVG (bytes) de uma configuração, sem consultar nem gravar o cache."""
+    return renderizar_svg(calcular_distribuicao(S, P, Camada, g_type, y)).encode('utf-8')
+
+
+def gerar_para_cache(parametros):
+    """
+    Gera o SVG de uma configuração (S, P, Camada, g_type, y) para pré-renderização.
+
+    Não acessa o banco nem as configurações do Django, podendo rodar em outro
+    processo. Retorna (chave, svg_bytes, erro); em caso de falha svg é None.
+    """
+    chave = chave_diagrama(*parametros)
+    try:
+        return chave, gerar_svg(*parametros), None
+    except ValueError as e:
+        return chave, None, str(e)
+
+
+def _gravar_atomicamente(caminho, conteudo):
+    # Grava em arquivo temporário no mesmo diretório e renomeia, para que
+    # leituras concorrentes nunca vejam um SVG incompleto
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=caminho.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def obter_diagrama_svg(S, P, Camada, g_type, y):
+    """
+    Retorna (chave, svg_bytes) do diagrama, gerando e gravando em cache se necessário.
+    A configuração não é validada aqui; cabe ao chamador garantir que existe no catálogo.
+    """
+    chave = chave_diagrama(S, P, Camada, g_type, y)
+    svg = ler_diagrama_em_cache(chave)
+    if svg is None:
+        svg = gerar_svg(S, P, Camada, g_type, y)
+        gravar_diagrama(chave, svg)
+    return chave, svg
@@ -0,0 +1,172 @@
+"""
+Formato compacto e versionado da distribuição de bobinas, para renderização no navegador.
+
+Em vez do SVG completo, o cliente recebe a distribuição em poucos bytes:
+
+- 'ranhuras': lado superior de cada ranhura como código 0–5 (índice em
+  FAIXAS_DE_FASE), codificado em sequências (código << 5 | repetições - 1);
+- 'bobinas' (só camada única): pares (avanço da ranhura de ida, passo) por
+  bobina; em camada dupla cada ranhura inicia uma bobina de passo y e o lado
+  inferior é deduzido do superior;
+- 'grupos': pares (número do grupo, quantidade de bobinas consecutivas) na
+  ordem das bobinas.
+
+Os campos binários são enviados em base64. decodificar_layout reconstrói a
+mesma distribuição de calcular_distribuicao.
+"""
+import base64
+import json
+from functools import lru_cache
+
+from .distribuicao import FAIXAS_DE_FASE, calcular_distribuicao
+
+# Incrementar sempre que o formato mudar
+VERSAO_FORMATO = 1
+
+# Repetições máximas por byte de sequência (5 bits)
+MAX_REPETICOES = 32
+
+
+def _b64(dados):
+    return base64.b64encode(bytes(dados)).decode('ascii')
+
+
+def _de_b64(texto):
+    return list(base64.b64decode(texto)) if texto else []
+
+
+def _codificar_sequencias(codigos):
+    """Codifica a sequência de códigos 0–5 em bytes (código << 5 | repetições - 1)."""
+    saida = []
+    i = 0
+    while i < len(codigos):
+        repeticoes = 1
+        while (i + repeticoes < len(codigos) and codigos[i + repeticoes] == codigos[i]
+               and repeticoes < MAX_REPETICOES):
+            repeticoes += 1
+        saida.append(codigos[i] << 5 | (repeticoes - 1))
+        i += repeticoes
+    return saida
+
+
+def _decodificar_sequencias(dados):
+    codigos = []
+    for byte in dados:
+        codigos.extend([byte >> 5] * ((byte & 0x1F) + 1))
+    return codigos
+
+
+def _codificar_grupos(distribuicao):
+    """Pares (grupo, repetições) do grupo de cada bobina, na ordem das bobinas."""
+    grupo_da_bobina = {}
+    for grupo in distribuicao['grupos']:
+        for numero in grupo['bobinas']:
+            grupo_da_bobina[numero] = grupo['numero']
+
+    saida = []
+    for bobina in distribuicao['bobinas']:
+        grupo = grupo_da_bobina[bobina['numero']]
+        if saida and saida[-2] == grupo and saida[-1] < 255:
+            saida[-1] += 1
+        else:
+            saida.extend([grupo, 1])
+    return saida
+
+
+@lru_cache(maxsize=1024)
+def codificar_layout(S, P, Camada, g_type, y):
+    """
+    Gera o layout compacto (JSON em bytes) de uma configuração.
+
+    Returns:
+        bytes: Documento JSON {'v', 'S', 'P', 'Camada', 'g_type', 'y', 'simetrica',
+               'ranhuras', 'bobinas', 'grupos'}
+    """
+    distribuicao = calcular_distribuicao(S, P, Camada, g_type, y)
+    codigos = [
+        FAIXAS_DE_FASE.index((r['superior']['fase'], r['superior']['polaridade']))
+        for r in distribuicao['ranhuras']
+    ]
+
+    bobinas = []
+    if Camada != 'dupla':
+        anterior = 0
+        for bobina in distribuicao['bobinas']:
+            bobinas.extend([bobina['ida'] - anterior, bobina['passo']])
+            anterior = bobina['ida']
+
+    layout = {
+        'v': VERSAO_FORMATO,
+        'S': S,
+        'P': P,
+        'Camada': Camada,
+        'g_type': g_type,
+        'y': y,
+        'simetrica': distribuicao['simetrica'],
+        'ranhuras': _b64(_codificar_sequencias(codigos)),
+        'bobinas': _b64(bobinas),
+        'grupos': _b64(_codificar_grupos(distribuicao)),
+    }
+    return json.dumps(layout, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def decodificar_layout(conteudo):
+    """
+    Reconstrói ranhuras, bobinas e grupos a partir do layout compacto.
+
+    Returns:
+        dict: Mesmas chaves 'ranhuras', 'bobinas' e 'grupos' de calcular_distribuicao
+        (sem ângulos nem fasores); 'grupos' é {número: bobinas}, com as bobinas
+        em ordem numérica (o formato guarda só o grupo de cada bobina, não a
+        ordem de um grupo que atravessa a ranhura S → 1)
+    """
+    layout = json.loads(conteudo)
+    S, y = layout['S'], layout['y']
+    dupla = layout['Camada'] == 'dupla'
+    lados = [FAIXAS_DE_FASE[c] for c in _decodificar_sequencias(_de_b64(layout['ranhuras']))]
+
+    if dupla:
+        pares_bobinas = [(k, (k + y) % S) for k in range(S)]
+    else:
+        dados, pares_bobinas, ida = _de_b64(layout['bobinas']), [], 0
+        for avanco, passo in zip(dados[::2], dados[1::2]):
+            ida += avanco
+            pares_bobinas.append((ida - 1, (ida - 1 + passo) % S))
+
+    bobinas = [
+        {
+            'numero': numero,
+            'fase': lados[ida][0],
+            'polaridade': lados[ida][1],
+            'ida': ida + 1,
+            'retorno': retorno + 1,
+            'passo': (retorno - ida) % S,
+        }
+        for numero, (ida, retorno) in enumerate(pares_bobinas, 1)
+    ]
+
+    inferiores = [None] * S
+    if dupla:
+        for bobina in bobinas:
+            inferiores[bobina['retorno'] - 1] = {'fase': bobina['fase'], 'polaridade': -bobina['polaridade']}
+    ranhuras = [
+        {
+            'ranhura': k + 1,
+            'superior': {'fase': lados[k][0], 'polaridade': lados[k][1]},
+            'inferior': inferiores[k],
+        }
+        for k in range(S)
+    ]
+
+    grupos = {}
+    dados = _de_b64(layout['grupos'])
+    numero_bobina = 1
+    for grupo, repeticoes in zip(dados[::2], dados[1::2]):
+        grupos.setdefault(grupo, []).extend(range(numero_bobina, numero_bobina + repeticoes))
+        numero_bobina += repeticoes
+
+    return {
+        'ranhuras': ranhuras,
+        'bobinas': bobinas,
+        'grupos': {numero: bobinas_grupo for numero, bobinas_grupo in sorted(grupos.items())},
+    }
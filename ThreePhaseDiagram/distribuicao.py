@@ -0,0 +1,300 @@
+"""
+Distribuição das bobinas nas ranhuras (estrela de ranhuras) para enrolamentos trifásicos.
+
+Para uma configuração do catálogo (S, P, Camada, g_type, y) calcula, ranhura a
+ranhura, a fase e a polaridade de cada lado de bobina, as bobinas (ranhura de
+ida e de retorno), os grupos de bobinas e a soma fasorial de cada fase.
+
+A tabela é a base comum do diagrama, da análise de harmônicos e da folha de
+ligações, por isso o resultado é memorizado por configuração.
+"""
+import cmath
+import math
+from functools import lru_cache
+
+# Sequência das faixas de 60° elétricos: (fase, polaridade)
+FAIXAS_DE_FASE = [('A', 1), ('C', -1), ('B', 1), ('A', -1), ('C', 1), ('B', -1)]
+FASES = ('A', 'B', 'C')
+
+# Diferença máxima aceita entre o zeta do catálogo e o fator calculado
+TOLERANCIA_ZETA = 0.005
+
+
+def _indices_angulares(S, P):
+    """Ângulo elétrico de cada ranhura em unidades inteiras de 360°/S."""
+    pares = P // 2
+    return [(k * pares) % S for k in range(S)]
+
+
+@lru_cache(maxsize=None)
+def _fasores_unitarios(S):
+    """Tabela das S raízes da unidade: fasor de cada índice angular."""
+    return tuple(cmath.exp(2j * math.pi * i / S) for i in range(S))
+
+
+def _faixas_por_angulo(indices, S):
+    """Atribui cada ranhura à faixa de 60° que contém o seu ângulo elétrico."""
+    # A faixa é obtida do índice inteiro, sem arredondamento de ponto flutuante
+    return [i * 6 // S for i in indices]
+
+
+def _faixas_por_ordem(indices, S):
+    """
+    Atribui as ranhuras às faixas em blocos de tamanho igual, na ordem do ângulo
+    elétrico. Usado quando S/(3·mdc(S, P/2)) não é inteiro e a divisão por
+    ângulo deixaria as fases com números diferentes de ranhuras.
+    """
+    ordem = sorted(range(S), key=lambda k: (indices[k], k))
+    faixas = [0] * S
+    inicio = 0
+    for faixa in range(6):
+        fim = (S * (faixa + 1)) // 6
+        for k in ordem[inicio:fim]:
+            faixas[k] = faixa
+        inicio = fim
+    return faixas
+
+
+def _equilibrada(faixas):
+    contagem = [0, 0, 0]
+    for faixa in faixas:
+        contagem[faixa % 3] += 1
+    return contagem[0] == contagem[1] == contagem[2]
+
+
+def _segundas_metades(faixas, S):
+    """Retorna as ranhuras da segunda metade de cada faixa contígua (sequência circular)."""
+    inicio = next((k for k in range(S) if faixas[k] != faixas[k - 1]), 0)
+    faixas_contiguas = []
+    for j in range(S):
+        k = (inicio + j) % S
+        if not faixas_contiguas or faixas[k] != faixas[(k - 1) % S]:
+            faixas_contiguas.append([])
+        faixas_contiguas[-1].append(k)
+    return sorted(k for ranhuras in faixas_contiguas for k in ranhuras[len(ranhuras) // 2:])
+
+
+def _ranhura_de_retorno(k, fase, polaridade, y, S, lados, livres):
+    """Escolhe a ranhura livre de mesma fase e polaridade oposta com avanço mais próximo de y."""
+    candidatas = [
+        d for d in range(1, S)
+        if (k + d) % S in livres and lados[(k + d) % S] == (fase, -polaridade)
+    ]
+    if not candidatas:
+        raise ValueError(f'Sem ranhura de retorno para a bobina da ranhura {k + 1}')
+    d = min(candidatas, key=lambda d: (abs(d - y), d))
+    livres.discard((k + d) % S)
+    return (k + d) % S
+
+
+def _formar_grupos(bobinas):
+    """
+    Agrupa bobinas consecutivas (pela ranhura de ida) de mesma fase e polaridade.
+    A sequência é circular: um grupo pode atravessar a ranhura S → 1.
+    """
+    n = len(bobinas)
+    chave = [(b['fase'], b['polaridade']) for b in bobinas]
+    inicio = next((i for i in range(n) if chave[i] != chave[i - 1]), 0)
+
+    grupos = []
+    for j in range(n):
+        i = (inicio + j) % n
+        if not grupos or chave[i] != chave[(i - 1) % n]:
+            grupos.append({'fase': chave[i][0], 'polaridade': chave[i][1], 'bobinas': []})
+        grupos[-1]['bobinas'].append(bobinas[i]['numero'])
+    return grupos
+
+
+def _unir_grupos_por_par_de_polos(grupos):
+    """
+    Para g=P/2 em camada dupla, une cada grupo positivo de uma fase ao grupo
+    negativo seguinte da mesma fase, formando P/2 grupos por fase.
+    """
+    unidos = []
+    pendentes = {}
+    for grupo in grupos:
+        fase = grupo['fase']
+        if grupo['polaridade'] > 0:
+            novo = {'fase': fase, 'polaridade': 1, 'bobinas': list(grupo['bobinas'])}
+            unidos.append(novo)
+            pendentes.setdefault(fase, []).append(novo)
+        elif pendentes.get(fase):
+            pendentes[fase].pop(0)['bobinas'].extend(grupo['bobinas'])
+        else:
+            # Grupo negativo antes do primeiro positivo (sequência circular)
+            unidos.append({'fase': fase, 'polaridade': -1, 'bobinas': list(grupo['bobinas'])})
+
+    # Une os negativos que abriram a sequência aos positivos que ficaram sem par
+    for grupo in [g for g in unidos if g['polaridade'] < 0]:
+        if pendentes.get(grupo['fase']):
+            pendentes[grupo['fase']].pop(0)['bobinas'].extend(grupo['bobinas'])
+            unidos.remove(grupo)
+    return unidos
+
+
+def _somas_fasoriais(indices, lados, inferiores, S):
+    """
+    Soma os fasores dos lados de bobina de cada fase, com o sinal da polaridade.
+    O fator de enrolamento da fase é |soma| / número de lados.
+    """
+    fasores = _fasores_unitarios(S)
+    somas = dict.fromkeys(FASES, 0j)
+    contagem = dict.fromkeys(FASES, 0)
+    for camada in (lados, inferiores):
+        for k, lado in enumerate(camada):
+            if lado is None:
+                continue
+            fase, polaridade = lado
+            somas[fase] += polaridade * fasores[indices[k]]
+            contagem[fase] += 1
+
+    return {
+        fase: {
+            'modulo': round(abs(somas[fase]), 4),
+            'angulo': round(math.degrees(cmath.phase(somas[fase])), 2),
+            'lados': contagem[fase],
+            'fator_enrolamento': round(abs(somas[fase]) / contagem[fase], 4) if contagem[fase] else 0.0,
+        }
+        for fase in FASES
+    }
+
+
+@lru_cache(maxsize=1024)
+def calcular_distribuicao(S, P, Camada, g_type, y):
+    """
+    Calcula a distribuição ranhura a ranhura, os grupos de bobinas e as somas fasoriais.
+
+    Args:
+        S (int): Número de ranhuras
+        P (int): Número de polos
+        Camada (str): 'única' ou 'dupla'
+        g_type (str): 'g=P' ou 'g=P/2'
+        y (int): Passo da bobina (em ranhuras)
+
+    Returns:
+        dict: {
+            'simetrica': bool,
+            'ranhuras': [{'ranhura', 'angulo', 'superior', 'inferior'}, ...],
+            'bobinas': [{'numero', 'fase', 'polaridade', 'ida', 'retorno', 'passo'}, ...],
+            'grupos': [{'numero', 'fase', 'polaridade', 'bobinas'}, ...],
+            'fasores': {fase: {'modulo', 'angulo', 'lados', 'fator_enrolamento'}},
+            'fator_enrolamento': float,
+        }
+        Ranhuras e bobinas são numeradas a partir de 1. Cada lado de bobina é
+        {'fase': 'A'|'B'|'C', 'polaridade': 1|-1}; 'inferior' é None em camada única.
+        O resultado é memorizado e não deve ser modificado.
+
+    Raises:
+        ValueError: Se a camada única não tiver ranhura de retorno para alguma bobina
+    """
+    indices = _indices_angulares(S, P)
+    faixas = _faixas_por_angulo(indices, S)
+    simetrica = _equilibrada(faixas)
+    if not simetrica:
+        faixas = _faixas_por_ordem(indices, S)
+    lados = [FAIXAS_DE_FASE[f] for f in faixas]
+
+    inferiores = [None] * S
+    bobinas = []
+
+    if Camada == 'dupla':
+        # Cada ranhura inicia uma bobina na camada superior e recebe, na
+        # camada inferior, o retorno da bobina iniciada y ranhuras antes
+        for k in range(S):
+            fase, polaridade = lados[k]
+            retorno = (k + y) % S
+            inferiores[retorno] = (fase, -polaridade)
+            bobinas.append((k, retorno, fase, polaridade))
+    else:
+        # Camada única: cada ranhura recebe um único lado de bobina.
+        # g=P/2 (polos consequentes): as bobinas partem das faixas positivas.
+        # g=P (por polos): partem da segunda metade de cada faixa, alternando a polaridade.
+        if g_type == 'g=P/2':
+            idas = [k for k in range(S) if lados[k][1] > 0]
+        else:
+            idas = _segundas_metades(faixas, S)
+        livres = set(range(S)) - set(idas)
+        for k in idas:
+            fase, polaridade = lados[k]
+            retorno = _ranhura_de_retorno(k, fase, polaridade, y, S, lados, livres)
+            bobinas.append((k, retorno, fase, polaridade))
+
+    bobinas = [
+        {
+            'numero': numero,
+            'fase': fase,
+            'polaridade': polaridade,
+            'ida': ida + 1,
+            'retorno': retorno + 1,
+            'passo': (retorno - ida) % S,
+        }
+        for numero, (ida, retorno, fase, polaridade) in enumerate(sorted(bobinas), 1)
+    ]
+
+    grupos = _formar_grupos(bobinas)
+    if Camada == 'dupla' and g_type == 'g=P/2':
+        grupos = _unir_grupos_por_par_de_polos(grupos)
+    for numero, grupo in enumerate(grupos, 1):
+        grupo['numero'] = numero
+
+    fasores = _somas_fasoriais(indices, lados, inferiores, S)
+
+    ranhuras = [
+        {
+            'ranhura': k + 1,
+            'angulo': round(indices[k] * 360 / S, 4),
+            'superior': {'fase': lados[k][0], 'polaridade': lados[k][1]},
+            'inferior': (
+                {'fase': inferiores[k][0], 'polaridade': inferiores[k][1]}
+                if inferiores[k] else None
+            ),
+        }
+        for k in range(S)
+    ]
+
+    return {
+        'S': S,
+        'P': P,
+        'Camada': Camada,
+        'g_type': g_type,
+        'y': y,
+        'simetrica': simetrica,
+        'ranhuras': ranhuras,
+        'bobinas': bobinas,
+        'grupos': grupos,
+        'fasores': fasores,
+        'fator_enrolamento': round(sum(f['fator_enrolamento'] for f in fasores.values()) / len(FASES), 4),
+    }
+
+
+def verificar_zeta(distribuicao, zeta_catalogo):
+    """
+    Compara o fator de enrolamento calculado com o zeta do catálogo.
+
+    O catálogo usa a fórmula kd·kp de q inteiro; para q fracionário e para
+    camada única (em que o passo não encurta as bobinas) o valor exato da
+    estrela de ranhuras pode diferir, e o motivo provável é indicado.
+    """
+    S, P = distribuicao['S'], distribuicao['P']
+    calculado = distribuicao['fator_enrolamento']
+    diferenca = round(calculado - zeta_catalogo, 4)
+    consistente = abs(diferenca) <= TOLERANCIA_ZETA
+
+    motivo = None
+    if not consistente:
+        if not distribuicao['simetrica']:
+            motivo = 'Enrolamento assimétrico: fases com distribuição desigual na estrela de ranhuras'
+        elif distribuicao['Camada'] == 'única':
+            motivo = 'Camada única: o catálogo aplica o fator de passo, que não se aplica a este enrolamento'
+        elif S % (3 * P):
+            motivo = 'q fracionário: o catálogo usa a fórmula de q inteiro'
+        else:
+            motivo = 'Divergência não explicada pelo tipo de enrolamento'
+
+    return {
+        'zeta_catalogo': zeta_catalogo,
+        'zeta_calculado': calculado,
+        'diferenca': diferenca,
+        'consistente': consistente,
+        'motivo': motivo,
+    }
@@ -0,0 +1,169 @@
+"""
+Análise harmônica da força magnetomotriz (FMM) do estator.
+
+A partir da distribuição ranhura a ranhura, monta a FMM em degraus produzida
+pelas correntes trifásicas (instante ia = 1, ib = ic = -1/2) e calcula o seu
+espectro por uma DFT sobre as S ranhuras. Como os condutores são tratados como
+concentrados no centro das ranhuras, o espectro de condutores é periódico em S
+e a FMM de ordem n vale C(n mod S) / n: basta uma DFT de S pontos por
+configuração, com a matriz da DFT compartilhada entre todas as
+configurações de mesmo S.
+"""
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from ThreePhaseCoils.models import MotorConfiguration
+from .distribuicao import _fasores_unitarios, _indices_angulares, calcular_distribuicao
+
+# Harmônicos de interesse para a escolha do passo
+HARMONICOS_ANALISADOS = (5, 7, 11, 13)
+
+# Ordem elétrica máxima incluída no espectro e amplitude mínima (relativa à fundamental)
+ORDEM_MAXIMA_ESPECTRO = 25
+AMPLITUDE_MINIMA_ESPECTRO = 0.005
+
+# Incrementar quando o método de cálculo mudar (invalida o cache do catálogo)
+VERSAO_ANALISE = 1
+
+CORRENTES_INSTANTANEAS = {'A': 1.0, 'B': -0.5, 'C': -0.5}
+
+
+def _lados_por_ranhura(distribuicao):
+    """Lista (fase, polaridade) de todos os lados de bobina de cada ranhura."""
+    return [
+        [(lado['fase'], lado['polaridade']) for lado in (r['superior'], r['inferior']) if lado]
+        for r in distribuicao['ranhuras']
+    ]
+
+
+def _fatores_harmonicos(lados, indices, S, ordens):
+    """Fator de enrolamento da fase A para cada ordem elétrica (soma fasorial na ordem ν)."""
+    fasores = _fasores_unitarios(S)
+    lados_a = [(k, polaridade) for k, ranhura in enumerate(lados) for fase, polaridade in ranhura if fase == 'A']
+    fatores = {}
+    for ordem in ordens:
+        soma = sum(polaridade * fasores[(ordem * indices[k]) % S] for k, polaridade in lados_a)
+        fatores[ordem] = round(abs(soma) / len(lados_a), 4)
+    return fatores
+
+
+@lru_cache(maxsize=64)
+def _matriz_dft(S):
+    """Matriz da DFT de S pontos: linha n = raízes e^(-j·2π·n·k/S) para k = 0..S-1."""
+    fasores = _fasores_unitarios(S)
+    return tuple(tuple(fasores[(-n * k) % S] for k in range(S)) for n in range(S))
+
+
+@lru_cache(maxsize=1024)
+def analisar_harmonicos(S, P, Camada, g_type, y):
+    """
+    Calcula o espectro da FMM e os fatores de enrolamento harmônicos.
+
+    Returns:
+        dict: {
+            'fator_enrolamento': float,           # fundamental
+            'fatores_harmonicos': {5: kw5, 7: kw7, 11: kw11, 13: kw13},
+            'espectro': [{'ordem', 'amplitude'}, ...],  # ordem elétrica, amplitude relativa à fundamental
+            'distorcao_fmm': float,                # razão RMS harmônicos / fundamental
+        }
+        O resultado é memorizado e não deve ser modificado.
+    """
+    return _analisar(S, P, Camada, g_type, y, _matriz_dft(S))
+
+
+def _analisar(S, P, Camada, g_type, y, matriz):
+    """Análise de uma configuração com a matriz da DFT de S pontos já montada."""
+    distribuicao = calcular_distribuicao(S, P, Camada, g_type, y)
+    pares = P // 2
+    indices = _indices_angulares(S, P)
+    lados = _lados_por_ranhura(distribuicao)
+
+    # Corrente líquida em cada ranhura no instante analisado
+    correntes = [
+        sum(polaridade * CORRENTES_INSTANTANEAS[fase] for fase, polaridade in ranhura)
+        for ranhura in lados
+    ]
+
+    # DFT de S pontos (ordens mecânicas 0..S-1): só as ranhuras com corrente contribuem
+    ranhuras = [(k, c) for k, c in enumerate(correntes) if c]
+    condutores = [abs(sum(c * linha[k] for k, c in ranhuras)) for linha in matriz]
+
+    fundamental = condutores[pares % S] / pares
+    espectro = []
+    soma_quadrados = 0.0
+    for n in range(1, ORDEM_MAXIMA_ESPECTRO * pares + 1):
+        if n == pares:
+            continue
+        amplitude = condutores[n % S] / n / fundamental
+        soma_quadrados += amplitude ** 2
+        if amplitude >= AMPLITUDE_MINIMA_ESPECTRO:
+            espectro.append({'ordem': round(n / pares, 3), 'amplitude': round(amplitude, 4)})
+
+    return {
+        'fator_enrolamento': distribuicao['fator_enrolamento'],
+        'fatores_harmonicos': _fatores_harmonicos(lados, indices, S, HARMONICOS_ANALISADOS),
+        'espectro': [{'ordem': 1.0, 'amplitude': 1.0}] + espectro,
+        'distorcao_fmm': round(soma_quadrados ** 0.5, 4),
+    }
+
+
+def versao_catalogo():
+    """Identifica o estado atual do catálogo (muda a cada importação ou alteração de tamanho)."""
+    estado = MotorConfiguration.objects.aggregate(total=Count('id'), ultimo=Max('id'))
+    return f'{VERSAO_ANALISE}-{estado["total"]}-{estado["ultimo"]}'
+
+
+def analisar_lote(configuracoes):
+    """
+    Analisa várias configurações de uma vez.
+    As configurações são processadas agrupadas por S: a matriz da DFT é montada
+    uma vez por grupo e aplicada a todas as configurações daquele S.
+
+    Args:
+        configuracoes: Iterável de tuplas (S, P, Camada, g_type, y)
+
+    Returns:
+        dict: {(S, P, Camada, g_type, y): resumo harmônico}
+    """
+    resultados = {}
+    for S, grupo in groupby(sorted(set(configuracoes)), key=itemgetter(0)):
+        matriz = _matriz_dft(S)
+        for parametros in grupo:
+            try:
+                analise = _analisar(*parametros, matriz)
+            except ValueError:
+                continue
+            resultados[parametros] = {
+                'fatores_harmonicos': analise['fatores_harmonicos'],
+                'distorcao_fmm': analise['distorcao_fmm'],
+            }
+    return resultados
+
+
+_harmonicos_catalogo = {}
+
+
+def harmonicos_do_catalogo():
+    """
+    Resumo harmônico de todo o catálogo, em cache por versão do catálogo.
+    Usa um cache local ao processo e o cache do Django (compartilhado entre processos).
+    """
+    versao = versao_catalogo()
+    if versao in _harmonicos_catalogo:
+        return _harmonicos_catalogo[versao]
+
+    chave = f'harmonicos_catalogo:{versao}'
+    resultados = cache.get(chave)
+    if resultados is None:
+        resultados = analisar_lote(
+            MotorConfiguration.objects.values_list('S', 'P', 'Camada', 'g_type', 'y')
+        )
+        cache.set(chave, resultados, None)
+
+    _harmonicos_catalogo.clear()
+    _harmonicos_catalogo[versao] = resultados
+    return resultados
@@ -0,0 +1,197 @@
+"""
+Esquema de ligação dos grupos de bobinas (série/paralelo) por fase.
+
+Para um número de grupos por fase, um número de circuitos paralelos (k1) e o
+tipo de ligação (g=P "fim com fim" ou g=P/2 "fim com início"), gera a lista de
+conexões (netlist) e a folha de ligações em SVG. O resultado não depende das
+dimensões do núcleo, então é memorizado por (num_grupos, k1, g_type).
+"""
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from .renderizacao import CORES_FASES
+
+# Incrementar sempre que a netlist ou a folha de ligações mudar
+VERSAO_LIGACOES = 1
+
+# Terminais de cada fase (início, fim) na numeração usual de motores de 6 pontas
+TERMINAIS_FASES = {
+    'A': ('1', '4'),
+    'B': ('2', '5'),
+    'C': ('3', '6'),
+}
+
+G_TYPES = ('g=P', 'g=P/2')
+
+# Geometria da folha de ligações (px)
+LARGURA_GRUPO = 56
+ESPACO_GRUPOS = 34
+ALTURA_GRUPO = 28
+ALTURA_FASE = 150
+MARGEM_LIGACOES = 50
+
+
+def _no(fase, grupo, extremidade):
+    """Nome de um terminal de grupo: 'A3.I' (início) ou 'A3.F' (fim)."""
+    return f'{fase}{grupo}.{extremidade}'
+
+
+@lru_cache(maxsize=None)
+def gerar_ligacoes(num_grupos, k1, g_type):
+    """
+    Monta a netlist das ligações dos grupos de cada fase.
+
+    Em g=P os grupos vizinhos têm polaridades opostas e os grupos pares são
+    percorridos ao contrário (fim com fim); em g=P/2 todos têm a mesma
+    polaridade (fim com início). Cada circuito paralelo reúne num_grupos/k1
+    grupos consecutivos.
+
+    Args:
+        num_grupos (int): Grupos por fase
+        k1 (int): Número de circuitos paralelos
+        g_type (str): 'g=P' ou 'g=P/2'
+
+    Returns:
+        dict: {'num_grupos', 'k1', 'g_type', 'grupos_serie', 'fases': {fase: {...}}, 'conexoes': [...]}
+        O resultado é memorizado e não deve ser modificado.
+
+    Raises:
+        ValueError: Se g_type for inválido ou k1 não dividir num_grupos
+    """
+    if g_type not in G_TYPES:
+        raise ValueError(f'g_type inválido: {g_type}')
+    if num_grupos < 1 or k1 < 1 or num_grupos % k1:
+        raise ValueError('k1 deve dividir o número de grupos')
+
+    grupos_serie = num_grupos // k1
+    fases = {}
+    conexoes = []
+
+    for fase, (inicio, fim) in TERMINAIS_FASES.items():
+        circuitos = []
+        for c in range(k1):
+            grupos = []
+            for grupo in range(c * grupos_serie + 1, (c + 1) * grupos_serie + 1):
+                direto = g_type == 'g=P/2' or grupo % 2 == 1
+                grupos.append({
+                    'grupo': grupo,
+                    'sentido': 'direto' if direto else 'invertido',
+                    'entrada': _no(fase, grupo, 'I' if direto else 'F'),
+                    'saida': _no(fase, grupo, 'F' if direto else 'I'),
+                })
+
+            ligacoes = [{'de': inicio, 'para': grupos[0]['entrada'], 'tipo': 'terminal'}]
+            ligacoes += [
+                {'de': anterior['saida'], 'para': seguinte['entrada'], 'tipo': 'serie'}
+                for anterior, seguinte in zip(grupos, grupos[1:])
+            ]
+            ligacoes.append({'de': grupos[-1]['saida'], 'para': fim, 'tipo': 'terminal'})
+
+            circuitos.append({'numero': c + 1, 'grupos': grupos, 'ligacoes': ligacoes})
+            conexoes.extend(ligacoes)
+
+        fases[fase] = {'terminais': {'inicio': inicio, 'fim': fim}, 'circuitos': circuitos}
+
+    return {
+        'num_grupos': num_grupos,
+        'k1': k1,
+        'g_type': g_type,
+        'grupos_serie': grupos_serie,
+        'fases': fases,
+        'conexoes': conexoes,
+    }
+
+
+def _arco(x0, x1, y, altura, cor):
+    """Jumper entre dois pinos desenhado como arco acima dos grupos."""
+    return (
+        f'<path d="M{x0:.1f},{y:.1f} C{x0:.1f},{y - altura:.1f} {x1:.1f},{y - altura:.1f} {x1:.1f},{y:.1f}" '
+        f'fill="none" stroke="{cor}" stroke-width="1.5"/>'
+    )
+
+
+@lru_cache(maxsize=None)
+def renderizar_ligacoes_svg(num_grupos, k1, g_type):
+    """
+    Gera a folha de ligações (SVG) das três fases.
+
+    Cada fase ocupa uma faixa horizontal: os grupos são caixas com os pinos de
+    início (I, à esquerda) e fim (F, à direita), os jumpers em série são arcos
+    acima dos grupos e os circuitos paralelos se unem em dois barramentos
+    abaixo, ligados aos terminais de início e fim da fase.
+
+    Returns:
+        str: Documento SVG
+    """
+    netlist = gerar_ligacoes(num_grupos, k1, g_type)
+    passo = LARGURA_GRUPO + ESPACO_GRUPOS
+    largura = 2 * MARGEM_LIGACOES + num_grupos * passo
+    altura = 3 * ALTURA_FASE + 50
+
+    partes = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{largura}" height="{altura}" '
+        f'viewBox="0 0 {largura} {altura}" font-family="sans-serif" font-size="10">',
+        f'<rect width="{largura}" height="{altura}" fill="#ffffff"/>',
+        '<text x="{0}" y="22" font-size="13" font-weight="bold">{1}</text>'.format(
+            MARGEM_LIGACOES,
+            escape(
+                f'{num_grupos} grupos por fase  ·  {netlist["grupos_serie"]} em série × {k1} em paralelo  ·  '
+                f'{g_type} ({"fim com fim" if g_type == "g=P" else "fim com início"})'
+            )
+        ),
+    ]
+
+    for i, (fase, dados) in enumerate(netlist['fases'].items()):
+        cor = CORES_FASES[fase]
+        topo = 40 + i * ALTURA_FASE + 40
+        y_pinos = topo + ALTURA_GRUPO / 2
+        y_barra_inicio = topo + ALTURA_GRUPO + 30
+        y_barra_fim = y_barra_inicio + 22
+
+        pinos = {}
+        for grupo in range(1, num_grupos + 1):
+            x = MARGEM_LIGACOES + (grupo - 1) * passo + ESPACO_GRUPOS / 2
+            pinos[_no(fase, grupo, 'I')] = x
+            pinos[_no(fase, grupo, 'F')] = x + LARGURA_GRUPO
+            partes.append(
+                f'<rect x="{x:.1f}" y="{topo}" width="{LARGURA_GRUPO}" height="{ALTURA_GRUPO}" '
+                f'fill="#ffffff" stroke="{cor}" stroke-width="1.5"/>'
+            )
+            partes.append(
+                f'<text x="{x + LARGURA_GRUPO / 2:.1f}" y="{topo + 18}" text-anchor="middle" '
+                f'fill="{cor}" font-weight="bold">{fase}{grupo}</text>'
+            )
+            partes.append(f'<text x="{x + 2:.1f}" y="{topo + ALTURA_GRUPO + 11}">I</text>')
+            partes.append(f'<text x="{x + LARGURA_GRUPO - 7:.1f}" y="{topo + ALTURA_GRUPO + 11}">F</text>')
+
+        terminais = dados['terminais']
+        barras = {terminais['inicio']: y_barra_inicio, terminais['fim']: y_barra_fim}
+        for terminal, y in barras.items():
+            partes.append(
+                f'<line x1="{MARGEM_LIGACOES - 20}" y1="{y}" x2="{largura - MARGEM_LIGACOES}" y2="{y}" '
+                f'stroke="{cor}" stroke-width="1" stroke-dasharray="6,3"/>'
+            )
+            partes.append(
+                f'<text x="{MARGEM_LIGACOES - 24}" y="{y + 4}" text-anchor="end" font-weight="bold">{terminal}</text>'
+            )
+
+        for circuito in dados['circuitos']:
+            for ligacao in circuito['ligacoes']:
+                if ligacao['tipo'] == 'serie':
+                    x0, x1 = pinos[ligacao['de']], pinos[ligacao['para']]
+                    altura_arco = 18 + abs(x1 - x0) / 6
+                    partes.append(_arco(x0, x1, topo, altura_arco, cor))
+                else:
+                    terminal, pino = (
+                        (ligacao['de'], ligacao['para']) if ligacao['de'] in barras
+                        else (ligacao['para'], ligacao['de'])
+                    )
+                    x = pinos[pino]
+                    partes.append(
+                        f'<line x1="{x:.1f}" y1="{topo + ALTURA_GRUPO}" x2="{x:.1f}" y2="{barras[terminal]}" '
+                        f'stroke="{cor}" stroke-width="1.5"/>'
+                    )
+                    partes.append(f'<circle cx="{x:.1f}" cy="{barras[terminal]}" r="2.5" fill="{cor}"/>')
+
+    partes.append('</svg>')
+    return '\n'.join(partes)
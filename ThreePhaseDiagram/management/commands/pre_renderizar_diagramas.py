@@ -0,0 +1,88 @@
+"""
+Comando para pré-renderizar os diagramas de bobinagem do catálogo.
+
+Uso:
+    python manage.py pre_renderizar_diagramas
+    python manage.py pre_renderizar_diagramas --S 36 --P 4 --processos 4
+    python manage.py pre_renderizar_diagramas --forcar
+
+Os SVGs são gerados em paralelo (um processo por núcleo de CPU) e gravados no
+cache de diagramas. Configurações cuja chave já está no cache são ignoradas.
+
+Só o diagrama de bobinagem (diagrama_svg, um SVG por configuração) é
+pré-renderizado: é a única saída com cache persistente em disco. A folha de
+ligações, o layout compacto e o roteamento são gerados na requisição.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand
+from ThreePhaseCoils.models import MotorConfiguration
+from ThreePhaseDiagram.cache import caminho_diagrama, chave_diagrama, gerar_para_cache, gravar_diagrama
+
+
+class Command(BaseCommand):
+    help = (
+        'Pré-renderiza o diagrama de bobinagem (SVG) de cada configuração do catálogo; '
+        'as demais saídas (ligações, layout compacto, roteamento) não são pré-renderizadas'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--S', type=int, help='Filtra pelo número de ranhuras')
+        parser.add_argument('--P', type=int, help='Filtra pelo número de polos')
+        parser.add_argument('--camada', type=str, help='Filtra pelo tipo de camada (única ou dupla)')
+        parser.add_argument('--g-type', type=str, help='Filtra pelo tipo de g (g=P ou g=P/2)')
+        parser.add_argument(
+            '--processos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Número de processos (padrão: número de núcleos de CPU)'
+        )
+        parser.add_argument(
+            '--forcar',
+            action='store_true',
+            help='Renderiza novamente mesmo se o diagrama já estiver no cache'
+        )
+
+    def handle(self, *args, **options):
+        filtros = {
+            campo: options[opcao]
+            for campo, opcao in (('S', 'S'), ('P', 'P'), ('Camada', 'camada'), ('g_type', 'g_type'))
+            if options[opcao] is not None
+        }
+        configuracoes = set(
+            MotorConfiguration.objects.filter(**filtros)
+            .values_list('S', 'P', 'Camada', 'g_type', 'y')
+        )
+
+        pendentes = sorted(
+            parametros for parametros in configuracoes
+            if options['forcar'] or not caminho_diagrama(chave_diagrama(*parametros)).exists()
+        )
+        ignorados = len(configuracoes) - len(pendentes)
+
+        if not pendentes:
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Nenhum diagrama pendente ({ignorados} já em cache)'
+            ))
+            return
+
+        self.stdout.write(self.style.WARNING(
+            f'Renderizando {len(pendentes)} diagramas ({ignorados} já em cache)...'
+        ))
+
+        gerados = 0
+        processos = max(1, options['processos'])
+        lote = max(1, len(pendentes) // (processos * 4))
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            # A gravação fica no processo principal; os processos só renderizam
+            for parametros, (chave, svg, erro) in zip(
+                pendentes, executor.map(gerar_para_cache, pendentes, chunksize=lote)
+            ):
+                if erro:
+                    self.stdout.write(self.style.ERROR(f'Erro em {parametros}: {erro}'))
+                    continue
+                gravar_diagrama(chave, svg)
+                gerados += 1
+
+        self.stdout.write(self.style.SUCCESS(f'✓ {gerados} diagramas gravados no cache'))
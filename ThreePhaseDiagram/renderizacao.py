@@ -0,0 +1,150 @@
+"""
+Renderização do diagrama planificado de bobinagem em SVG.
+
+A saída é determinística: a mesma distribuição gera sempre o mesmo SVG, o que
+permite armazená-lo em cache endereçado pelo conteúdo da configuração.
+"""
+from xml.sax.saxutils import escape
+
+# Incrementar sempre que a aparência do SVG mudar (invalida o cache em disco)
+VERSAO_RENDERIZADOR = 1
+
+CORES_FASES = {
+    'A': '#d62728',
+    'B': '#1f77b4',
+    'C': '#2ca02c',
+}
+
+# Geometria do desenho (px)
+LARGURA_RANHURA = 28
+MARGEM = 40
+TOPO_RANHURAS = 150
+ALTURA_RANHURAS = 120
+ALTURA_CABECA = 90
+ALTURA_TOTAL = 340
+
+
+def _x_lado(ranhura, camada, dupla):
+    """Posição horizontal de um lado de bobina dentro da ranhura (1-based)."""
+    x = MARGEM + (ranhura - 1) * LARGURA_RANHURA + LARGURA_RANHURA / 2
+    if dupla:
+        x += -5 if camada == 'superior' else 5
+    return x
+
+
+def _cabeca_bobina(x_ida, x_retorno, largura_util):
+    """
+    Retorna os trechos (polilinhas) da cabeça de bobina entre dois lados.
+    Bobinas que atravessam a ranhura S → 1 são desenhadas em dois trechos,
+    saindo pela borda direita e reentrando pela esquerda.
+    """
+    topo = TOPO_RANHURAS
+    pico = TOPO_RANHURAS - ALTURA_CABECA / 2
+    if x_retorno <= x_ida:
+        x_retorno += largura_util
+    pontos = [(x_ida, topo), ((x_ida + x_retorno) / 2, pico), (x_retorno, topo)]
+
+    direita = MARGEM + largura_util
+    if x_retorno <= direita:
+        return [pontos]
+
+    # Corta o traçado na borda direita e desloca o restante para o início
+    trecho_direita = [pontos[0]]
+    trecho_esquerda = []
+    for (x0, y0), (x1, y1) in zip(pontos, pontos[1:]):
+        if x0 < direita < x1:
+            y_borda = y0 + (y1 - y0) * (direita - x0) / (x1 - x0)
+            trecho_direita.append((direita, y_borda))
+            trecho_esquerda.append((MARGEM, y_borda))
+        destino = trecho_direita if x1 <= direita else trecho_esquerda
+        destino.append((x1 - largura_util, y1) if x1 > direita else (x1, y1))
+    return [trecho_direita, trecho_esquerda]
+
+
+def _polilinha(pontos, cor, tracejada=False):
+    coordenadas = ' '.join(f'{x:.1f},{y:.1f}' for x, y in pontos)
+    traco = ' stroke-dasharray="4,3"' if tracejada else ''
+    return f'<polyline points="{coordenadas}" fill="none" stroke="{cor}" stroke-width="1.5"{traco}/>'
+
+
+def renderizar_svg(distribuicao):
+    """
+    Gera o diagrama planificado (SVG) de uma distribuição de bobinas.
+
+    Args:
+        distribuicao (dict): Resultado de calcular_distribuicao
+
+    Returns:
+        str: Documento SVG
+    """
+    S = distribuicao['S']
+    dupla = distribuicao['Camada'] == 'dupla'
+    largura_util = S * LARGURA_RANHURA
+    largura = largura_util + 2 * MARGEM
+
+    partes = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{largura}" height="{ALTURA_TOTAL}" '
+        f'viewBox="0 0 {largura} {ALTURA_TOTAL}" font-family="sans-serif" font-size="10">',
+        f'<rect width="{largura}" height="{ALTURA_TOTAL}" fill="#ffffff"/>',
+        '<text x="{0}" y="20" font-size="13" font-weight="bold">{1}</text>'.format(
+            MARGEM,
+            escape(
+                f"S={S}  P={distribuicao['P']}  Camada {distribuicao['Camada']}  "
+                f"{distribuicao['g_type']}  y={distribuicao['y']} (1:{distribuicao['y'] + 1})"
+            )
+        ),
+    ]
+
+    # Ranhuras e numeração
+    for ranhura in range(1, S + 1):
+        x = MARGEM + (ranhura - 1) * LARGURA_RANHURA
+        partes.append(
+            f'<rect x="{x + 3}" y="{TOPO_RANHURAS}" width="{LARGURA_RANHURA - 6}" '
+            f'height="{ALTURA_RANHURAS}" fill="#f4f4f4" stroke="#999999"/>'
+        )
+        partes.append(
+            f'<text x="{x + LARGURA_RANHURA / 2:.1f}" y="{TOPO_RANHURAS + ALTURA_RANHURAS + 14}" '
+            f'text-anchor="middle">{ranhura}</text>'
+        )
+
+    # Lados de bobina nas ranhuras (superior contínuo, inferior tracejado)
+    for ranhura in distribuicao['ranhuras']:
+        for camada in ('superior', 'inferior'):
+            lado = ranhura[camada]
+            if lado is None:
+                continue
+            x = _x_lado(ranhura['ranhura'], camada, dupla)
+            partes.append(_polilinha(
+                [(x, TOPO_RANHURAS), (x, TOPO_RANHURAS + ALTURA_RANHURAS)],
+                CORES_FASES[lado['fase']],
+                tracejada=camada == 'inferior'
+            ))
+
+    # Cabeças de bobina
+    for bobina in distribuicao['bobinas']:
+        cor = CORES_FASES[bobina['fase']]
+        x_ida = _x_lado(bobina['ida'], 'superior', dupla)
+        x_retorno = _x_lado(bobina['retorno'], 'inferior', dupla)
+        for trecho in _cabeca_bobina(x_ida, x_retorno, largura_util):
+            partes.append(_polilinha(trecho, cor))
+
+    # Identificação dos grupos (fase, número e polaridade) sobre a primeira bobina
+    bobinas_por_numero = {b['numero']: b for b in distribuicao['bobinas']}
+    for grupo in distribuicao['grupos']:
+        primeira = bobinas_por_numero[grupo['bobinas'][0]]
+        x = _x_lado(primeira['ida'], 'superior', dupla)
+        sinal = '+' if grupo['polaridade'] > 0 else '−'
+        partes.append(
+            f'<text x="{x:.1f}" y="{TOPO_RANHURAS - ALTURA_CABECA / 2 - 8:.1f}" '
+            f'fill="{CORES_FASES[grupo["fase"]]}" font-weight="bold">'
+            f'{grupo["fase"]}{grupo["numero"]}{sinal}</text>'
+        )
+
+    # Legenda
+    for i, (fase, cor) in enumerate(CORES_FASES.items()):
+        x = MARGEM + i * 90
+        partes.append(f'<rect x="{x}" y="{ALTURA_TOTAL - 22}" width="12" height="12" fill="{cor}"/>')
+        partes.append(f'<text x="{x + 16}" y="{ALTURA_TOTAL - 12}">Fase {fase}</text>')
+
+    partes.append('</svg>')
+    return '\n'.join(partes)
@@ -0,0 +1,361 @@
+"""
+Otimização do roteamento dos jumpers entre grupos de bobinas.
+
+Para uma distribuição (S, P, Camada, g_type, y) e um número de circuitos
+paralelos k1, escolhe, fase a fase, quais grupos formam cada circuito e em que
+ordem são ligados em série, minimizando o comprimento total dos jumpers e
+cabos de saída (medido em ranhuras ao longo da cabeça de bobina) e as
+sobreposições entre eles. O sentido de cada grupo é fixado pela sua
+polaridade, então qualquer ordem é eletricamente válida; para enrolamentos
+fracionários os circuitos paralelos precisam ainda ter a mesma FEM (mesma
+soma fasorial).
+
+Fases com poucos grupos são resolvidas por busca exaustiva; as demais por
+vizinho mais próximo seguido de busca local (troca, inversão e deslocamento),
+limitada por um número máximo de avaliações de custo (e não por tempo, para
+que a mesma entrada produza sempre o mesmo roteamento). As três fases são
+independentes e podem ser otimizadas em processos separados.
+"""
+import hashlib
+import itertools
+import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from django.core.cache import cache
+
+from .distribuicao import FASES, _fasores_unitarios, _indices_angulares, calcular_distribuicao
+
+# Maior número de arranjos (permutações) avaliado pela busca exaustiva por fase
+LIMITE_BUSCA_EXAUSTIVA = 5040
+
+# Máximo de arranjos avaliados pela busca heurística por fase (≈ 0,5 s)
+LIMITE_AVALIACOES_PADRAO = 5000
+
+# Custo de cada sobreposição entre jumpers, em ranhuras equivalentes
+PESO_SOBREPOSICAO = 0.5
+
+# Desequilíbrio relativo máximo entre as FEMs dos circuitos paralelos
+TOLERANCIA_EQUILIBRIO = 1e-3
+PENALIDADE_DESEQUILIBRIO = 1e6
+
+# Incrementar quando a busca ou o formato do resultado mudar (invalida o cache)
+VERSAO_ROTEAMENTO = 1
+
+
+def _distancia(a, b, S):
+    """Distância em ranhuras pelo menor arco entre as posições a e b."""
+    d = abs(a - b) % S
+    return min(d, S - d)
+
+
+def _arco(a, b, S):
+    """Arco mais curto de a até b como (início, comprimento) no sentido crescente."""
+    d = (b - a) % S
+    return (a, d) if d <= S - d else (b, S - d)
+
+
+def _sobrepoem(arco1, arco2, S):
+    """Indica se dois arcos (início, comprimento) compartilham algum trecho."""
+    (a1, c1), (a2, c2) = arco1, arco2
+    if not c1 or not c2:
+        return False
+    return (a2 - a1) % S < c1 or (a1 - a2) % S < c2
+
+
+def _trechos(circuitos, grupos, terminal):
+    """Lista (de, para) das posições de cada cabo e jumper dos circuitos."""
+    trechos = []
+    for circuito in circuitos:
+        atual = terminal
+        for g in circuito:
+            trechos.append((atual, grupos[g]['entrada']))
+            atual = grupos[g]['saida']
+        trechos.append((atual, terminal))
+    return trechos
+
+
+def _contar_sobreposicoes(trechos, S):
+    arcos = [_arco(a, b, S) for a, b in trechos]
+    return sum(
+        1 for i, arco in enumerate(arcos) for outro in arcos[i + 1:]
+        if _sobrepoem(arco, outro, S)
+    )
+
+
+def _desequilibrio(circuitos, grupos):
+    """Maior desvio relativo entre a FEM de um circuito e a média dos circuitos."""
+    if len(circuitos) < 2:
+        return 0.0
+    fems = [sum(grupos[g]['fasor'] for g in circuito) for circuito in circuitos]
+    media = sum(fems) / len(fems)
+    if not abs(media):
+        return 0.0
+    return max(abs(fem - media) for fem in fems) / abs(media)
+
+
+def _custo(circuitos, grupos, terminal, S):
+    trechos = _trechos(circuitos, grupos, terminal)
+    comprimento = sum(_distancia(a, b, S) for a, b in trechos)
+    custo = comprimento + PESO_SOBREPOSICAO * _contar_sobreposicoes(trechos, S)
+    desequilibrio = _desequilibrio(circuitos, grupos)
+    if desequilibrio > TOLERANCIA_EQUILIBRIO:
+        custo += PENALIDADE_DESEQUILIBRIO * desequilibrio
+    return custo
+
+
+def _dividir(sequencia, k1):
+    m = len(sequencia) // k1
+    return [list(sequencia[i * m:(i + 1) * m]) for i in range(k1)]
+
+
+def _busca_exaustiva(grupos, k1, terminal, S):
+    melhor, melhor_custo = None, math.inf
+    m = len(grupos) // k1
+    for sequencia in itertools.permutations(range(len(grupos))):
+        # Circuitos paralelos não têm ordem: considera só os arranjos com os
+        # primeiros grupos de cada circuito em ordem crescente
+        if any(sequencia[i * m] > sequencia[(i + 1) * m] for i in range(k1 - 1)):
+            continue
+        circuitos = _dividir(sequencia, k1)
+        custo = _custo(circuitos, grupos, terminal, S)
+        if custo < melhor_custo:
+            melhor, melhor_custo = circuitos, custo
+    return melhor, melhor_custo
+
+
+def _vizinho_mais_proximo(grupos, k1, terminal, S, primeiro=None):
+    """Monta os circuitos ligando sempre o grupo livre mais próximo (opcionalmente forçando o primeiro)."""
+    m = len(grupos) // k1
+    livres = set(range(len(grupos)))
+    circuitos = []
+    for _ in range(k1):
+        atual, circuito = terminal, []
+        for _ in range(m):
+            if primeiro is not None and primeiro in livres:
+                g = primeiro
+            else:
+                g = min(livres, key=lambda g: (_distancia(atual, grupos[g]['entrada'], S), g))
+            livres.discard(g)
+            circuito.append(g)
+            atual = grupos[g]['saida']
+        circuitos.append(circuito)
+    return circuitos
+
+
+class _Orcamento:
+    """Contador das avaliações de custo ainda permitidas na busca heurística."""
+
+    def __init__(self, avaliacoes):
+        self.restantes = avaliacoes
+
+    def consumir(self):
+        self.restantes -= 1
+        return self.restantes >= 0
+
+    @property
+    def esgotado(self):
+        return self.restantes <= 0
+
+
+def _busca_local(circuitos, grupos, terminal, S, orcamento):
+    """Melhora o arranjo com trocas, inversões e deslocamentos de grupos até não haver ganho."""
+    sequencia = [g for circuito in circuitos for g in circuito]
+    k1 = len(circuitos)
+    melhor_custo = _custo(circuitos, grupos, terminal, S)
+    m = len(sequencia) // k1
+    n = len(sequencia)
+
+    melhorou = True
+    while melhorou and not orcamento.esgotado:
+        melhorou = False
+        for i in range(n - 1):
+            for j in range(i + 1, n):
+                troca = sequencia[:]
+                troca[i], troca[j] = troca[j], troca[i]
+                candidatas = [troca]
+                if i // m == j // m:
+                    # Inversão do trecho i..j e deslocamento do grupo i para a posição j
+                    candidatas.append(sequencia[:i] + sequencia[i:j + 1][::-1] + sequencia[j + 1:])
+                    candidatas.append(sequencia[:i] + sequencia[i + 1:j + 1] + [sequencia[i]] + sequencia[j + 1:])
+                    candidatas.append(sequencia[:i] + [sequencia[j]] + sequencia[i:j] + sequencia[j + 1:])
+                for candidata in candidatas:
+                    if not orcamento.consumir():
+                        break
+                    custo = _custo(_dividir(candidata, k1), grupos, terminal, S)
+                    if custo < melhor_custo - 1e-9:
+                        sequencia, melhor_custo, melhorou = candidata, custo, True
+                        break
+            if orcamento.esgotado:
+                break
+    return _dividir(sequencia, k1), melhor_custo
+
+
+def _otimizar_fase(grupos, k1, terminal, S, limite_avaliacoes):
+    """Otimiza o roteamento de uma fase. Retorna (circuitos, custo, método)."""
+    if math.factorial(len(grupos)) <= LIMITE_BUSCA_EXAUSTIVA:
+        circuitos, custo = _busca_exaustiva(grupos, k1, terminal, S)
+        return circuitos, custo, 'exaustiva'
+    orcamento = _Orcamento(limite_avaliacoes)
+    # Várias partidas enquanto houver avaliações: ligação sequencial, vizinho mais
+    # próximo e vizinho mais próximo iniciando por cada um dos grupos
+    partidas = itertools.chain(
+        [_dividir(range(len(grupos)), k1), _vizinho_mais_proximo(grupos, k1, terminal, S)],
+        (_vizinho_mais_proximo(grupos, k1, terminal, S, primeiro=g) for g in range(len(grupos)))
+    )
+    melhor, melhor_custo = None, math.inf
+    for partida in partidas:
+        circuitos, custo = _busca_local(partida, grupos, terminal, S, orcamento)
+        if custo < melhor_custo:
+            melhor, melhor_custo = circuitos, custo
+        if orcamento.esgotado:
+            break
+    return melhor, melhor_custo, 'heuristica'
+
+
+def _otimizar_fase_args(args):
+    return _otimizar_fase(*args)
+
+
+def _grupos_por_fase(distribuicao):
+    """Posições de entrada/saída e fasor da FEM de cada grupo, por fase."""
+    S, P = distribuicao['S'], distribuicao['P']
+    fasores = _fasores_unitarios(S)
+    indices = _indices_angulares(S, P)
+    bobinas = {b['numero']: b for b in distribuicao['bobinas']}
+
+    grupos = {fase: [] for fase in FASES}
+    for grupo in distribuicao['grupos']:
+        primeira = bobinas[grupo['bobinas'][0]]
+        ultima = bobinas[grupo['bobinas'][-1]]
+        # O sentido do grupo segue a sua polaridade: positivo entra pelo início
+        direto = grupo['polaridade'] > 0
+        inicio, fim = primeira['ida'] - 1, ultima['retorno'] - 1
+        # FEM do grupo percorrido no seu sentido: cada bobina contribui com o
+        # sinal da sua polaridade (bobinas negativas são percorridas ao contrário)
+        fasor = sum(
+            bobinas[n]['polaridade'] * (fasores[indices[bobinas[n]['ida'] - 1]] - fasores[indices[bobinas[n]['retorno'] - 1]])
+            for n in grupo['bobinas']
+        )
+        grupos[grupo['fase']].append({
+            'grupo': grupo['numero'],
+            'sentido': 'direto' if direto else 'invertido',
+            'entrada': inicio if direto else fim,
+            'saida': fim if direto else inicio,
+            'fasor': fasor,
+        })
+    return grupos
+
+
+@lru_cache(maxsize=256)
+def otimizar_roteamento(S, P, Camada, g_type, y, k1, posicao_terminais=1,
+                        limite_avaliacoes=LIMITE_AVALIACOES_PADRAO, processos=1):
+    """
+    Calcula o roteamento de menor comprimento dos jumpers e cabos de saída.
+
+    Args:
+        S, P, Camada, g_type, y: Configuração do enrolamento
+        k1 (int): Número de circuitos paralelos por fase
+        posicao_terminais (int): Ranhura junto à qual ficam os terminais (1-based)
+        limite_avaliacoes (int): Máximo de arranjos avaliados pela busca heurística por fase
+        processos (int): Processos usados para otimizar as fases em paralelo
+
+    Returns:
+        dict: {'fases': {fase: {'circuitos', 'comprimento_ranhuras', 'metodo', ...}},
+               'comprimento_total_ranhuras', 'comprimento_sequencial_ranhuras',
+               'reducao_percentual', 'sobreposicoes', 'equilibrado'}
+        O resultado é memorizado e não deve ser modificado.
+
+    Raises:
+        ValueError: Se k1 não dividir o número de grupos por fase
+    """
+    distribuicao = calcular_distribuicao(S, P, Camada, g_type, y)
+    grupos_fases = _grupos_por_fase(distribuicao)
+    terminal = (posicao_terminais - 1) % S
+
+    for grupos in grupos_fases.values():
+        if k1 < 1 or len(grupos) % k1:
+            raise ValueError(f'k1 = {k1} não divide os {len(grupos)} grupos por fase')
+
+    tarefas = [(grupos_fases[fase], k1, terminal, S, limite_avaliacoes) for fase in FASES]
+    if processos > 1 and any(math.factorial(len(t[0])) > LIMITE_BUSCA_EXAUSTIVA for t in tarefas):
+        with ProcessPoolExecutor(max_workers=min(processos, len(FASES))) as executor:
+            resultados = list(executor.map(_otimizar_fase_args, tarefas))
+    else:
+        resultados = [_otimizar_fase(*tarefa) for tarefa in tarefas]
+
+    fases = {}
+    todos_trechos = []
+    total = sequencial = 0
+    equilibrado = True
+    for fase, (circuitos, _, metodo) in zip(FASES, resultados):
+        grupos = grupos_fases[fase]
+        trechos = _trechos(circuitos, grupos, terminal)
+        todos_trechos.extend(trechos)
+        comprimento = sum(_distancia(a, b, S) for a, b in trechos)
+        trechos_sequenciais = _trechos(_dividir(range(len(grupos)), k1), grupos, terminal)
+        total += comprimento
+        sequencial += sum(_distancia(a, b, S) for a, b in trechos_sequenciais)
+        equilibrado &= _desequilibrio(circuitos, grupos) <= TOLERANCIA_EQUILIBRIO
+
+        fases[fase] = {
+            'metodo': metodo,
+            'comprimento_ranhuras': comprimento,
+            'sobreposicoes': _contar_sobreposicoes(trechos, S),
+            'circuitos': [
+                {
+                    'numero': c + 1,
+                    'grupos': [
+                        {
+                            'grupo': grupos[g]['grupo'],
+                            'sentido': grupos[g]['sentido'],
+                            'ranhura_entrada': grupos[g]['entrada'] + 1,
+                            'ranhura_saida': grupos[g]['saida'] + 1,
+                        }
+                        for g in circuito
+                    ],
+                }
+                for c, circuito in enumerate(circuitos)
+            ],
+            'jumpers': [
+                {'de': a + 1, 'para': b + 1, 'comprimento_ranhuras': _distancia(a, b, S)}
+                for a, b in trechos
+            ],
+        }
+
+    return {
+        'S': S, 'P': P, 'Camada': Camada, 'g_type': g_type, 'y': y, 'k1': k1,
+        'posicao_terminais': posicao_terminais,
+        'fases': fases,
+        'comprimento_total_ranhuras': total,
+        'comprimento_sequencial_ranhuras': sequencial,
+        'reducao_percentual': round((sequencial - total) / sequencial * 100, 1) if sequencial else 0.0,
+        'sobreposicoes': _contar_sobreposicoes(todos_trechos, S),
+        'equilibrado': equilibrado,
+    }
+
+
+def chave_roteamento(S, P, Camada, g_type, y, k1, posicao_terminais=1):
+    """Retorna a chave (hex) do roteamento de uma configuração, k1 e posição dos terminais."""
+    conteudo = f'{VERSAO_ROTEAMENTO}|{S}|{P}|{Camada}|{g_type}|{y}|{k1}|{posicao_terminais}'
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+def roteamento_em_cache(S, P, Camada, g_type, y, k1, posicao_terminais=1):
+    """
+    Roteamento com os limites padrão, em cache por (configuração, k1, terminais).
+    Usa o cache do Django (compartilhado entre processos e reinícios), evitando
+    refazer a busca (mais de 1 s nas configurações grandes) a cada processo.
+
+    Returns:
+        tuple: (chave, roteamento)
+
+    Raises:
+        ValueError: Se k1 não dividir o número de grupos por fase (não vai para o cache)
+    """
+    chave = chave_roteamento(S, P, Camada, g_type, y, k1, posicao_terminais)
+    roteamento = cache.get(f'roteamento:{chave}')
+    if roteamento is None:
+        roteamento = otimizar_roteamento(S, P, Camada, g_type, y, k1, posicao_terminais=posicao_terminais)
+        cache.set(f'roteamento:{chave}', roteamento, None)
+    return chave, roteamento
@@ -0,0 +1,145 @@
+// Renderização do diagrama de bobinagem no navegador a partir do layout compacto
+// (ThreePhaseDiagram/compacto.py). Mantém a mesma geometria do renderizador SVG do servidor.
+(function () {
+    'use strict';
+
+    var FORMATO_SUPORTADO = 1;
+    var FAIXAS = [['A', 1], ['C', -1], ['B', 1], ['A', -1], ['C', 1], ['B', -1]];
+    var CORES = { A: '#d62728', B: '#1f77b4', C: '#2ca02c' };
+    var LARGURA_RANHURA = 28, MARGEM = 40, TOPO = 150, ALTURA_RANHURAS = 120, ALTURA_CABECA = 90, ALTURA = 340;
+    var SVG_NS = 'http://www.w3.org/2000/svg';
+
+    function bytes(base64) {
+        var texto = atob(base64 || ''), saida = [];
+        for (var i = 0; i < texto.length; i++) saida.push(texto.charCodeAt(i));
+        return saida;
+    }
+
+    function decodificar(layout) {
+        var S = layout.S, y = layout.y, dupla = layout.Camada === 'dupla';
+        var lados = [];
+        bytes(layout.ranhuras).forEach(function (b) {
+            for (var r = 0; r <= (b & 0x1F); r++) lados.push(FAIXAS[b >> 5]);
+        });
+
+        var bobinas = [];
+        if (dupla) {
+            for (var k = 0; k < S; k++) bobinas.push([k, (k + y) % S]);
+        } else {
+            var dados = bytes(layout.bobinas), ida = 0;
+            for (var i = 0; i < dados.length; i += 2) {
+                ida += dados[i];
+                bobinas.push([ida - 1, (ida - 1 + dados[i + 1]) % S]);
+            }
+        }
+
+        var grupos = bytes(layout.grupos), grupoDaBobina = [];
+        for (var j = 0; j < grupos.length; j += 2) {
+            for (var n = 0; n < grupos[j + 1]; n++) grupoDaBobina.push(grupos[j]);
+        }
+        return { S: S, dupla: dupla, lados: lados, bobinas: bobinas, grupoDaBobina: grupoDaBobina };
+    }
+
+    function elemento(nome, atributos, texto) {
+        var el = document.createElementNS(SVG_NS, nome);
+        Object.keys(atributos).forEach(function (a) { el.setAttribute(a, atributos[a]); });
+        if (texto !== undefined) el.textContent = texto;
+        return el;
+    }
+
+    function xLado(ranhura, inferior, dupla) {
+        var x = MARGEM + ranhura * LARGURA_RANHURA + LARGURA_RANHURA / 2;
+        return dupla ? x + (inferior ? 5 : -5) : x;
+    }
+
+    function polilinha(pontos, cor, tracejada) {
+        var atributos = {
+            points: pontos.map(function (p) { return p[0].toFixed(1) + ',' + p[1].toFixed(1); }).join(' '),
+            fill: 'none', stroke: cor, 'stroke-width': 1.5
+        };
+        if (tracejada) atributos['stroke-dasharray'] = '4,3';
+        return elemento('polyline', atributos);
+    }
+
+    function cabeca(xIda, xRetorno, larguraUtil) {
+        var pico = TOPO - ALTURA_CABECA / 2, direita = MARGEM + larguraUtil;
+        if (xRetorno <= xIda) xRetorno += larguraUtil;
+        var pontos = [[xIda, TOPO], [(xIda + xRetorno) / 2, pico], [xRetorno, TOPO]];
+        if (xRetorno <= direita) return [pontos];
+
+        // Corta na borda direita e continua a partir da borda esquerda
+        var trechoDireita = [pontos[0]], trechoEsquerda = [];
+        for (var i = 0; i < 2; i++) {
+            var p0 = pontos[i], p1 = pontos[i + 1];
+            if (p0[0] < direita && direita < p1[0]) {
+                var yBorda = p0[1] + (p1[1] - p0[1]) * (direita - p0[0]) / (p1[0] - p0[0]);
+                trechoDireita.push([direita, yBorda]);
+                trechoEsquerda.push([MARGEM, yBorda]);
+            }
+            if (p1[0] <= direita) trechoDireita.push(p1);
+            else trechoEsquerda.push([p1[0] - larguraUtil, p1[1]]);
+        }
+        return [trechoDireita, trechoEsquerda];
+    }
+
+    function renderizar(layout) {
+        var d = decodificar(layout), S = d.S, larguraUtil = S * LARGURA_RANHURA, largura = larguraUtil + 2 * MARGEM;
+        var svg = elemento('svg', {
+            width: largura, height: ALTURA, viewBox: '0 0 ' + largura + ' ' + ALTURA,
+            'font-family': 'sans-serif', 'font-size': 10
+        });
+        svg.appendChild(elemento('text', { x: MARGEM, y: 20, 'font-size': 13, 'font-weight': 'bold' },
+            'S=' + S + '  P=' + layout.P + '  Camada ' + layout.Camada + '  ' + layout.g_type +
+            '  y=' + layout.y + ' (1:' + (layout.y + 1) + ')'));
+
+        for (var k = 0; k < S; k++) {
+            var x = MARGEM + k * LARGURA_RANHURA;
+            svg.appendChild(elemento('rect', {
+                x: x + 3, y: TOPO, width: LARGURA_RANHURA - 6, height: ALTURA_RANHURAS, fill: '#f4f4f4', stroke: '#999999'
+            }));
+            svg.appendChild(elemento('text', {
+                x: x + LARGURA_RANHURA / 2, y: TOPO + ALTURA_RANHURAS + 14, 'text-anchor': 'middle'
+            }, String(k + 1)));
+        }
+
+        var rotulados = {};
+        d.bobinas.forEach(function (bobina, i) {
+            var fase = d.lados[bobina[0]][0], cor = CORES[fase];
+            var xIda = xLado(bobina[0], false, d.dupla), xRetorno = xLado(bobina[1], true, d.dupla);
+            svg.appendChild(polilinha([[xIda, TOPO], [xIda, TOPO + ALTURA_RANHURAS]], cor, false));
+            svg.appendChild(polilinha([[xRetorno, TOPO], [xRetorno, TOPO + ALTURA_RANHURAS]], cor, d.dupla));
+            cabeca(xIda, xRetorno, larguraUtil).forEach(function (trecho) {
+                svg.appendChild(polilinha(trecho, cor, false));
+            });
+
+            var grupo = d.grupoDaBobina[i];
+            if (!rotulados[grupo]) {
+                rotulados[grupo] = true;
+                svg.appendChild(elemento('text', {
+                    x: xIda, y: TOPO - ALTURA_CABECA / 2 - 8, fill: cor, 'font-weight': 'bold'
+                }, fase + grupo));
+            }
+        });
+        return svg;
+    }
+
+    document.querySelectorAll('[data-layout-url]').forEach(function (container) {
+        fetch(container.getAttribute('data-layout-url'))
+            .then(function (resposta) {
+                if (!resposta.ok) throw new Error('HTTP ' + resposta.status);
+                return resposta.json();
+            })
+            .then(function (layout) {
+                if (layout.v !== FORMATO_SUPORTADO) throw new Error('Formato ' + layout.v + ' não suportado');
+                container.replaceChildren(renderizar(layout));
+            })
+            .catch(function (erro) {
+                // Usa o SVG gerado no servidor como alternativa
+                console.warn('Diagrama no cliente indisponível:', erro);
+                var imagem = document.createElement('img');
+                imagem.src = container.getAttribute('data-svg-url');
+                imagem.alt = 'Diagrama de bobinagem';
+                container.replaceChildren(imagem);
+            });
+    });
+})();
@@ -1,3 +1,288 @@
-from django.test import TestCase
+import math
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ThreePhaseCoils.models import MotorConfiguration
+from .cache import caminho_diagrama, chave_diagrama, gerar_svg
+from .compacto import (
+    MAX_REPETICOES, VERSAO_FORMATO, _codificar_sequencias, _decodificar_sequencias, codificar_layout,
+    decodificar_layout
+)
+from .distribuicao import calcular_distribuicao, verificar_zeta
+from . import harmonicos
+from .harmonicos import analisar_harmonicos, analisar_lote
+from .ligacoes import VERSAO_LIGACOES, gerar_ligacoes
+from .roteamento import chave_roteamento, otimizar_roteamento
+
+
+def criar_configuracao():
+    return MotorConfiguration.objects.create(
+        S=36, P=4, g_type='g=P', Camada='dupla', q=Decimal('3'), tipo_q='inteiro',
+        n_bob_info='9', y=8, zeta=Decimal('0.9452'), Classificacao_zeta='excelente',
+        Observacao_passo='recomendado',
+    )
+
+
+PARAMETROS_36_4 = {'S': 36, 'P': 4, 'Camada': 'dupla', 'g_type': 'g=P', 'y': 8}
+
+
+class RoteamentoTests(TestCase):
+    def test_heuristica_deterministica(self):
+        # 12 grupos por fase: busca heurística
+        primeiro = otimizar_roteamento.__wrapped__(72, 12, 'dupla', 'g=P', 5, 2, limite_avaliacoes=300)
+        segundo = otimizar_roteamento.__wrapped__(72, 12, 'dupla', 'g=P', 5, 2, limite_avaliacoes=300)
+        self.assertEqual(primeiro['fases']['A']['metodo'], 'heuristica')
+        self.assertEqual(primeiro, segundo)
+
+    def test_cada_grupo_ligado_uma_vez(self):
+        roteamento = otimizar_roteamento.__wrapped__(72, 12, 'dupla', 'g=P', 5, 2, limite_avaliacoes=300)
+        for fase in roteamento['fases'].values():
+            grupos = [g['grupo'] for c in fase['circuitos'] for g in c['grupos']]
+            self.assertEqual(len(grupos), 12)
+            self.assertEqual(len(set(grupos)), 12)
+            self.assertEqual([len(c['grupos']) for c in fase['circuitos']], [6, 6])
+        self.assertLessEqual(roteamento['comprimento_total_ranhuras'], roteamento['comprimento_sequencial_ranhuras'])
+
+    def test_api_usa_cache_por_configuracao_e_k1(self):
+        criar_configuracao()
+        parametros = {**PARAMETROS_36_4, 'k1': 2}
+        resposta = self.client.get('/api/diagrama/roteamento/', parametros)
+        self.assertEqual(resposta.status_code, 200)
+        chave = chave_roteamento(36, 4, 'dupla', 'g=P', 8, 2)
+        self.assertEqual(resposta['ETag'], f'"{chave}"')
+        self.assertIn('max-age', resposta['Cache-Control'])
+
+        # Outro processo (sem a memória local) responde do cache do Django
+        with mock.patch('ThreePhaseDiagram.roteamento.otimizar_roteamento') as otimizar:
+            repetida = self.client.get('/api/diagrama/roteamento/', parametros)
+            nao_modificada = self.client.get('/api/diagrama/roteamento/', parametros, HTTP_IF_NONE_MATCH=f'"{chave}"')
+        otimizar.assert_not_called()
+        self.assertEqual(repetida.json(), resposta.json())
+        self.assertEqual(nao_modificada.status_code, 304)
+
+        self.assertNotEqual(chave_roteamento(36, 4, 'dupla', 'g=P', 8, 1), chave)
+        self.assertEqual(self.client.get('/api/diagrama/roteamento/', {**PARAMETROS_36_4, 'k1': 5}).status_code, 400)
+
+
+class CacheDiagramasTemporarioMixin:
+    """Cache de diagramas em um diretório temporário por teste."""
+
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        configuracao = override_settings(DIAGRAMA_CACHE_DIR=Path(diretorio.name))
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+
+class DiagramaSvgTests(CacheDiagramasTemporarioMixin, TestCase):
+
+    def test_gera_grava_e_serve_do_cache(self):
+        configuracao = criar_configuracao()
+        chave = chave_diagrama(36, 4, 'dupla', 'g=P', 8)
+
+        resposta = self.client.get('/api/diagrama/svg/', PARAMETROS_36_4)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Content-Type'], 'image/svg+xml')
+        self.assertEqual(resposta['ETag'], f'"{chave}"')
+        self.assertEqual(caminho_diagrama(chave).read_bytes(), resposta.content)
+
+        # Diagramas em cache são servidos sem consultar o catálogo
+        configuracao.delete()
+        em_cache = self.client.get('/api/diagrama/svg/', PARAMETROS_36_4)
+        self.assertEqual(em_cache.status_code, 200)
+        self.assertEqual(em_cache.content, resposta.content)
+
+        nao_modificado = self.client.get('/api/diagrama/svg/', PARAMETROS_36_4, HTTP_IF_NONE_MATCH=f'"{chave}"')
+        self.assertEqual(nao_modificado.status_code, 304)
+
+    def test_erros(self):
+        self.assertEqual(self.client.get('/api/diagrama/svg/', {'S': 36}).status_code, 400)
+        self.assertEqual(self.client.get('/api/diagrama/svg/', PARAMETROS_36_4).status_code, 404)
+
+
+class EstrelaRanhurasTests(TestCase):
+    def test_fator_de_enrolamento_confere_com_o_catalogo(self):
+        criar_configuracao()
+        resposta = self.client.get('/api/diagrama/estrela/', PARAMETROS_36_4)
+        self.assertEqual(resposta.status_code, 200)
+        dados = resposta.json()
+        self.assertTrue(dados['simetrica'])
+        self.assertEqual({f['lados'] for f in dados['fasores'].values()}, {24})
+        self.assertAlmostEqual(dados['fator_enrolamento'], 0.9452, places=3)
+        self.assertTrue(dados['verificacao_zeta']['consistente'])
+
+    def test_divergencia_explicada(self):
+        distribuicao = calcular_distribuicao(36, 4, 'dupla', 'g=P', 8)
+        verificacao = verificar_zeta(distribuicao, 0.9)
+        self.assertFalse(verificacao['consistente'])
+        self.assertEqual(verificacao['motivo'], 'Divergência não explicada pelo tipo de enrolamento')
+
+    def test_fora_do_catalogo_e_erros(self):
+        resposta = self.client.get('/api/diagrama/estrela/', {**PARAMETROS_36_4, 'y': 7})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIsNone(resposta.json()['verificacao_zeta'])
+        self.assertEqual(self.client.get('/api/diagrama/estrela/', {**PARAMETROS_36_4, 'P': 3}).status_code, 400)
+        self.assertEqual(self.client.get('/api/diagrama/estrela/', {**PARAMETROS_36_4, 'Camada': 'tripla'}).status_code, 400)
+
+
+class PreRenderizarDiagramasTests(CacheDiagramasTemporarioMixin, TestCase):
+    def test_renderiza_pendentes_e_ignora_os_em_cache(self):
+        criar_configuracao()
+        saida = StringIO()
+        call_command('pre_renderizar_diagramas', processos=1, stdout=saida)
+        self.assertIn('1 diagramas gravados', saida.getvalue())
+        caminho = caminho_diagrama(chave_diagrama(36, 4, 'dupla', 'g=P', 8))
+        self.assertEqual(caminho.read_bytes(), gerar_svg(36, 4, 'dupla', 'g=P', 8))
+        # Uma única variante por configuração: o diagrama de bobinagem
+        self.assertEqual([p for p in caminho.parent.parent.rglob('*') if p.is_file()], [caminho])
+
+        saida = StringIO()
+        call_command('pre_renderizar_diagramas', processos=1, stdout=saida)
+        self.assertIn('Nenhum diagrama pendente (1 já em cache)', saida.getvalue())
+
+        saida = StringIO()
+        call_command('pre_renderizar_diagramas', processos=1, forcar=True, stdout=saida)
+        self.assertIn('1 diagramas gravados', saida.getvalue())
+
+    def test_filtros(self):
+        criar_configuracao()
+        saida = StringIO()
+        call_command('pre_renderizar_diagramas', P=6, stdout=saida)
+        self.assertIn('Nenhum diagrama pendente (0 já em cache)', saida.getvalue())
+
+
+class HarmonicosTests(TestCase):
+    def test_fatores_iguais_a_kd_vezes_kp(self):
+        # q = 3, α = 20° elétricos, passo 8/9
+        analise = analisar_harmonicos(36, 4, 'dupla', 'g=P', 8)
+        for ordem, fator in analise['fatores_harmonicos'].items():
+            kd = math.sin(ordem * 3 * math.radians(20) / 2) / (3 * math.sin(ordem * math.radians(20) / 2))
+            kp = math.sin(ordem * 8 / 9 * math.pi / 2)
+            self.assertAlmostEqual(fator, abs(kd * kp), places=3, msg=ordem)
+
+    def test_espectro_sem_ordens_pares_nem_triplas(self):
+        espectro = analisar_harmonicos(36, 4, 'dupla', 'g=P', 8)['espectro']
+        self.assertEqual(espectro[0], {'ordem': 1.0, 'amplitude': 1.0})
+        for harmonico in espectro[1:]:
+            self.assertTrue(harmonico['ordem'].is_integer())
+            self.assertNotEqual(harmonico['ordem'] % 2, 0)
+            self.assertNotEqual(harmonico['ordem'] % 3, 0)
+
+    def test_lote_monta_uma_matriz_dft_por_s(self):
+        configuracoes = [
+            (36, 4, 'dupla', 'g=P', 8), (36, 4, 'dupla', 'g=P', 7), (24, 4, 'dupla', 'g=P', 5),
+            (36, 4, 'dupla', 'g=P', 8),
+        ]
+        with mock.patch('ThreePhaseDiagram.harmonicos._matriz_dft', wraps=harmonicos._matriz_dft) as matriz:
+            resultados = analisar_lote(configuracoes)
+        self.assertEqual(sorted(c.args for c in matriz.call_args_list), [(24,), (36,)])
+        self.assertEqual(len(resultados), 3)
+        for parametros, resumo in resultados.items():
+            analise = analisar_harmonicos(*parametros)
+            self.assertEqual(resumo['fatores_harmonicos'], analise['fatores_harmonicos'])
+            self.assertEqual(resumo['distorcao_fmm'], analise['distorcao_fmm'])
+
+    def test_api_passos_inclui_fatores_harmonicos(self):
+        criar_configuracao()
+        resposta = self.client.get('/api/passos/', {'S': 36, 'P': 4, 'Camada': 'dupla', 'g_type': 'g=P'})
+        passo, = resposta.json()['passos']
+        self.assertEqual(
+            passo['fatores_harmonicos'],
+            {str(o): f for o, f in analisar_harmonicos(36, 4, 'dupla', 'g=P', 8)['fatores_harmonicos'].items()}
+        )
+
+    def test_api_harmonicos(self):
+        self.assertEqual(self.client.get('/api/diagrama/harmonicos/', PARAMETROS_36_4).status_code, 404)
+        criar_configuracao()
+        resposta = self.client.get('/api/diagrama/harmonicos/', PARAMETROS_36_4)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn('distorcao_fmm', resposta.json())
+
+
+class LigacoesTests(TestCase):
+    def test_cada_circuito_vai_do_inicio_ao_fim_da_fase(self):
+        for g_type in ('g=P', 'g=P/2'):
+            netlist = gerar_ligacoes(8, 2, g_type)
+            for fase in netlist['fases'].values():
+                grupos = [g['grupo'] for c in fase['circuitos'] for g in c['grupos']]
+                self.assertEqual(sorted(grupos), list(range(1, 9)))
+                for circuito in fase['circuitos']:
+                    ligacoes = circuito['ligacoes']
+                    self.assertEqual(ligacoes[0]['de'], fase['terminais']['inicio'])
+                    self.assertEqual(ligacoes[-1]['para'], fase['terminais']['fim'])
+                    # Cada grupo é percorrido da entrada à saída antes da próxima ligação
+                    for grupo, anterior, seguinte in zip(circuito['grupos'], ligacoes, ligacoes[1:]):
+                        self.assertEqual(anterior['para'], grupo['entrada'])
+                        self.assertEqual(seguinte['de'], grupo['saida'])
+
+    def test_sentido_dos_grupos(self):
+        sentidos = [g['sentido'] for g in gerar_ligacoes(4, 1, 'g=P')['fases']['A']['circuitos'][0]['grupos']]
+        self.assertEqual(sentidos, ['direto', 'invertido', 'direto', 'invertido'])
+        sentidos = {g['sentido'] for g in gerar_ligacoes(4, 1, 'g=P/2')['fases']['A']['circuitos'][0]['grupos']}
+        self.assertEqual(sentidos, {'direto'})
+
+    def test_parametros_invalidos(self):
+        with self.assertRaises(ValueError):
+            gerar_ligacoes(4, 3, 'g=P')
+        with self.assertRaises(ValueError):
+            gerar_ligacoes(4, 1, 'g=2P')
+        self.assertEqual(self.client.get('/api/diagrama/ligacoes/', {'num_grupos': 4, 'k1': 3, 'g_type': 'g=P'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/diagrama/ligacoes/', {'num_grupos': 'x', 'g_type': 'g=P'}).status_code, 400)
+
+    def test_api_e_folha_svg(self):
+        resposta = self.client.get('/api/diagrama/ligacoes/', {'num_grupos': 4, 'k1': 2, 'g_type': 'g=P'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['grupos_serie'], 2)
+
+        svg = self.client.get('/api/diagrama/ligacoes/svg/', {'num_grupos': 4, 'k1': 2, 'g_type': 'g=P/2'})
+        self.assertEqual(svg['Content-Type'], 'image/svg+xml')
+        self.assertEqual(svg['ETag'], f'"{VERSAO_LIGACOES}-4-2-g=P_2"')
+        nao_modificado = self.client.get(
+            '/api/diagrama/ligacoes/svg/', {'num_grupos': 4, 'k1': 2, 'g_type': 'g=P/2'}, HTTP_IF_NONE_MATCH=svg['ETag']
+        )
+        self.assertEqual(nao_modificado.status_code, 304)
+
+
+class LayoutCompactoTests(TestCase):
+    def test_ida_e_volta_reconstroi_a_distribuicao(self):
+        for parametros in (
+            (36, 4, 'dupla', 'g=P', 8), (36, 4, 'dupla', 'g=P/2', 8), (27, 4, 'dupla', 'g=P', 6),
+            (24, 4, 'única', 'g=P', 6), (24, 4, 'única', 'g=P/2', 6), (48, 4, 'única', 'g=P', 12),
+        ):
+            distribuicao = calcular_distribuicao(*parametros)
+            layout = decodificar_layout(codificar_layout(*parametros))
+            self.assertEqual(layout['bobinas'], distribuicao['bobinas'], parametros)
+            self.assertEqual(
+                layout['ranhuras'],
+                [{k: v for k, v in r.items() if k != 'angulo'} for r in distribuicao['ranhuras']],
+                parametros
+            )
+            self.assertEqual(
+                layout['grupos'],
+                {g['numero']: sorted(g['bobinas']) for g in distribuicao['grupos']},
+                parametros
+            )
+
+    def test_sequencias_longas(self):
+        codigos = [0] * (2 * MAX_REPETICOES + 3) + [5] + [2] * MAX_REPETICOES
+        dados = _codificar_sequencias(codigos)
+        self.assertEqual(len(dados), 5)
+        self.assertTrue(all(0 <= byte <= 255 for byte in dados))
+        self.assertEqual(_decodificar_sequencias(dados), codigos)
+
+    def test_cache_pela_versao_do_formato(self):
+        criar_configuracao()
+        resposta = self.client.get('/api/diagrama/layout/', {**PARAMETROS_36_4, 'v': VERSAO_FORMATO})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn('immutable', resposta['Cache-Control'])
+        nao_versionado = self.client.get('/api/diagrama/layout/', PARAMETROS_36_4)
+        self.assertNotIn('immutable', nao_versionado['Cache-Control'])
+        nao_modificado = self.client.get('/api/diagrama/layout/', PARAMETROS_36_4, HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual(nao_modificado.status_code, 304)
@@ -1,6 +1,16 @@
 from django.urls import path
-from .views import diagrama
+from .views import (
+    api_estrela_ranhuras, api_harmonicos, api_ligacoes, api_roteamento, diagrama, diagrama_svg,
+    layout_compacto, ligacoes_svg
+)
 
 urlpatterns = [
-    path('diagrama/', diagrama, name='diagrama'), 
-]
\ No newline at end of file
+    path('diagrama/', diagrama, name='diagrama'),
+    path('api/diagrama/svg/', diagrama_svg, name='diagrama_svg'),
+    path('api/diagrama/layout/', layout_compacto, name='layout_compacto'),
+    path('api/diagrama/estrela/', api_estrela_ranhuras, name='api_estrela_ranhuras'),
+    path('api/diagrama/harmonicos/', api_harmonicos, name='api_harmonicos'),
+    path('api/diagrama/ligacoes/', api_ligacoes, name='api_ligacoes'),
+    path('api/diagrama/ligacoes/svg/', ligacoes_svg, name='ligacoes_svg'),
+    path('api/diagrama/roteamento/', api_roteamento, name='api_roteamento'),
+]
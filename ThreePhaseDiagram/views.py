@@ -1,6 +1,322 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
 from django.shortcuts import render
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_http_methods
+
+from ThreePhaseCoils.models import MotorConfiguration
+from .cache import chave_diagrama, ler_diagrama_em_cache, obter_diagrama_svg
+from .compacto import VERSAO_FORMATO, codificar_layout
+from .distribuicao import calcular_distribuicao, verificar_zeta
+from .harmonicos import analisar_harmonicos
+from .ligacoes import VERSAO_LIGACOES, gerar_ligacoes, renderizar_ligacoes_svg
+from .roteamento import roteamento_em_cache
+
+# Tempo de cache HTTP dos diagramas (o conteúdo de uma chave nunca muda)
+CACHE_DIAGRAMA_SEGUNDOS = 60 * 60 * 24
+
+# Layouts compactos pedidos com a versão do formato na URL podem ficar um ano no navegador
+CACHE_LAYOUT_VERSIONADO_SEGUNDOS = 60 * 60 * 24 * 365
+
+PARAMETROS_DIAGRAMA = ('S', 'P', 'Camada', 'g_type', 'y')
+
+# Limite de grupos por fase aceito pelas APIs de ligação (P máximo usual)
+MAX_GRUPOS_FASE = 48
+
+# Limite de ranhuras aceito pela API da estrela de ranhuras (configurações fora do catálogo)
+MAX_RANHURAS = 240
+
+
+def _ler_parametros(dados):
+    """
+    Lê e converte os parâmetros da configuração.
+    Retorna (S, P, Camada, g_type, y) ou levanta ValueError com a mensagem de erro.
+    """
+    valores = [dados.get(nome) for nome in PARAMETROS_DIAGRAMA]
+    if not all(valores):
+        raise ValueError('Parâmetros S, P, Camada, g_type e y obrigatórios')
+    S, P, Camada, g_type, y = valores
+    try:
+        return int(S), int(P), Camada, g_type, int(y)
+    except ValueError:
+        raise ValueError('S, P e y devem ser números inteiros')
+
+
+def _configuracao_existe(S, P, Camada, g_type, y):
+    return MotorConfiguration.objects.filter(
+        S=S, P=P, Camada=Camada, g_type=g_type, y=y
+    ).exists()
+
+
+def _resposta_svg(chave, svg):
+    resposta = HttpResponse(svg, content_type='image/svg+xml')
+    resposta['ETag'] = f'"{chave}"'
+    patch_cache_control(resposta, public=True, max_age=CACHE_DIAGRAMA_SEGUNDOS)
+    return resposta
 
 
 def diagrama(request):
-    """View para a página inicial"""
-    return render(request, 'diagrama.html')
\ No newline at end of file
+    """View da página do diagrama de bobinagem"""
+    configuracoes = MotorConfiguration.objects.all()
+    contexto = {
+        'opcoes_S': configuracoes.values_list('S', flat=True).distinct().order_by('S'),
+        'opcoes_P': configuracoes.values_list('P', flat=True).distinct().order_by('P'),
+        'opcoes_camada': MotorConfiguration.CAMADA_CHOICES,
+        'opcoes_g_type': MotorConfiguration.G_TYPE_CHOICES,
+        'selecionado': {nome: request.GET.get(nome, '') for nome in PARAMETROS_DIAGRAMA},
+    }
+
+    if any(request.GET.get(nome) for nome in PARAMETROS_DIAGRAMA):
+        try:
+            parametros = _ler_parametros(request.GET)
+        except ValueError as e:
+            contexto['erro'] = str(e)
+        else:
+            if _configuracao_existe(*parametros):
+                consulta = dict(zip(PARAMETROS_DIAGRAMA, parametros))
+                contexto['svg_url'] = '{}?{}'.format(reverse('diagrama_svg'), urlencode(consulta))
+                contexto['layout_url'] = '{}?{}'.format(
+                    reverse('layout_compacto'), urlencode({**consulta, 'v': VERSAO_FORMATO})
+                )
+            else:
+                contexto['erro'] = 'Configuração não encontrada no catálogo'
+
+    return render(request, 'diagrama.html', contexto)
+
+
+@require_http_methods(["GET"])
+def diagrama_svg(request):
+    """
+    Diagrama planificado de bobinagem em SVG.
+
+    Parâmetros:
+        - S, P, Camada, g_type, y
+
+    Retorna:
+        SVG do diagrama; diagramas já gerados são servidos do cache em disco
+        sem consultar o banco. Suporta If-None-Match (ETag = chave do diagrama).
+    """
+    try:
+        parametros = _ler_parametros(request.GET)
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+
+    chave = chave_diagrama(*parametros)
+    if request.headers.get('If-None-Match') == f'"{chave}"':
+        resposta = HttpResponseNotModified()
+        resposta['ETag'] = f'"{chave}"'
+        return resposta
+
+    svg = ler_diagrama_em_cache(chave)
+    if svg is None:
+        if not _configuracao_existe(*parametros):
+            return JsonResponse({'erro': 'Configuração não encontrada no catálogo'}, status=404)
+        chave, svg = obter_diagrama_svg(*parametros)
+
+    return _resposta_svg(chave, svg)
+
+
+@require_http_methods(["GET"])
+def api_estrela_ranhuras(request):
+    """
+    API da estrela de ranhuras: fase, polaridade e camada de cada ranhura.
+
+    Parâmetros:
+        - S, P, Camada, g_type, y (a configuração não precisa estar no catálogo)
+
+    Retorna:
+        JSON com a tabela de ranhuras, bobinas, grupos, somas fasoriais por fase,
+        fator de enrolamento e, se a configuração estiver no catálogo, a
+        comparação com o zeta armazenado
+    """
+    try:
+        S, P, Camada, g_type, y = _ler_parametros(request.GET)
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+
+    if Camada not in dict(MotorConfiguration.CAMADA_CHOICES) or g_type not in dict(MotorConfiguration.G_TYPE_CHOICES):
+        return JsonResponse({'erro': 'Camada ou g_type inválido'}, status=400)
+    if not (3 <= S <= MAX_RANHURAS) or P < 2 or P % 2 or not (1 <= y < S):
+        return JsonResponse({
+            'erro': f'Requer 3 ≤ S ≤ {MAX_RANHURAS}, P par ≥ 2 e 1 ≤ y < S'
+        }, status=400)
+
+    try:
+        distribuicao = calcular_distribuicao(S, P, Camada, g_type, y)
+    except ValueError as e:
+        return JsonResponse({'erro': f'Configuração inviável: {e}'}, status=400)
+
+    config = MotorConfiguration.objects.filter(
+        S=S, P=P, Camada=Camada, g_type=g_type, y=y
+    ).only('zeta').first()
+
+    return JsonResponse({
+        **distribuicao,
+        'verificacao_zeta': verificar_zeta(distribuicao, float(config.zeta)) if config else None,
+    })
+
+
+@require_http_methods(["GET"])
+def api_harmonicos(request):
+    """
+    API da análise harmônica da FMM de uma configuração do catálogo.
+
+    Parâmetros:
+        - S, P, Camada, g_type, y
+
+    Retorna:
+        JSON com o espectro da FMM (ordens elétricas, amplitude relativa à
+        fundamental), os fatores de enrolamento dos harmônicos 5, 7, 11 e 13
+        e a distorção total da FMM
+    """
+    try:
+        parametros = _ler_parametros(request.GET)
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+
+    if not _configuracao_existe(*parametros):
+        return JsonResponse({'erro': 'Configuração não encontrada no catálogo'}, status=404)
+
+    return JsonResponse({
+        **dict(zip(PARAMETROS_DIAGRAMA, parametros)),
+        **analisar_harmonicos(*parametros),
+    })
+
+
+def _ler_parametros_ligacoes(dados):
+    """
+    Lê os parâmetros da folha de ligações.
+    Retorna (num_grupos, k1, g_type) ou levanta ValueError com a mensagem de erro.
+    """
+    try:
+        num_grupos = int(dados.get('num_grupos', ''))
+        k1 = int(dados.get('k1', 1))
+    except ValueError:
+        raise ValueError('num_grupos e k1 devem ser números inteiros')
+    if num_grupos > MAX_GRUPOS_FASE:
+        raise ValueError(f'num_grupos deve ser no máximo {MAX_GRUPOS_FASE}')
+    return num_grupos, k1, dados.get('g_type', '')
+
+
+@require_http_methods(["GET"])
+def api_ligacoes(request):
+    """
+    API do esquema de ligação dos grupos (netlist).
+
+    Parâmetros:
+        - num_grupos (int): Grupos por fase
+        - k1 (int, opcional): Circuitos paralelos (padrão: 1)
+        - g_type (str): 'g=P' ou 'g=P/2'
+
+    Retorna:
+        JSON com os circuitos de cada fase (grupos, sentido e ligações) e a lista de conexões
+    """
+    try:
+        netlist = gerar_ligacoes(*_ler_parametros_ligacoes(request.GET))
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+
+    resposta = JsonResponse(netlist)
+    patch_cache_control(resposta, public=True, max_age=CACHE_DIAGRAMA_SEGUNDOS)
+    return resposta
+
+
+@require_http_methods(["GET"])
+def ligacoes_svg(request):
+    """
+    Folha de ligações em SVG.
+
+    Parâmetros:
+        - num_grupos, k1, g_type (como em api_ligacoes)
+    """
+    try:
+        parametros = _ler_parametros_ligacoes(request.GET)
+        svg = renderizar_ligacoes_svg(*parametros)
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+
+    chave = '{}-{}-{}-{}'.format(VERSAO_LIGACOES, *parametros).replace('/', '_')
+    if request.headers.get('If-None-Match') == f'"{chave}"':
+        resposta = HttpResponseNotModified()
+        resposta['ETag'] = f'"{chave}"'
+        return resposta
+    return _resposta_svg(chave, svg)
+
+
+@require_http_methods(["GET"])
+def api_roteamento(request):
+    """
+    API do roteamento otimizado dos jumpers entre grupos.
+
+    Parâmetros:
+        - S, P, Camada, g_type, y
+        - k1 (int, opcional): Circuitos paralelos por fase (padrão: 1)
+        - terminais (int, opcional): Ranhura junto à caixa de ligação (padrão: 1)
+
+    Retorna:
+        JSON com os circuitos de cada fase (ordem dos grupos e ranhuras de
+        entrada/saída), os jumpers e o comprimento total comparado à ligação sequencial
+    """
+    try:
+        parametros = _ler_parametros(request.GET)
+        k1 = int(request.GET.get('k1', 1))
+        terminais = int(request.GET.get('terminais', 1))
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+
+    if not _configuracao_existe(*parametros):
+        return JsonResponse({'erro': 'Configuração não encontrada no catálogo'}, status=404)
+    if not (1 <= terminais <= parametros[0]):
+        return JsonResponse({'erro': 'terminais deve ser uma ranhura entre 1 e S'}, status=400)
+
+    try:
+        chave, roteamento = roteamento_em_cache(*parametros, k1, posicao_terminais=terminais)
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+
+    if request.headers.get('If-None-Match') == f'"{chave}"':
+        resposta = HttpResponseNotModified()
+    else:
+        resposta = JsonResponse(roteamento)
+    resposta['ETag'] = f'"{chave}"'
+    patch_cache_control(resposta, public=True, max_age=CACHE_DIAGRAMA_SEGUNDOS)
+    return resposta
+
+
+@require_http_methods(["GET"])
+def layout_compacto(request):
+    """
+    Distribuição das bobinas no formato compacto, para renderização no navegador.
+
+    Parâmetros:
+        - S, P, Camada, g_type, y
+        - v (int, opcional): Versão do formato esperada pelo cliente; quando
+          igual à atual, a resposta pode ficar em cache por um ano
+
+    Retorna:
+        JSON compacto (ver ThreePhaseDiagram.compacto)
+    """
+    try:
+        parametros = _ler_parametros(request.GET)
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+
+    if not _configuracao_existe(*parametros):
+        return JsonResponse({'erro': 'Configuração não encontrada no catálogo'}, status=404)
+
+    conteudo = codificar_layout(*parametros)
+    etag = f'"{hashlib.sha256(conteudo).hexdigest()[:32]}"'
+    if request.headers.get('If-None-Match') == etag:
+        resposta = HttpResponseNotModified()
+    else:
+        resposta = HttpResponse(conteudo, content_type='application/json')
+
+    resposta['ETag'] = etag
+    if request.GET.get('v') == str(VERSAO_FORMATO):
+        patch_cache_control(resposta, public=True, max_age=CACHE_LAYOUT_VERSIONADO_SEGUNDOS, immutable=True)
+    else:
+        patch_cache_control(resposta, public=True, max_age=CACHE_DIAGRAMA_SEGUNDOS)
+    return resposta
@@ -0,0 +1,188 @@
+"""
+Tabela de carcaças padronizadas (IEC 60072-1) e índice de busca por potência.
+
+A tabela é única para todo o app: o cálculo de potência por dimensões, a
+consulta por carcaça e o formulário de seleção derivam dela. O índice é
+montado uma única vez na importação do módulo.
+"""
+import bisect
+
+
+# TABELA 21: faixas de potência (kW) por carcaça e número de polos
+# Formato: {carcaca: {polos: (potencia_min_kw, potencia_max_kw)}}
+TABELA_CARCACAS = {
+    '63': {2: (0.12, 0.75), 4: (0.12, 0.75)},
+    '71': {2: (0.75, 1.1), 4: (0.75, 1.1)},
+    '80': {2: (1.1, 1.5), 4: (0.75, 1.1)},
+    '90S': {2: (1.5, 2.2), 4: (1.1, 1.5), 6: (0.75, 1.1), 8: (0.55, 0.75)},
+    '90L': {2: (2.2, 3.0), 4: (1.5, 2.2), 6: (1.1, 1.5), 8: (0.75, 1.1)},
+    '100L': {2: (3.0, 4.0), 4: (2.2, 3.0), 6: (1.5, 2.2), 8: (1.1, 1.5),
+             10: (0.75, 1.1), 12: (0.55, 0.75)},
+    '112M': {2: (4.0, 5.5), 4: (3.0, 4.0), 6: (2.2, 3.0), 8: (1.5, 2.2),
+             10: (1.1, 1.5), 12: (0.75, 1.1)},
+    '132S': {2: (5.5, 7.5), 4: (4.0, 5.5), 6: (3.0, 4.0), 8: (2.2, 3.0),
+             10: (1.5, 2.2), 12: (1.1, 1.5)},
+    '132M': {2: (7.5, 11.0), 4: (5.5, 7.5), 6: (4.0, 5.5), 8: (3.0, 4.0),
+             10: (2.2, 3.0), 12: (1.5, 2.2)},
+    '160M': {2: (11.0, 15.0), 4: (7.5, 11.0), 6: (5.5, 7.5), 8: (4.0, 5.5),
+             10: (3.0, 4.0), 12: (2.2, 3.0)},
+    '160L': {2: (15.0, 18.5), 4: (11.0, 15.0), 6: (7.5, 11.0), 8: (5.5, 7.5),
+             10: (4.0, 5.5), 12: (3.0, 4.0)},
+    '180M': {2: (18.5, 22.0), 4: (15.0, 18.5), 6: (11.0, 15.0), 8: (7.5, 11.0),
+             10: (5.5, 7.5), 12: (4.0, 5.5)},
+    '180L': {2: (22.0, 30.0), 4: (18.5, 22.0), 6: (15.0, 18.5), 8: (11.0, 15.0),
+             10: (7.5, 11.0), 12: (5.5, 7.5)},
+    '200L': {2: (30.0, 37.0), 4: (22.0, 30.0), 6: (18.5, 22.0), 8: (15.0, 18.5),
+             10: (11.0, 15.0), 12: (7.5, 11.0)},
+    '225S/M': {2: (37.0, 55.0), 4: (30.0, 45.0), 6: (22.0, 37.0), 8: (18.5, 30.0),
+               10: (15.0, 22.0), 12: (11.0, 15.0)},
+    '250S/M': {2: (55.0, 75.0), 4: (45.0, 60.0), 6: (30.0, 45.0), 8: (22.0, 37.0),
+               10: (18.5, 30.0), 12: (15.0, 18.5)},
+    '280S/M': {2: (75.0, 110.0), 4: (60.0, 90.0), 6: (45.0, 75.0), 8: (30.0, 55.0),
+               10: (22.0, 37.0), 12: (18.5, 22.0)},
+    '315S/M': {2: (110.0, 160.0), 4: (90.0, 132.0), 6: (75.0, 110.0), 8: (55.0, 90.0),
+               10: (30.0, 55.0), 12: (22.0, 30.0)},
+    '355M/L': {2: (160.0, 250.0), 4: (132.0, 200.0), 6: (110.0, 160.0), 8: (75.0, 132.0),
+               10: (37.0, 75.0), 12: (30.0, 45.0)},
+    '355A/B': {2: (250.0, 315.0), 4: (200.0, 250.0), 6: (160.0, 200.0), 8: (110.0, 160.0),
+               10: (55.0, 110.0), 12: (37.0, 55.0)},
+    '400': {2: (250.0, 500.0), 4: (200.0, 400.0), 6: (160.0, 315.0), 8: (110.0, 250.0),
+            10: (75.0, 160.0), 12: (55.0, 90.0)}
+}
+
+# Choices do formulário de seleção de carcaça, na ordem da tabela
+CARCACA_CHOICES = [(carcaca, f'Carcaça {carcaca}') for carcaca in TABELA_CARCACAS]
+
+
+class _IndicePolos:
+    """
+    Faixas de potência de um número de polos, ordenadas pela potência mínima.
+
+    Como as faixas da tabela crescem junto com a carcaça (mínimos e máximos
+    não decrescentes), as carcaças que cobrem uma potência formam um trecho
+    contíguo da lista, localizado com duas buscas binárias.
+    """
+
+    def __init__(self, faixas):
+        faixas = sorted(faixas, key=lambda f: (f[1], f[2]))
+        self.carcacas = [f[0] for f in faixas]
+        self.minimos = [f[1] for f in faixas]
+        self.maximos = [f[2] for f in faixas]
+        self.centros = [(f[1] + f[2]) / 2 for f in faixas]
+        self.faixas_kw = [f'{f[1]}-{f[2]}' for f in faixas]
+        self.maximos_ordenados = self.maximos == sorted(self.maximos)
+        self.centros_ordenados = self.centros == sorted(self.centros)
+
+    def cobrindo(self, p_kw):
+        """Retorna as posições das carcaças cuja faixa contém p_kw."""
+        fim = bisect.bisect_right(self.minimos, p_kw)
+        if self.maximos_ordenados:
+            return range(bisect.bisect_left(self.maximos, p_kw, 0, fim), fim)
+        return [i for i in range(fim) if self.maximos[i] >= p_kw]
+
+    def mais_proxima(self, p_kw):
+        """Retorna a posição da carcaça com centro de faixa mais próximo de p_kw."""
+        if self.centros_ordenados:
+            i = bisect.bisect_left(self.centros, p_kw)
+            candidatas = range(max(i - 1, 0), min(i + 1, len(self.centros)))
+        else:
+            candidatas = range(len(self.centros))
+        return min(candidatas, key=lambda j: abs(p_kw - self.centros[j]))
+
+
+def _montar_indice(tabela):
+    faixas_por_polos = {}
+    for carcaca, dados_polos in tabela.items():
+        for polos, (min_kw, max_kw) in dados_polos.items():
+            faixas_por_polos.setdefault(polos, []).append((carcaca, min_kw, max_kw))
+    return {polos: _IndicePolos(faixas) for polos, faixas in faixas_por_polos.items()}
+
+
+# Índice {polos: _IndicePolos} montado uma única vez
+INDICE_POR_POLOS = _montar_indice(TABELA_CARCACAS)
+
+
+def carcacas_para_potencia(p_kw, polos):
+    """
+    Retorna as carcaças cuja faixa cobre a potência informada.
+
+    Returns:
+        list: [(carcaca, min_kw, max_kw), ...] em ordem crescente de carcaça
+    """
+    indice = INDICE_POR_POLOS.get(polos)
+    if indice is None:
+        return []
+    return [
+        (indice.carcacas[i], indice.minimos[i], indice.maximos[i])
+        for i in indice.cobrindo(p_kw)
+    ]
+
+
+def carcaca_mais_proxima(p_kw, polos):
+    """
+    Retorna a carcaça cujo centro de faixa está mais próximo da potência.
+
+    Returns:
+        tuple: (carcaca, min_kw, max_kw, diferenca_kw) ou None se não houver
+        carcaças para o número de polos
+    """
+    indice = INDICE_POR_POLOS.get(polos)
+    if indice is None:
+        return None
+    i = indice.mais_proxima(p_kw)
+    return (indice.carcacas[i], indice.minimos[i], indice.maximos[i],
+            abs(p_kw - indice.centros[i]))
+
+
+def obter_faixas_carcaca(carcaca):
+    """
+    Busca reversa: retorna as faixas {polos: (min_kw, max_kw)} de uma carcaça
+    ou None se a carcaça não existir.
+    """
+    return TABELA_CARCACAS.get(carcaca)
+
+
+def avaliar_carcacas(p_kw, polos):
+    """
+    Avalia quais carcaças padronizadas atendem a potência estimada.
+
+    Returns:
+        dict: {'sugestoes': [...], 'inconsistencia': str ou None}
+    """
+    sugestoes = []
+    inconsistencia = None
+    indice = INDICE_POR_POLOS.get(polos)
+
+    if indice is None:
+        inconsistencia = f'Inconsistência: Nenhuma carcaça padrão encontrada para {polos} polos e {p_kw:.1f} kW'
+        return {'sugestoes': sugestoes, 'inconsistencia': inconsistencia}
+
+    for i in indice.cobrindo(p_kw):
+        carcaca = indice.carcacas[i]
+        min_p, max_p = indice.minimos[i], indice.maximos[i]
+        potencia_sugerida = round(max(min_p, min(max_p, p_kw)), 1)
+        sugestoes.append({
+            'carcaça': carcaca,
+            'faixa_kw': indice.faixas_kw[i],
+            'sugestão': f'Modelo {carcaca}: potência nominal sugerida {potencia_sugerida} kW baseada na norma IEC 60072-1'
+        })
+
+    if not sugestoes:
+        i = indice.mais_proxima(p_kw)
+        carcaca_proxima = indice.carcacas[i]
+        faixa_proxima = indice.faixas_kw[i]
+        diff_min = abs(p_kw - indice.centros[i])
+        diff_percent = (diff_min / p_kw) * 100 if p_kw > 0 else 0
+        if diff_percent > 20:
+            inconsistencia = f'Inconsistência: Potência estimada ({p_kw:.1f} kW) fora da faixa padrão para {polos} polos (próxima: {carcaca_proxima}, {faixa_proxima} kW; diferença ~{diff_percent:.0f}%)'
+        else:
+            sugestoes.append({
+                'carcaça': carcaca_proxima,
+                'faixa_kw': faixa_proxima,
+                'sugestão': f'Próximo modelo WEG W22 {carcaca_proxima}: verifique faixa {faixa_proxima} kW'
+            })
+
+    return {
+        'sugestoes': sugestoes,
+        'inconsistencia': inconsistencia
+    }
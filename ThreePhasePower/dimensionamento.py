@@ -0,0 +1,138 @@
+"""
+Dimensionamento inverso: dimensões de núcleo (D, L) para uma potência desejada.
+
+É o inverso de calcular_potencia_motor. Para cada diâmetro da grade, a potência
+cresce monotonicamente com o comprimento (K é uma função degrau não decrescente
+do volume D²×L), então o comprimento que atinge uma potência é obtido de forma
+exata faixa a faixa de K, sem busca iterativa.
+"""
+from functools import lru_cache
+
+from .views import (
+    COEFICIENTES_K, FATOR_POLOS, LIMITES_VOLUME_K, calcular_potencia_lote
+)
+
+
+# Grade de núcleos padronizados (mm): passos usuais de diâmetro e de pacote
+DIAMETROS_PADRAO_MM = list(range(40, 100, 5)) + list(range(100, 410, 10))
+COMPRIMENTOS_PADRAO_MM = list(range(20, 605, 5))
+
+# Relação L/D aceitável para um núcleo de motor de indução
+RELACAO_L_D_MIN = 0.3
+RELACAO_L_D_MAX = 3.0
+
+# Tolerância padrão da potência obtida em relação à desejada
+TOLERANCIA_PADRAO = 0.10
+
+# Quantidade máxima de núcleos padronizados retornados no ranking
+MAX_NUCLEOS_SUGERIDOS = 20
+
+
+def comprimento_para_potencia(potencia_kw, diametro_mm, polos, frequencia):
+    """
+    Retorna o menor comprimento (mm) que atinge a potência com o diâmetro dado.
+
+    Percorre as faixas de volume de K em ordem crescente; na primeira faixa
+    cujo limite superior ultrapassa o comprimento calculado com aquele K, o
+    resultado é esse comprimento (ou o início da faixa, se a potência cair no
+    salto entre duas faixas).
+    """
+    n_s = (120 * frequencia) / polos
+    fator_polos = FATOR_POLOS.get(polos, 1.0)
+    D_m = diametro_mm / 1000
+    # Potência (kW) por unidade de K e por metro de comprimento
+    kw_por_k_metro = (D_m ** 2) * n_s * fator_polos / 1000
+
+    limites = [0] + LIMITES_VOLUME_K + [float('inf')]
+    for i, K in enumerate(COEFICIENTES_K):
+        L_inicio = limites[i] / diametro_mm ** 2
+        L_fim = limites[i + 1] / diametro_mm ** 2
+        L_mm = potencia_kw / (K * kw_por_k_metro) * 1000
+        if L_mm < L_fim:
+            return max(L_mm, L_inicio)
+    return None
+
+
+def _relacao_valida(diametro_mm, comprimento_mm):
+    relacao = comprimento_mm / diametro_mm
+    return RELACAO_L_D_MIN <= relacao <= RELACAO_L_D_MAX
+
+
+@lru_cache(maxsize=256)
+def dimensionar_nucleo(potencia_kw, polos, frequencia=60, tolerancia=TOLERANCIA_PADRAO):
+    """
+    Calcula a região viável (D, L) e os núcleos padronizados para uma potência.
+
+    Args:
+        potencia_kw (float): Potência desejada em kW
+        polos (int): Número de polos
+        frequencia (int): Frequência da rede em Hz
+        tolerancia (float): Desvio relativo aceito na potência (ex.: 0.10)
+
+    Returns:
+        dict: {'regiao': [...], 'nucleos': [...]} — a região traz, por diâmetro,
+        a faixa de comprimentos que atende a tolerância; os núcleos vêm
+        ordenados pelo erro de potência e, em empate, pelo menor volume.
+        O resultado é memorizado e não deve ser modificado.
+    """
+    potencia_min = potencia_kw * (1 - tolerancia)
+    potencia_max = potencia_kw * (1 + tolerancia)
+
+    # 1. Grade de diâmetros com solução exata do comprimento por faixa de K
+    regiao = []
+    for D in DIAMETROS_PADRAO_MM:
+        L_min = comprimento_para_potencia(potencia_min, D, polos, frequencia)
+        L_ideal = comprimento_para_potencia(potencia_kw, D, polos, frequencia)
+        L_max = comprimento_para_potencia(potencia_max, D, polos, frequencia)
+        if L_min is None or L_max is None:
+            continue
+        if not (_relacao_valida(D, L_min) or _relacao_valida(D, L_max)):
+            continue
+        regiao.append({
+            'diametro_mm': D,
+            'comprimento_min_mm': round(L_min, 1),
+            'comprimento_ideal_mm': round(L_ideal, 1),
+            'comprimento_max_mm': round(L_max, 1),
+        })
+
+    # 2. Núcleos padronizados dentro da região, avaliados em lote
+    candidatos = [
+        (faixa['diametro_mm'], L)
+        for faixa in regiao
+        for L in COMPRIMENTOS_PADRAO_MM
+        if faixa['comprimento_min_mm'] <= L <= faixa['comprimento_max_mm']
+        and _relacao_valida(faixa['diametro_mm'], L)
+    ]
+
+    nucleos = []
+    if candidatos:
+        resultados = calcular_potencia_lote(
+            [D for D, _ in candidatos],
+            [L for _, L in candidatos],
+            [polos] * len(candidatos),
+            [frequencia] * len(candidatos),
+        )
+        for (D, L), resultado in zip(candidatos, resultados):
+            erro = (resultado['potencia_kw'] - potencia_kw) / potencia_kw
+            if potencia_min <= resultado['potencia_kw'] <= potencia_max:
+                nucleos.append({
+                    'diametro_mm': D,
+                    'comprimento_mm': L,
+                    'potencia_kw': resultado['potencia_kw'],
+                    'potencia_cv': resultado['potencia_cv'],
+                    'coeficiente_k': resultado['coeficiente_k'],
+                    'relacao_l_d': round(L / D, 2),
+                    'erro_percentual': round(erro * 100, 2),
+                    'carcacas': [s['carcaça'] for s in resultado['avaliacao_carcaça']['sugestoes']],
+                })
+        nucleos.sort(key=lambda n: (abs(n['erro_percentual']), n['diametro_mm'] ** 2 * n['comprimento_mm']))
+
+    return {
+        'potencia_kw': potencia_kw,
+        'polos': polos,
+        'frequencia': frequencia,
+        'velocidade_sincrona': round((120 * frequencia) / polos, 1),
+        'tolerancia': tolerancia,
+        'regiao': regiao,
+        'nucleos': nucleos[:MAX_NUCLEOS_SUGERIDOS],
+    }
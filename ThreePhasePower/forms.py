@@ -1,5 +1,6 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from .carcacas import CARCACA_CHOICES
 
 class MotorCalculoForm(forms.Form):
     POLOS_CHOICES = [
@@ -51,29 +52,7 @@ class MotorCalculoForm(forms.Form):
 
 class CarcacaSelecaoForm(forms.Form):
     """Formulário para seleção de carcaça e visualização de potências por número de polos"""
-    CARCACA_CHOICES = [
-        ('63', 'Carcaça 63'),
-        ('71', 'Carcaça 71'),
-        ('80', 'Carcaça 80'),
-        ('90S', 'Carcaça 90S'),
-        ('90L', 'Carcaça 90L'),
-        ('100L', 'Carcaça 100L'),
-        ('112M', 'Carcaça 112M'),
-        ('132S', 'Carcaça 132S'),
-        ('132M', 'Carcaça 132M'),
-        ('160M', 'Carcaça 160M'),
-        ('160L', 'Carcaça 160L'),
-        ('180M', 'Carcaça 180M'),
-        ('180L', 'Carcaça 180L'),
-        ('200L', 'Carcaça 200L'),
-        ('225S/M', 'Carcaça 225S/M'),
-        ('250S/M', 'Carcaça 250S/M'),
-        ('280S/M', 'Carcaça 280S/M'),
-        ('315S/M', 'Carcaça 315S/M'),
-        ('355M/L', 'Carcaça 355M/L'),
-        ('355A/B', 'Carcaça 355A/B'),
-        ('400', 'Carcaça 400'),
-    ]
+    CARCACA_CHOICES = CARCACA_CHOICES
     
     carcaca = forms.ChoiceField(
         label='Tipo de Carcaça',
@@ -0,0 +1,104 @@
+"""
+Comando para estimar a potência de vários núcleos a partir de uma planilha CSV.
+
+Uso:
+    python manage.py estimar_potencia_lote medicoes.csv
+    python manage.py estimar_potencia_lote medicoes.csv --saida resultados.csv --polos 4
+
+O CSV deve conter as colunas 'diametro' e 'comprimento' (mm) e, opcionalmente,
+'polos' e 'frequencia'. Colunas ausentes usam os valores de --polos/--frequencia.
+Linhas inválidas (valores ausentes, não numéricos ou não finitos) são
+informadas na saída de erro e ignoradas.
+"""
+
+import csv
+from django.core.management.base import BaseCommand, CommandError
+from ThreePhasePower.views import calcular_potencia_lote, preparar_lote
+
+
+class Command(BaseCommand):
+    help = 'Estima a potência de vários núcleos a partir de um arquivo CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'csv_file',
+            type=str,
+            help='Caminho para o arquivo CSV com as medições dos núcleos'
+        )
+        parser.add_argument(
+            '--saida',
+            type=str,
+            default=None,
+            help='Arquivo CSV de saída (padrão: saída padrão)'
+        )
+        parser.add_argument(
+            '--polos',
+            type=int,
+            default=4,
+            help='Número de polos quando a coluna "polos" não existir (padrão: 4)'
+        )
+        parser.add_argument(
+            '--frequencia',
+            type=int,
+            default=60,
+            help='Frequência quando a coluna "frequencia" não existir (padrão: 60)'
+        )
+
+    def handle(self, *args, **options):
+        csv_file = options['csv_file']
+
+        try:
+            with open(csv_file, 'r', encoding='utf-8') as file:
+                linhas = list(csv.DictReader(file))
+        except FileNotFoundError:
+            raise CommandError(f'Arquivo não encontrado: {csv_file}')
+
+        # Cada linha é validada separadamente; linhas inválidas são informadas e ignoradas
+        diametros, comprimentos, polos, frequencias = [], [], [], []
+        for linha_numero, linha in enumerate(linhas, start=2):  # Linha 1 é o header
+            try:
+                valores = preparar_lote(
+                    [linha['diametro']],
+                    [linha['comprimento']],
+                    linha.get('polos') or options['polos'],
+                    linha.get('frequencia') or options['frequencia'],
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                self.stderr.write(self.style.ERROR(f'Erro na linha {linha_numero}: {e}'))
+                continue
+            for coluna, valor in zip((diametros, comprimentos, polos, frequencias), valores):
+                coluna.extend(valor)
+
+        if not diametros:
+            raise CommandError('Nenhuma linha válida no CSV')
+
+        resultados = calcular_potencia_lote(diametros, comprimentos, polos, frequencias)
+
+        if options['saida']:
+            saida = open(options['saida'], 'w', encoding='utf-8', newline='')
+            writer = csv.writer(saida)
+        else:
+            saida = None
+            writer = csv.writer(self.stdout, lineterminator='\n')
+        try:
+            writer.writerow([
+                'diametro', 'comprimento', 'polos', 'frequencia',
+                'potencia_kw', 'potencia_cv', 'coeficiente_k',
+                'carcacas', 'inconsistencia'
+            ])
+            for i, resultado in enumerate(resultados):
+                avaliacao = resultado['avaliacao_carcaça']
+                writer.writerow([
+                    diametros[i], comprimentos[i], polos[i], frequencias[i],
+                    resultado['potencia_kw'], resultado['potencia_cv'], resultado['coeficiente_k'],
+                    ' | '.join(s['carcaça'] for s in avaliacao['sugestoes']),
+                    avaliacao['inconsistencia'] or ''
+                ])
+        finally:
+            if saida is not None:
+                saida.close()
+
+        if options['saida']:
+            self.stdout.write(
+                self.style.SUCCESS(f'✓ {len(resultados)} núcleos processados: {options["saida"]}')
+            )
@@ -1,3 +1,131 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from .carcacas import TABELA_CARCACAS, carcaca_mais_proxima, carcacas_para_potencia
+from .dimensionamento import comprimento_para_potencia, dimensionar_nucleo
+from .views import (
+    CACHE_CARCACAS_SEGUNDOS, LIMITES_VOLUME_K, calcular_potencia_motor, montar_potencias_por_carcaca,
+    preparar_lote
+)
+
+
+class EstimarPotenciaLoteTests(TestCase):
+    def executar(self, conteudo):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as arquivo:
+            arquivo.write(conteudo)
+        self.addCleanup(os.remove, arquivo.name)
+        stdout, stderr = StringIO(), StringIO()
+        call_command('estimar_potencia_lote', arquivo.name, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_saida_capturada_pelo_stdout(self):
+        stdout, stderr = self.executar('diametro,comprimento\n110,70\n130,90\n')
+        linhas = stdout.strip().split('\n')
+        self.assertEqual(linhas[0].split(',')[:2], ['diametro', 'comprimento'])
+        self.assertEqual(len(linhas), 3)
+        self.assertEqual(stderr, '')
+
+    def test_linhas_nao_finitas_sao_rejeitadas(self):
+        stdout, stderr = self.executar('diametro,comprimento\n110,70\nnan,90\n130,inf\n')
+        self.assertEqual(len(stdout.strip().split('\n')), 2)
+        self.assertNotIn('nan', stdout)
+        self.assertIn('linha 3', stderr)
+        self.assertIn('linha 4', stderr)
+
+    def test_preparar_lote_rejeita_nao_finitos(self):
+        with self.assertRaises(ValueError):
+            preparar_lote([float('inf')], [70], 4)
+
+
+class IndiceCarcacasTests(TestCase):
+    def test_indice_igual_a_varredura_da_tabela(self):
+        for polos in (2, 4, 6, 8, 10, 12):
+            for p_kw in [x / 4 for x in range(0, 2100)]:
+                esperado = [
+                    (carcaca, faixas[polos][0], faixas[polos][1])
+                    for carcaca, faixas in TABELA_CARCACAS.items()
+                    if polos in faixas and faixas[polos][0] <= p_kw <= faixas[polos][1]
+                ]
+                self.assertEqual(carcacas_para_potencia(p_kw, polos), esperado, (p_kw, polos))
+
+    def test_carcaca_mais_proxima(self):
+        for polos in (2, 4, 6, 8, 10, 12):
+            for p_kw in (0.05, 3.3, 47.0, 700.0):
+                centros = [
+                    (abs(p_kw - (faixas[polos][0] + faixas[polos][1]) / 2), carcaca)
+                    for carcaca, faixas in TABELA_CARCACAS.items() if polos in faixas
+                ]
+                self.assertEqual(carcaca_mais_proxima(p_kw, polos)[3], min(centros)[0])
+        self.assertIsNone(carcaca_mais_proxima(10, 3))
+
+
+class ApiPotenciasCarcacasTests(TestCase):
+    def test_todas_as_carcacas_com_cache(self):
+        resposta = self.client.get('/api/carcacas/', {'frequencia': 50})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn(f'max-age={CACHE_CARCACAS_SEGUNDOS}', resposta['Cache-Control'])
+        dados = json.loads(resposta.content)
+        self.assertEqual(dados['frequencia'], 50)
+        self.assertEqual(
+            dados['carcacas'],
+            [montar_potencias_por_carcaca(carcaca, 50) for carcaca in TABELA_CARCACAS]
+        )
+
+    def test_carcaca_especifica(self):
+        carcaca = next(iter(TABELA_CARCACAS))
+        resposta = self.client.get('/api/carcacas/', {'carcaca': carcaca})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(json.loads(resposta.content), montar_potencias_por_carcaca(carcaca, 60))
+
+    def test_erros(self):
+        self.assertEqual(self.client.get('/api/carcacas/', {'carcaca': 'XYZ'}).status_code, 404)
+        self.assertEqual(self.client.get('/api/carcacas/', {'frequencia': 55}).status_code, 404)
+        self.assertEqual(self.client.get('/api/carcacas/', {'frequencia': 'abc'}).status_code, 400)
+
+
+class DimensionamentoInversoTests(TestCase):
+    def test_comprimento_inverte_o_calculo_de_potencia(self):
+        for polos in (2, 4, 8):
+            for D in (60, 130, 300):
+                for p_kw in (0.5, 7.5, 90.0):
+                    L = comprimento_para_potencia(p_kw, D, polos, 60)
+                    volume = D ** 2 * L
+                    if any(abs(volume - limite) < 1e-6 for limite in LIMITES_VOLUME_K):
+                        # Salto entre faixas de K: potência no início da faixa seguinte
+                        self.assertGreaterEqual(calcular_potencia_motor(D, L, polos, 60)['potencia_kw'], p_kw)
+                    else:
+                        self.assertAlmostEqual(calcular_potencia_motor(D, L, polos, 60)['potencia_kw'], p_kw, places=2)
+
+    def test_nucleos_dentro_da_tolerancia_e_ordenados(self):
+        resultado = dimensionar_nucleo(15.0, 4, 60, 0.05)
+        self.assertTrue(resultado['nucleos'])
+        for nucleo in resultado['nucleos']:
+            self.assertLessEqual(abs(nucleo['potencia_kw'] - 15.0), 15.0 * 0.05 + 1e-9)
+        erros = [abs(n['erro_percentual']) for n in resultado['nucleos']]
+        self.assertEqual(erros, sorted(erros))
+
+    def test_api(self):
+        resposta = self.client.get('/api/potencia/inversa/', {'potencia_cv': 10, 'polos': 4})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertAlmostEqual(json.loads(resposta.content)['potencia_kw'], 7.355)
+        self.assertEqual(self.client.get('/api/potencia/inversa/', {'polos': 4}).status_code, 400)
+        self.assertEqual(self.client.get('/api/potencia/inversa/', {'potencia_kw': 'x', 'polos': 4}).status_code, 400)
+        self.assertEqual(
+            self.client.get('/api/potencia/inversa/', {'potencia_kw': 5, 'polos': 4, 'tolerancia': 1.5}).status_code, 400
+        )
+
+    def test_api_rejeita_valores_nao_finitos(self):
+        for parametros in (
+            {'potencia_kw': 'nan', 'polos': 4},
+            {'potencia_kw': 'inf', 'polos': 4},
+            {'potencia_cv': 'inf', 'polos': 4},
+            {'potencia_kw': 5, 'polos': 4, 'tolerancia': 'nan'},
+        ):
+            resposta = self.client.get('/api/potencia/inversa/', parametros)
+            self.assertEqual(resposta.status_code, 400, parametros)
+            self.assertIn('erro', json.loads(resposta.content))
@@ -1,6 +1,11 @@
 from django.urls import path
-from .views import calculo
+from .views import (
+    calculo, api_potencia_lote, api_potencias_carcacas, api_dimensionamento_inverso
+)
 
 urlpatterns = [
     path('calculo/', calculo, name='calculo'),
+    path('api/potencia/lote/', api_potencia_lote, name='api_potencia_lote'),
+    path('api/carcacas/', api_potencias_carcacas, name='api_potencias_carcacas'),
+    path('api/potencia/inversa/', api_dimensionamento_inverso, name='api_dimensionamento_inverso'),
 ]
\ No newline at end of file
@@ -1,7 +1,11 @@
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_http_methods
 from .forms import MotorCalculoForm, CarcacaSelecaoForm
+from .carcacas import TABELA_CARCACAS, avaliar_carcacas, obter_faixas_carcaca
+import bisect
 import math
 import json
 
@@ -9,208 +13,152 @@ import json
 ############### Etapa de calculo da potência do motor ##################
 ##########################################################################
 
-def calcular_potencia_motor(diametro_mm, comprimento_mm, polos, frequencia):
+# Fator K revisado baseado em dados reais de motores, por faixa de volume D²×L (mm³):
+# K = COEFICIENTES_K[i] para LIMITES_VOLUME_K[i-1] <= volume < LIMITES_VOLUME_K[i]
+LIMITES_VOLUME_K = [
+    220000,   # <1CV
+    860000,   # <5CV
+    1720000,  # <10CV
+    2350000,  # <15CV
+    4150000,  # <25CV
+    6600000,  # <40CV
+]
+COEFICIENTES_K = [1100, 1400, 1500, 1500, 1500, 1540, 1550]  # último: motores maiores (>40CV)
+
+# Fator de correção para número de polos
+FATOR_POLOS = {
+    2: 0.85,
+    4: 1.00,
+    6: 1.12,
+    8: 1.18,
+    10: 1.22,
+    12: 1.25
+}
+
+# Limite de núcleos por requisição na API em lote
+MAX_NUCLEOS_LOTE = 5000
+
+
+def obter_coeficiente_k(volume_mm3):
+    """Retorna o coeficiente K da faixa de volume (busca binária nos limites)."""
+    return COEFICIENTES_K[bisect.bisect_right(LIMITES_VOLUME_K, volume_mm3)]
+
+
+def calcular_potencia_lote(diametros_mm, comprimentos_mm, polos, frequencias):
     """
-    Calcula a potência estimada do motor baseado em suas dimensões.
+    Calcula a potência estimada de vários núcleos de uma só vez.
+    
+    Cada etapa (velocidade síncrona, K, fator de polos, conversão kW/CV e
+    avaliação de carcaça) é aplicada a todas as colunas de uma vez.
+    
+    Args:
+        diametros_mm, comprimentos_mm, polos, frequencias (list): Colunas de
+            mesmo tamanho com os dados de cada núcleo
+    
+    Returns:
+        list: Um dicionário por núcleo, no formato de calcular_potencia_motor
     """
     # Converter dimensões de mm para metros
-    D_m = diametro_mm / 1000
-    L_m = comprimento_mm / 1000
+    D_m = [d / 1000 for d in diametros_mm]
+    L_m = [l / 1000 for l in comprimentos_mm]
     
     # Calcular velocidade síncrona em rpm
-    n_s = (120 * frequencia) / polos
+    n_s = [(120 * f) / p for f, p in zip(frequencias, polos)]
     
     # CÁLCULO REVISADO: Fórmula mais precisa para motores pequenos
-    volume_mm3 = (diametro_mm ** 2) * comprimento_mm
-    
-    # Fator K revisado baseado em dados reais de motores
-    if volume_mm3 < 220000:  # <1CV
-        K = 1100 
-    elif volume_mm3 < 860000:  # <5CV
-        K = 1400 
-    elif volume_mm3 < 1720000:  # <10CV
-        K = 1500 
-    elif volume_mm3 < 2350000:  # <15CV
-        K = 1500
-    elif volume_mm3 < 4150000:  # <25CV
-        K = 1500
-    elif volume_mm3 < 6600000:  # <40CV
-        K = 1540
-    else:  # Motores maiores (>40CV)
-        K = 1550
-    
-    # Fator de correção para número de polos
-    fator_polos = {
-        2: 0.85,
-        4: 1.00,
-        6: 1.12,
-        8: 1.18,
-        10: 1.22,
-        12: 1.25
-    }.get(polos, 1.0)
+    volumes_mm3 = [(d ** 2) * l for d, l in zip(diametros_mm, comprimentos_mm)]
+    K = [obter_coeficiente_k(v) for v in volumes_mm3]
+    fatores = [FATOR_POLOS.get(p, 1.0) for p in polos]
     
     # Calcular potência: P = K × D² × L × n_s × fator_polos
-    P_watts = K * (D_m ** 2) * L_m * n_s * fator_polos
-    
-    # Potência em kW
-    P_kw = P_watts / 1000
+    P_kw = [
+        (k * (d ** 2) * l * n * fp) / 1000
+        for k, d, l, n, fp in zip(K, D_m, L_m, n_s, fatores)
+    ]
     
     # Potência em CV (1 CV = 0,7355 kW)
-    P_cv = P_kw / 0.7355
-    
-    # Dados básicos
-    resultado = {
-        'potencia_kw': round(P_kw, 3),
-        'potencia_cv': round(P_cv, 3),
-        'velocidade_sincrona': round(n_s, 1),
-        'coeficiente_k': round(K, 2),
-        'fator_polos': round(fator_polos, 2),
-        'diametro_m': round(D_m, 4),
-        'comprimento_m': round(L_m, 4),
-    }
+    P_cv = [p / 0.7355 for p in P_kw]
     
-    # TABELA 21 ATUALIZADA: Incluídos dados para 10 e 12 polos
-    tabela_21 = {
-        '63': {2: (0.12, 0.75), 4: (0.12, 0.75)},
-        '71': {2: (0.75, 1.1), 4: (0.75, 1.1)},
-        '80': {2: (1.1, 1.5), 4: (0.75, 1.1)},
-        '90S': {2: (1.5, 2.2), 4: (1.1, 1.5), 6: (0.75, 1.1), 8: (0.55, 0.75)},
-        '90L': {2: (2.2, 3.0), 4: (1.5, 2.2), 6: (1.1, 1.5), 8: (0.75, 1.1)},
-        '100L': {2: (3.0, 4.0), 4: (2.2, 3.0), 6: (1.5, 2.2), 8: (1.1, 1.5),
-                 10: (0.75, 1.1), 12: (0.55, 0.75)},
-        '112M': {2: (4.0, 5.5), 4: (3.0, 4.0), 6: (2.2, 3.0), 8: (1.5, 2.2),
-                 10: (1.1, 1.5), 12: (0.75, 1.1)},
-        '132S': {2: (5.5, 7.5), 4: (4.0, 5.5), 6: (3.0, 4.0), 8: (2.2, 3.0),
-                 10: (1.5, 2.2), 12: (1.1, 1.5)},
-        '132M': {2: (7.5, 11.0), 4: (5.5, 7.5), 6: (4.0, 5.5), 8: (3.0, 4.0),
-                 10: (2.2, 3.0), 12: (1.5, 2.2)},
-        '160M': {2: (11.0, 15.0), 4: (7.5, 11.0), 6: (5.5, 7.5), 8: (4.0, 5.5),
-                 10: (3.0, 4.0), 12: (2.2, 3.0)},
-        '160L': {2: (15.0, 18.5), 4: (11.0, 15.0), 6: (7.5, 11.0), 8: (5.5, 7.5),
-                 10: (4.0, 5.5), 12: (3.0, 4.0)},
-        '180M': {2: (18.5, 22.0), 4: (15.0, 18.5), 6: (11.0, 15.0), 8: (7.5, 11.0),
-                 10: (5.5, 7.5), 12: (4.0, 5.5)},
-        '180L': {2: (22.0, 30.0), 4: (18.5, 22.0), 6: (15.0, 18.5), 8: (11.0, 15.0),
-                 10: (7.5, 11.0), 12: (5.5, 7.5)},
-        '200L': {2: (30.0, 37.0), 4: (22.0, 30.0), 6: (18.5, 22.0), 8: (15.0, 18.5),
-                 10: (11.0, 15.0), 12: (7.5, 11.0)},
-        '225S/M': {2: (37.0, 55.0), 4: (30.0, 45.0), 6: (22.0, 37.0), 8: (18.5, 30.0),
-                   10: (15.0, 22.0), 12: (11.0, 15.0)},
-        '250S/M': {2: (55.0, 75.0), 4: (45.0, 60.0), 6: (30.0, 45.0), 8: (22.0, 37.0),
-                   10: (18.5, 30.0), 12: (15.0, 18.5)},
-        '280S/M': {2: (75.0, 110.0), 4: (60.0, 90.0), 6: (45.0, 75.0), 8: (30.0, 55.0),
-                   10: (22.0, 37.0), 12: (18.5, 22.0)},
-        '315S/M': {2: (110.0, 160.0), 4: (90.0, 132.0), 6: (75.0, 110.0), 8: (55.0, 90.0),
-                   10: (30.0, 55.0), 12: (22.0, 30.0)},
-        '355M/L': {2: (160.0, 250.0), 4: (132.0, 200.0), 6: (110.0, 160.0), 8: (75.0, 132.0),
-                   10: (37.0, 75.0), 12: (30.0, 45.0)},
-        '355A/B': {2: (250.0, 315.0), 4: (200.0, 250.0), 6: (160.0, 200.0), 8: (110.0, 160.0),
-                   10: (55.0, 110.0), 12: (37.0, 55.0)},
-        '400': {2: (250.0, 500.0), 4: (200.0, 400.0), 6: (160.0, 315.0), 8: (110.0, 250.0),
-                10: (75.0, 160.0), 12: (55.0, 90.0)}
-    }
-    
-    def avaliar_carcaças(p_kw, polos, tabela):
-        sugestoes = []
-        inconsistencia = None
-        diff_min = float('inf')
-        carcaça_proxima = None
-        faixa_proxima = None
-        
-        for carcaça, dados_polos in tabela.items():
-            if polos in dados_polos:
-                min_p, max_p = dados_polos[polos]
-                if min_p <= p_kw <= max_p:
-                    potencia_sugerida = round(max(min_p, min(max_p, p_kw)), 1)
-                    sugestoes.append({
-                        'carcaça': carcaça,
-                        'faixa_kw': f'{min_p}-{max_p}',
-                        'sugestão': f'Modelo {carcaça}: potência nominal sugerida {potencia_sugerida} kW baseada na norma IEC 60072-1'
-                    })
-                else:
-                    diff = abs(p_kw - (min_p + max_p) / 2)
-                    if diff < diff_min:
-                        diff_min = diff
-                        carcaça_proxima = carcaça
-                        faixa_proxima = f'{min_p}-{max_p}'
-        
-        if not sugestoes:
-            if carcaça_proxima:
-                diff_percent = (diff_min / p_kw) * 100 if p_kw > 0 else 0
-                if diff_percent > 20:
-                    inconsistencia = f'Inconsistência: Potência estimada ({p_kw:.1f} kW) fora da faixa padrão para {polos} polos (próxima: {carcaça_proxima}, {faixa_proxima} kW; diferença ~{diff_percent:.0f}%)'
-                else:
-                    sugestoes.append({
-                        'carcaça': carcaça_proxima,
-                        'faixa_kw': faixa_proxima,
-                        'sugestão': f'Próximo modelo WEG W22 {carcaça_proxima}: verifique faixa {faixa_proxima} kW'
-                    })
-            else:
-                inconsistencia = f'Inconsistência: Nenhuma carcaça padrão encontrada para {polos} polos e {p_kw:.1f} kW'
-        
-        return {
-            'sugestoes': sugestoes,
-            'inconsistencia': inconsistencia
+    return [
+        {
+            'potencia_kw': round(P_kw[i], 3),
+            'potencia_cv': round(P_cv[i], 3),
+            'velocidade_sincrona': round(n_s[i], 1),
+            'coeficiente_k': round(K[i], 2),
+            'fator_polos': round(fatores[i], 2),
+            'diametro_m': round(D_m[i], 4),
+            'comprimento_m': round(L_m[i], 4),
+            # Avaliação pela tabela de carcaças (índice montado uma única vez)
+            'avaliacao_carcaça': avaliar_carcacas(P_kw[i], polos[i]),
         }
+        for i in range(len(P_kw))
+    ]
+
+
+def preparar_lote(diametros, comprimentos, polos, frequencias=60):
+    """
+    Valida e normaliza as colunas de entrada do cálculo em lote.
+    
+    Polos e frequência podem ser informados como valor único, aplicado a
+    todos os núcleos.
+    
+    Returns:
+        tuple: (diametros, comprimentos, polos, frequencias) como listas
+    
+    Raises:
+        ValueError: Se as colunas forem inválidas ou de tamanhos diferentes
+    """
+    if not isinstance(diametros, list) or not isinstance(comprimentos, list):
+        raise ValueError('diametro e comprimento devem ser listas')
     
-    avaliacao = avaliar_carcaças(P_kw, polos, tabela_21)
-    resultado['avaliacao_carcaça'] = avaliacao
+    n = len(diametros)
+    if n == 0:
+        raise ValueError('Nenhum núcleo informado')
+    if n > MAX_NUCLEOS_LOTE:
+        raise ValueError(f'Máximo de {MAX_NUCLEOS_LOTE} núcleos por lote')
     
-    return resultado
+    if not isinstance(polos, list):
+        polos = [polos] * n
+    if not isinstance(frequencias, list):
+        frequencias = [frequencias] * n
+    
+    if not (len(comprimentos) == len(polos) == len(frequencias) == n):
+        raise ValueError('Todas as colunas devem ter o mesmo tamanho')
+    
+    diametros = [float(d) for d in diametros]
+    comprimentos = [float(l) for l in comprimentos]
+    polos = [int(p) for p in polos]
+    frequencias = [int(f) for f in frequencias]
+    
+    if not all(math.isfinite(v) for v in diametros + comprimentos):
+        raise ValueError('Diâmetro e comprimento devem ser números finitos')
+    if any(d <= 0 for d in diametros) or any(l <= 0 for l in comprimentos):
+        raise ValueError('Diâmetro e comprimento devem ser positivos')
+    if any(p <= 0 for p in polos) or any(f <= 0 for f in frequencias):
+        raise ValueError('Polos e frequência devem ser positivos')
+    
+    return diametros, comprimentos, polos, frequencias
+
 
-def obter_potencias_por_carcaca(carcaca):
+def calcular_potencia_motor(diametro_mm, comprimento_mm, polos, frequencia):
     """
-    Retorna as potências disponíveis para uma carcaça específica.
+    Calcula a potência estimada do motor baseado em suas dimensões.
     """
-    tabela_carcacas = {
-        '63': {2: (0.12, 0.75), 4: (0.12, 0.75)},
-        '71': {2: (0.75, 1.1), 4: (0.75, 1.1)},
-        '80': {2: (1.1, 1.5), 4: (0.75, 1.1)},
-        '90S': {2: (1.5, 2.2), 4: (1.1, 1.5), 6: (0.75, 1.1), 8: (0.55, 0.75)},
-        '90L': {2: (2.2, 3.0), 4: (1.5, 2.2), 6: (1.1, 1.5), 8: (0.75, 1.1)},
-        '100L': {2: (3.0, 4.0), 4: (2.2, 3.0), 6: (1.5, 2.2), 8: (1.1, 1.5),
-                 10: (0.75, 1.1), 12: (0.55, 0.75)},
-        '112M': {2: (4.0, 5.5), 4: (3.0, 4.0), 6: (2.2, 3.0), 8: (1.5, 2.2),
-                 10: (1.1, 1.5), 12: (0.75, 1.1)},
-        '132S': {2: (5.5, 7.5), 4: (4.0, 5.5), 6: (3.0, 4.0), 8: (2.2, 3.0),
-                 10: (1.5, 2.2), 12: (1.1, 1.5)},
-        '132M': {2: (7.5, 11.0), 4: (5.5, 7.5), 6: (4.0, 5.5), 8: (3.0, 4.0),
-                 10: (2.2, 3.0), 12: (1.5, 2.2)},
-        '160M': {2: (11.0, 15.0), 4: (7.5, 11.0), 6: (5.5, 7.5), 8: (4.0, 5.5),
-                 10: (3.0, 4.0), 12: (2.2, 3.0)},
-        '160L': {2: (15.0, 18.5), 4: (11.0, 15.0), 6: (7.5, 11.0), 8: (5.5, 7.5),
-                 10: (4.0, 5.5), 12: (3.0, 4.0)},
-        '180M': {2: (18.5, 22.0), 4: (15.0, 18.5), 6: (11.0, 15.0), 8: (7.5, 11.0),
-                 10: (5.5, 7.5), 12: (4.0, 5.5)},
-        '180L': {2: (22.0, 30.0), 4: (18.5, 22.0), 6: (15.0, 18.5), 8: (11.0, 15.0),
-                 10: (7.5, 11.0), 12: (5.5, 7.5)},
-        '200L': {2: (30.0, 37.0), 4: (22.0, 30.0), 6: (18.5, 22.0), 8: (15.0, 18.5),
-                 10: (11.0, 15.0), 12: (7.5, 11.0)},
-        '225S/M': {2: (37.0, 55.0), 4: (30.0, 45.0), 6: (22.0, 37.0), 8: (18.5, 30.0),
-                   10: (15.0, 22.0), 12: (11.0, 15.0)},
-        '250S/M': {2: (55.0, 75.0), 4: (45.0, 60.0), 6: (30.0, 45.0), 8: (22.0, 37.0),
-                   10: (18.5, 30.0), 12: (15.0, 18.5)},
-        '280S/M': {2: (75.0, 110.0), 4: (60.0, 90.0), 6: (45.0, 75.0), 8: (30.0, 55.0),
-                   10: (22.0, 37.0), 12: (18.5, 22.0)},
-        '315S/M': {2: (110.0, 160.0), 4: (90.0, 132.0), 6: (75.0, 110.0), 8: (55.0, 90.0),
-                   10: (30.0, 55.0), 12: (22.0, 30.0)},
-        '355M/L': {2: (160.0, 250.0), 4: (132.0, 200.0), 6: (110.0, 160.0), 8: (75.0, 132.0),
-                   10: (37.0, 75.0), 12: (30.0, 45.0)},
-        '355A/B': {2: (250.0, 315.0), 4: (200.0, 250.0), 6: (160.0, 200.0), 8: (110.0, 160.0),
-                   10: (55.0, 110.0), 12: (37.0, 55.0)},
-        '400': {2: (250.0, 500.0), 4: (200.0, 400.0), 6: (160.0, 315.0), 8: (110.0, 250.0),
-                10: (75.0, 160.0), 12: (55.0, 90.0)}
-    }
-    
-    if carcaca not in tabela_carcacas:
+    return calcular_potencia_lote([diametro_mm], [comprimento_mm], [polos], [frequencia])[0]
+
+def montar_potencias_por_carcaca(carcaca, frequencia=60):
+    """
+    Monta a tabela de potências de uma carcaça específica para a frequência dada.
+    """
+    dados_carcaca = obter_faixas_carcaca(carcaca)
+    if dados_carcaca is None:
         return None
     
     potencias_por_polo = []
-    dados_carcaca = tabela_carcacas[carcaca]
     
     for num_polos in sorted(dados_carcaca.keys()):
         min_kw, max_kw = dados_carcaca[num_polos]
-        velocidade_60hz = (120 * 60) / num_polos
+        velocidade = (120 * frequencia) / num_polos
         min_cv = min_kw * 1.341
         max_cv = max_kw * 1.341
         
@@ -220,16 +168,52 @@ def obter_potencias_por_carcaca(carcaca):
             'potencia_max_kw': round(max_kw, 2),
             'potencia_min_cv': round(min_cv, 2),
             'potencia_max_cv': round(max_cv, 2),
-            'velocidade_sincrona_rpm': round(velocidade_60hz, 0),
+            'velocidade_sincrona_rpm': round(velocidade, 0),
             'faixa_kw': f"{min_kw} - {max_kw} kW",
             'faixa_cv': f"{round(min_cv, 1)} - {round(max_cv, 1)} CV"
         })
     
     return {
         'carcaca': carcaca,
+        'frequencia': frequencia,
         'potencias': potencias_por_polo
     }
 
+
+# Tabelas de potência pré-calculadas na inicialização: {frequencia: {carcaca: resultado}}
+FREQUENCIAS_CARCACA = (50, 60)
+POTENCIAS_POR_CARCACA = {
+    frequencia: {
+        carcaca: montar_potencias_por_carcaca(carcaca, frequencia)
+        for carcaca in TABELA_CARCACAS
+    }
+    for frequencia in FREQUENCIAS_CARCACA
+}
+
+# Respostas JSON já serializadas: {(frequencia, carcaca ou None): bytes}
+# A chave com carcaca=None contém todas as carcaças da frequência
+RESPOSTAS_JSON_CARCACAS = {}
+for _frequencia, _tabelas in POTENCIAS_POR_CARCACA.items():
+    RESPOSTAS_JSON_CARCACAS[(_frequencia, None)] = json.dumps({
+        'frequencia': _frequencia,
+        'carcacas': list(_tabelas.values())
+    }).encode('utf-8')
+    for _carcaca, _tabela in _tabelas.items():
+        RESPOSTAS_JSON_CARCACAS[(_frequencia, _carcaca)] = json.dumps(_tabela).encode('utf-8')
+
+# Validade das respostas da tabela de carcaças no cache do navegador (30 dias)
+CACHE_CARCACAS_SEGUNDOS = 60 * 60 * 24 * 30
+
+
+def obter_potencias_por_carcaca(carcaca, frequencia=60):
+    """
+    Retorna as potências disponíveis para uma carcaça específica.
+    
+    Consulta direta à tabela pré-calculada; o resultado é compartilhado e não
+    deve ser modificado.
+    """
+    return POTENCIAS_POR_CARCACA.get(frequencia, {}).get(carcaca)
+
 def calculo(request):
     """
     View que gerencia dois tipos de cálculo:
@@ -259,12 +243,15 @@ def calculo(request):
                     'frequencia': frequencia
                 }
         elif metodo == 'carcaca':
-            form_carcaca = CarcacaSelecaoForm(request.POST)
             form_dimensoes = MotorCalculoForm()
+            carcaca = request.POST.get('carcaca')
+            resultado_carcaca = obter_potencias_por_carcaca(carcaca)
             
-            if form_carcaca.is_valid():
-                carcaca = form_carcaca.cleaned_data['carcaca']
-                resultado_carcaca = obter_potencias_por_carcaca(carcaca)
+            if resultado_carcaca is not None:
+                # Carcaça conhecida: consulta direta, sem validar o formulário
+                form_carcaca = CarcacaSelecaoForm(initial={'carcaca': carcaca})
+            else:
+                form_carcaca = CarcacaSelecaoForm(request.POST)
     
     form_dimensoes = locals().get('form_dimensoes', MotorCalculoForm())
     form_carcaca = locals().get('form_carcaca', CarcacaSelecaoForm())
@@ -276,3 +263,120 @@ def calculo(request):
         'resultado_carcaca': resultado_carcaca,
         'metodo': metodo
     })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_potencia_lote(request):
+    """
+    API para estimar a potência de vários núcleos em uma única requisição.
+    
+    Corpo JSON:
+        {
+            "diametro": [110, 130, ...],      # mm
+            "comprimento": [70, 90, ...],     # mm
+            "polos": [4, 4, ...] ou 4,
+            "frequencia": [60, 60, ...] ou 60 (opcional, padrão: 60)
+        }
+        
+    Retorna:
+        JSON com a lista de resultados, na mesma ordem da entrada
+    """
+    try:
+        dados = json.loads(request.body)
+        diametros, comprimentos, polos, frequencias = preparar_lote(
+            dados.get('diametro'),
+            dados.get('comprimento'),
+            dados.get('polos'),
+            dados.get('frequencia', 60)
+        )
+    except (ValueError, TypeError, AttributeError) as e:
+        return JsonResponse({'erro': f'Dados inválidos: {e}'}, status=400)
+    
+    try:
+        resultados = calcular_potencia_lote(diametros, comprimentos, polos, frequencias)
+        return JsonResponse({
+            'total': len(resultados),
+            'resultados': resultados
+        })
+    except Exception as e:
+        return JsonResponse({'erro': str(e)}, status=500)
+
+
+
+@require_http_methods(["GET"])
+def api_potencias_carcacas(request):
+    """
+    API com as tabelas de potência por carcaça (respostas pré-calculadas).
+    
+    Parâmetros:
+        - frequencia (int, opcional): 50 ou 60 Hz (padrão: 60)
+        - carcaca (str, opcional): Carcaça específica; se omitida, retorna todas
+        
+    Retorna:
+        JSON com as faixas de potência e velocidade síncrona por número de polos
+    """
+    try:
+        frequencia = int(request.GET.get('frequencia', 60))
+    except ValueError:
+        return JsonResponse({'erro': 'Frequência inválida'}, status=400)
+    
+    conteudo = RESPOSTAS_JSON_CARCACAS.get((frequencia, request.GET.get('carcaca')))
+    if conteudo is None:
+        return JsonResponse({'erro': 'Carcaça ou frequência não encontrada'}, status=404)
+    
+    resposta = HttpResponse(conteudo, content_type='application/json')
+    patch_cache_control(resposta, public=True, max_age=CACHE_CARCACAS_SEGUNDOS)
+    return resposta
+
+
+@require_http_methods(["GET"])
+def api_dimensionamento_inverso(request):
+    """
+    API para o dimensionamento inverso: núcleos (D, L) para uma potência desejada.
+    
+    Parâmetros:
+        - potencia_kw (float) ou potencia_cv (float): Potência desejada
+        - polos (int): Número de polos
+        - frequencia (int, opcional): Frequência da rede (padrão: 60)
+        - tolerancia (float, opcional): Desvio relativo aceito (padrão: 0.10)
+        
+    Retorna:
+        JSON com a região viável por diâmetro e o ranking de núcleos padronizados
+    """
+    # Importar aqui para evitar circular imports
+    from .dimensionamento import TOLERANCIA_PADRAO, dimensionar_nucleo
+    
+    potencia_kw = request.GET.get('potencia_kw')
+    potencia_cv = request.GET.get('potencia_cv')
+    polos = request.GET.get('polos')
+    
+    if not (potencia_kw or potencia_cv) or not polos:
+        return JsonResponse({
+            'erro': 'Parâmetros potencia_kw (ou potencia_cv) e polos obrigatórios'
+        }, status=400)
+    
+    try:
+        if potencia_kw:
+            potencia_kw = float(potencia_kw)
+        else:
+            potencia_kw = float(potencia_cv) * 0.7355
+        polos = int(polos)
+        frequencia = int(request.GET.get('frequencia', 60))
+        tolerancia = float(request.GET.get('tolerancia', TOLERANCIA_PADRAO))
+    except ValueError:
+        return JsonResponse({'erro': 'Parâmetros numéricos inválidos'}, status=400)
+    
+    # nan e inf passariam pelas comparações abaixo (nan <= 0 é False)
+    if not (math.isfinite(potencia_kw) and math.isfinite(tolerancia)):
+        return JsonResponse({'erro': 'Parâmetros numéricos inválidos'}, status=400)
+    
+    if potencia_kw <= 0 or polos <= 0 or frequencia <= 0 or not 0 < tolerancia < 1:
+        return JsonResponse({'erro': 'Parâmetros fora da faixa válida'}, status=400)
+    
+    try:
+        # Arredondar a potência aumenta o reaproveitamento do cache por (potência, polos, frequência)
+        resultado = dimensionar_nucleo(round(potencia_kw, 3), polos, frequencia, round(tolerancia, 3))
+        return JsonResponse(resultado)
+    except Exception as e:
+        return JsonResponse({'erro': str(e)}, status=500)
@@ -2,11 +2,12 @@
 from django.contrib import admin
 from django.urls import path
 from django.shortcuts import render
-from django.db.models import Count, Q
 from django.utils import timezone
-from datetime import timedelta, datetime
+from .dashboard import WIDGETS, period_range, widget_data
+from .live import live_counters
 from .models import AccessLog, DailyStatsSummary, GeographicRegion
-import json
+from .rollup import summaries_between
+from .spatial import clusters_for_view, parse_bbox, period_grid
 
 
 @admin.register(AccessLog)
@@ -37,14 +38,12 @@ class AccessLogAdmin(admin.ModelAdmin):
         extra_context = extra_context or {}
         
         # Estatísticas do dia
-        today = timezone.now().date()
-        today_stats = AccessLog.objects.filter(date=today)
+        today = timezone.localdate()
+        today_stats = summaries_between(today, today).first()
         
-        extra_context['today_visits'] = today_stats.count()
-        extra_context['today_calculations'] = today_stats.filter(
-            access_type='calculation'
-        ).count()
-        extra_context['today_unique_ips'] = today_stats.values('ip_address').distinct().count()
+        extra_context['today_visits'] = today_stats.total_visits if today_stats else 0
+        extra_context['today_calculations'] = today_stats.total_calculations if today_stats else 0
+        extra_context['today_unique_ips'] = today_stats.unique_visitors if today_stats else 0
         
         return super().changelist_view(request, extra_context=extra_context)
 
@@ -63,8 +62,9 @@ class DailyStatsSummaryAdmin(admin.ModelAdmin):
     readonly_fields = [
         'date', 'total_visits', 'unique_visitors', 'total_calculations',
         'potencia_calculations', 'espiras_calculations', 'diagrama_calculations',
-        'mobile_visits', 'desktop_visits', 'top_states', 'top_cities'
+        'mobile_visits', 'desktop_visits', 'top_states', 'top_cities', 'is_final'
     ]
+    exclude = ['visitor_sketch', 'state_sketches', 'heavy_hitters']
 
 
 @admin.register(GeographicRegion)
@@ -94,95 +94,82 @@ class AnalyticsAdminSite(admin.AdminSite):
                  name='analytics_heatmap'),
             path('analytics/api/map-data/', self.admin_view(self.map_data_api), 
                  name='analytics_map_data'),
+            path('analytics/api/widget/<str:widget>/', self.admin_view(self.dashboard_widget_api),
+                 name='analytics_widget'),
+            path('analytics/api/live/', self.admin_view(self.live_counters_stream),
+                 name='analytics_live'),
         ]
         return custom_urls + urls
     
     def analytics_dashboard_view(self, request):
         """
         View principal do dashboard de analytics
-        """
-        # Filtros de período
-        period = request.GET.get('period', '7days')
-        
-        # Calcula data inicial baseada no período
-        end_date = timezone.now()
-        if period == '7days':
-            start_date = end_date - timedelta(days=7)
-        elif period == '30days':
-            start_date = end_date - timedelta(days=30)
-        elif period == '1year':
-            start_date = end_date - timedelta(days=365)
-        else:
-            start_date = end_date - timedelta(days=7)
-        
-        # Busca dados do período
-        access_logs = AccessLog.objects.filter(
-            timestamp__gte=start_date,
-            timestamp__lte=end_date
-        ).exclude(is_bot=True)
-        
-        # Estatísticas gerais
-        total_visits = access_logs.count()
-        unique_visitors = access_logs.values('ip_address').distinct().count()
-        total_calculations = access_logs.filter(access_type='calculation').count()
-        
-        # Top estados
-        top_states = access_logs.exclude(state='').values('state').annotate(
-            count=Count('id')
-        ).order_by('-count')[:10]
-        
-        # Top cidades
-        top_cities = access_logs.exclude(city='').values('city', 'state').annotate(
-            count=Count('id')
-        ).order_by('-count')[:15]
         
-        # Cálculos por tipo
-        calculations_by_type = {
-            'potencia': access_logs.filter(calculation_type='potencia').count(),
-            'espiras': access_logs.filter(calculation_type='espiras').count(),
-            'diagrama': access_logs.filter(calculation_type='diagrama').count(),
-        }
-        
-        # Acessos por dia (para gráfico)
-        daily_visits = []
-        current_date = start_date.date()
-        while current_date <= end_date.date():
-            count = access_logs.filter(date=current_date).count()
-            daily_visits.append({
-                'date': current_date.strftime('%d/%m'),
-                'visits': count
-            })
-            current_date += timedelta(days=1)
-        
-        # Dispositivos
-        mobile_visits = access_logs.filter(is_mobile=True).count()
-        desktop_visits = access_logs.filter(is_mobile=False).count()
+        A página é renderizada sem estatísticas; cada widget busca seus dados
+        em dashboard_widget_api, em paralelo.
+        """
+        request.current_app = self.name
+        period, start_date, end_date = period_range(request.GET.get('period'))
         
         context = {
+            **self.each_context(request),
             'title': 'Dashboard de Analytics',
             'period': period,
             'start_date': start_date,
             'end_date': end_date,
-            'total_visits': total_visits,
-            'unique_visitors': unique_visitors,
-            'total_calculations': total_calculations,
-            'top_states': top_states,
-            'top_cities': top_cities,
-            'calculations_by_type': calculations_by_type,
-            'daily_visits': json.dumps(daily_visits),
-            'mobile_visits': mobile_visits,
-            'desktop_visits': desktop_visits,
-            'mobile_percentage': round((mobile_visits / total_visits * 100) if total_visits > 0 else 0, 1),
-            'desktop_percentage': round((desktop_visits / total_visits * 100) if total_visits > 0 else 0, 1),
+            'widgets': list(WIDGETS),
         }
         
         return render(request, 'admin/analytics_dashboard.html', context)
     
+    def dashboard_widget_api(self, request, widget):
+        """
+        API endpoint com os dados de um widget do dashboard
+        """
+        from django.http import JsonResponse
+        
+        if widget not in WIDGETS:
+            return JsonResponse({'erro': f'Widget desconhecido: {widget}'}, status=404)
+        return JsonResponse(widget_data(widget, request.GET.get('period')))
+    
+    def live_counters_stream(self, request):
+        """
+        Stream SSE com os contadores ao vivo, enviados a cada LIVE_STREAM_SECONDS
+        
+        Os valores vêm da memória dos processos, sem consultas ao banco. Em
+        servidores WSGI síncronos cada aba aberta ocupa um worker enquanto a
+        conexão dura, por isso ela é encerrada após LIVE_STREAM_DURATION
+        (30 s por padrão) e o EventSource do navegador reconecta sozinho.
+        """
+        import json
+        import time
+        from django.conf import settings
+        from django.http import StreamingHttpResponse
+        
+        interval = settings.ANALYTICS_CONFIG.get('LIVE_STREAM_SECONDS', 5)
+        duration = settings.ANALYTICS_CONFIG.get('LIVE_STREAM_DURATION', 30)
+        
+        def events():
+            yield f'retry: {interval * 1000}\n\n'
+            deadline = time.monotonic() + duration
+            while True:
+                yield f'data: {json.dumps(live_counters.snapshot())}\n\n'
+                if time.monotonic() + interval > deadline:
+                    return
+                time.sleep(interval)
+        
+        response = StreamingHttpResponse(events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
     def heatmap_view(self, request):
         """
         View do mapa de calor interativo
         """
+        request.current_app = self.name
         context = {
+            **self.each_context(request),
             'title': 'Mapa de Calor - Acessos por Região',
         }
         return render(request, 'admin/analytics_heatmap.html', context)
@@ -194,47 +181,24 @@ class AnalyticsAdminSite(admin.AdminSite):
         from django.http import JsonResponse
         
         # Filtros
-        period = request.GET.get('period', '7days')
-        
-        # Calcula período
-        end_date = timezone.now()
-        if period == '7days':
-            start_date = end_date - timedelta(days=7)
-        elif period == '30days':
-            start_date = end_date - timedelta(days=30)
-        elif period == '1year':
-            start_date = end_date - timedelta(days=365)
-        else:
-            start_date = end_date - timedelta(days=7)
-        
-        # Busca dados agrupados por estado
-        state_data = AccessLog.objects.filter(
-            timestamp__gte=start_date,
-            timestamp__lte=end_date,
-            country_code='BR'
-        ).exclude(
-            Q(state='') | Q(is_bot=True)
-        ).values('state', 'state_code').annotate(
-            total_visits=Count('id'),
-            calculations=Count('id', filter=Q(access_type='calculation'))
-        )
+        period, start_date, end_date = period_range(request.GET.get('period'))
+        try:
+            zoom = int(request.GET.get('zoom', 4))
+        except ValueError:
+            return JsonResponse({'erro': 'zoom deve ser um número inteiro'}, status=400)
+        bbox = parse_bbox(request.GET.get('bbox'))
         
-        # Busca dados agrupados por cidade
-        city_data = AccessLog.objects.filter(
-            timestamp__gte=start_date,
-            timestamp__lte=end_date,
-            country_code='BR'
-        ).exclude(
-            Q(city='') | Q(is_bot=True)
-        ).values('city', 'state', 'latitude', 'longitude').annotate(
-            total_visits=Count('id'),
-            calculations=Count('id', filter=Q(access_type='calculation'))
-        ).filter(latitude__isnull=False, longitude__isnull=False)[:100]  # Limita a 100 cidades
+        # Agrupamentos pré-calculados a partir dos resumos diários
+        data = period_grid(period, start_date, end_date)
+        zoom, clusters = clusters_for_view(data['grid'], zoom, bbox)
         
         # Formata dados para o mapa
         map_data = {
-            'states': list(state_data),
-            'cities': list(city_data),
+            'states': data['states'],
+            'clusters': clusters,
+            'zoom': zoom,
+            'total_cities': data['total_cities'],
+            'total_visits': data['total_visits'],
             'period': period,
             'start_date': start_date.strftime('%d/%m/%Y'),
             'end_date': end_date.strftime('%d/%m/%Y'),
@@ -0,0 +1,116 @@
+# analytics/buffer.py
+# Gravação em lote dos logs de acesso (write-behind)
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .geolocation import geolocation_queue
+from .models import AccessLog
+
+logger = logging.getLogger(__name__)
+
+
+class AccessLogBuffer:
+    """
+    Acumula os logs de acesso em memória e os grava com bulk_create.
+
+    A gravação acontece quando o buffer atinge max_size registros, a cada
+    flush_seconds (thread em segundo plano) e em stop(). Assim cada
+    requisição não precisa de um INSERT próprio, que no SQLite disputa o
+    lock de escrita com as demais.
+
+    stop() é registrado para o encerramento do processo só quando a thread
+    de gravação é iniciada, isto é, em processos que de fato acumularam logs;
+    quem encerra o banco antes (ex.: o executor de testes) chama stop() antes.
+    """
+
+    def __init__(self, max_size=50, flush_seconds=5.0):
+        self.max_size = max_size
+        self.flush_seconds = flush_seconds
+        self._records = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+
+    def add(self, access_log, pending_geolocation=False):
+        """
+        Adiciona o log ao buffer. Se pending_geolocation for verdadeiro, a
+        geolocalização é agendada depois que o log tiver id.
+        """
+        # A data é a do acesso, não a da gravação (que pode cair no dia seguinte)
+        access_log.date = timezone.localdate(access_log.timestamp)
+        with self._lock:
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(target=self._run, name='access-log-buffer', daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+            self._records.append((access_log, pending_geolocation))
+            # Depois de stop() não há thread de gravação: grava na hora
+            full = len(self._records) >= self.max_size or self._stopped
+        if full:
+            self.flush()
+
+    def flush(self):
+        """
+        Grava os logs acumulados. Retorna o número de registros gravados.
+        """
+        with self._flush_lock:
+            with self._lock:
+                records, self._records = self._records, []
+            if not records:
+                return 0
+
+            try:
+                AccessLog.objects.bulk_create([access_log for access_log, _ in records])
+            except Exception as e:
+                # Um registro inválido não deve descartar o lote inteiro
+                logger.error(f"Erro ao gravar {len(records)} logs de acesso em lote: {str(e)}")
+                records = self._save_individually(records)
+
+        for access_log, pending_geolocation in records:
+            if pending_geolocation and access_log.pk is not None:
+                geolocation_queue.enqueue(access_log.ip_address, access_log.pk)
+        return len(records)
+
+    def _save_individually(self, records):
+        saved = []
+        for access_log, pending_geolocation in records:
+            access_log.pk = None
+            try:
+                access_log.save()
+            except Exception as e:
+                logger.error(f"Erro ao gravar log de acesso: {str(e)}")
+                continue
+            saved.append((access_log, pending_geolocation))
+        return saved
+
+    def stop(self):
+        """
+        Grava os logs pendentes e encerra a gravação periódica.
+        Deve ser chamado enquanto o banco ainda está disponível.
+        """
+        with self._lock:
+            self._stopped = True
+        atexit.unregister(self.stop)
+        return self.flush()
+
+    def _run(self):
+        while not self._stopped:
+            time.sleep(self.flush_seconds)
+            try:
+                close_old_connections()
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+access_log_buffer = AccessLogBuffer(
+    max_size=settings.ANALYTICS_CONFIG.get('BUFFER_SIZE', 50),
+    flush_seconds=settings.ANALYTICS_CONFIG.get('BUFFER_FLUSH_SECONDS', 5),
+)
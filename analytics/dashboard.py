@@ -0,0 +1,185 @@
+# analytics/dashboard.py
+# Dados dos widgets do dashboard de analytics, calculados e armazenados em cache separadamente
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .geo_cache import geo_cache
+from .heavy_hitters import top_items
+from .hll import HyperLogLog, merge_sketches
+from .rollup import COUNT_FIELDS, summaries_between
+
+# Períodos disponíveis no dashboard (dias)
+PERIODS = {
+    '7days': 7,
+    '30days': 30,
+    '1year': 365,
+}
+DEFAULT_PERIOD = '7days'
+
+
+def period_range(period):
+    """
+    Normaliza o período e retorna (period, start_date, end_date).
+
+    As datas estão no fuso local, o mesmo das datas dos resumos diários.
+    """
+    if period not in PERIODS:
+        period = DEFAULT_PERIOD
+    end_date = timezone.localtime()
+    start_date = end_date - timedelta(days=PERIODS[period])
+    return period, start_date, end_date
+
+
+def _summaries(start_date, end_date):
+    return list(summaries_between(start_date.date(), end_date.date()))
+
+
+def _daily_counts(start_date, end_date):
+    """
+    Contagens de cada dia do período em uma única consulta agrupada por data.
+
+    Só as colunas de contagem dos resumos são lidas (sem sketches nem dados
+    geográficos), então o período de um ano continua sendo uma consulta leve.
+
+    Returns:
+        dict: {data: {campo: contagem}}
+    """
+    rows = summaries_between(start_date.date(), end_date.date()).values('date', *COUNT_FIELDS)
+    return {row.pop('date'): row for row in rows}
+
+
+def _period_counts(start_date, end_date, unique_visitors=False):
+    """
+    Totais do período somados em Python a partir das contagens diárias.
+
+    Com unique_visitors=True os visitantes únicos de mais de um dia são
+    estimados pela união dos sketches diários (uma consulta a mais).
+    """
+    days = _daily_counts(start_date, end_date)
+    totals = {field: sum(day[field] for day in days.values()) for field in COUNT_FIELDS}
+    if unique_visitors and len(days) > 1:
+        sketches = list(summaries_between(start_date.date(), end_date.date()).values_list(
+            'visitor_sketch', 'unique_visitors'
+        ))
+        merged = merge_sketches(HyperLogLog.from_bytes(sketch) for sketch, _ in sketches if sketch)
+        unsketched = sum(count for sketch, count in sketches if not sketch)
+        if merged is not None:
+            totals['unique_visitors'] = merged.count() + unsketched
+    return totals
+
+
+def _percentage(part, total):
+    return round((part / total * 100) if total > 0 else 0, 1)
+
+
+def totals_widget(start_date, end_date):
+    totals = _period_counts(start_date, end_date, unique_visitors=True)
+    return {
+        'total_visits': totals['total_visits'],
+        'unique_visitors': totals['unique_visitors'],
+        'total_calculations': totals['total_calculations'],
+        'start_date': start_date.strftime('%d/%m'),
+        'end_date': end_date.strftime('%d/%m'),
+    }
+
+
+def daily_widget(start_date, end_date):
+    visits_by_date = {date: day['total_visits'] for date, day in _daily_counts(start_date, end_date).items()}
+    daily_visits = []
+    current_date = start_date.date()
+    while current_date <= end_date.date():
+        daily_visits.append({
+            'date': current_date.strftime('%d/%m'),
+            'visits': visits_by_date.get(current_date, 0)
+        })
+        current_date += timedelta(days=1)
+    return {'daily_visits': daily_visits}
+
+
+def top_states_widget(start_date, end_date):
+    states = top_items(_summaries(start_date, end_date), 'states', 10)
+    return {'top_states': [{'state': state, 'count': count} for state, count, error in states]}
+
+
+def top_cities_widget(start_date, end_date):
+    top_cities = []
+    for item, count, error in top_items(_summaries(start_date, end_date), 'cities', 15):
+        city, _, state = item.partition('/')
+        top_cities.append({'city': city, 'state': state, 'count': count})
+    return {'top_cities': top_cities}
+
+
+def top_paths_widget(start_date, end_date):
+    paths = top_items(_summaries(start_date, end_date), 'paths', 10)
+    return {'top_paths': [{'path': path, 'count': count} for path, count, error in paths]}
+
+
+def top_configurations_widget(start_date, end_date):
+    configurations = top_items(_summaries(start_date, end_date), 'configurations', 10)
+    return {'top_configurations': [
+        {'configuration': configuration, 'count': count}
+        for configuration, count, error in configurations
+    ]}
+
+
+def calc_types_widget(start_date, end_date):
+    totals = _period_counts(start_date, end_date)
+    return {'calculations_by_type': {
+        'potencia': totals['potencia_calculations'],
+        'espiras': totals['espiras_calculations'],
+        'diagrama': totals['diagrama_calculations'],
+    }}
+
+
+def devices_widget(start_date, end_date):
+    totals = _period_counts(start_date, end_date)
+    mobile_visits, desktop_visits = totals['mobile_visits'], totals['desktop_visits']
+    total_visits = totals['total_visits']
+    return {
+        'mobile_visits': mobile_visits,
+        'desktop_visits': desktop_visits,
+        'mobile_percentage': _percentage(mobile_visits, total_visits),
+        'desktop_percentage': _percentage(desktop_visits, total_visits),
+    }
+
+
+def geo_cache_widget(start_date, end_date):
+    return {'geo_cache_stats': geo_cache.stats()}
+
+
+# Widget → (função, tempo de cache em segundos); 0 = sem cache
+WIDGETS = {
+    'totals': (totals_widget, 60),
+    'daily': (daily_widget, 300),
+    'top_states': (top_states_widget, 300),
+    'top_cities': (top_cities_widget, 300),
+    'top_paths': (top_paths_widget, 300),
+    'top_configurations': (top_configurations_widget, 300),
+    'calc_types': (calc_types_widget, 120),
+    'devices': (devices_widget, 300),
+    'geo_cache': (geo_cache_widget, 0),
+}
+
+
+def widget_data(widget, period):
+    """
+    Dados de um widget para o período, lidos do cache quando possível.
+
+    Raises:
+        KeyError: Se o widget não existir
+    """
+    builder, ttl = WIDGETS[widget]
+    period, start_date, end_date = period_range(period)
+
+    cache_key = f'analytics_widget_{widget}_{period}'
+    if ttl:
+        data = cache.get(cache_key)
+        if data is not None:
+            return data
+
+    data = builder(start_date, end_date)
+    if ttl:
+        cache.set(cache_key, data, ttl)
+    return data
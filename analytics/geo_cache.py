@@ -0,0 +1,127 @@
+# analytics/geo_cache.py
+# Cache de geolocalização em duas camadas (memória do processo + cache persistente)
+import ipaddress
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Prefixos usados como chave: IPs da mesma sub-rede compartilham a localização
+IPV4_PREFIX = 24
+IPV6_PREFIX = 48
+
+# Incrementar se o formato das chaves ou dos valores mudar
+CACHE_KEY_PREFIX = 'geo_location_v2'
+
+
+def subnet_key(ip_address):
+    """
+    Chave de cache da sub-rede do IP (/24 para IPv4, /48 para IPv6).
+    """
+    try:
+        ip = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return f'{CACHE_KEY_PREFIX}_{ip_address}'
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    prefix = IPV4_PREFIX if ip.version == 4 else IPV6_PREFIX
+    network = ipaddress.ip_network(f'{ip}/{prefix}', strict=False)
+    return f'{CACHE_KEY_PREFIX}_{network.network_address}_{prefix}'
+
+
+class GeoCache:
+    """
+    Cache de geolocalização com uma LRU local na frente do cache persistente.
+
+    As chaves são normalizadas por sub-rede. Consultas que falharam ficam em
+    cache como {} (cache negativo) por um tempo menor, para não repetir a
+    chamada às APIs nem tratá-las como ausentes. Os contadores de acertos
+    permitem acompanhar a eficiência de cada camada.
+    """
+
+    def __init__(self, max_size=4096, ttl=24 * 3600, negative_ttl=1800, cache_alias='default'):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.cache_alias = cache_alias
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'local_hits': 0, 'persistent_hits': 0, 'negative_hits': 0, 'misses': 0}
+
+    def _count(self, counter, record_stats=True):
+        if not record_stats:
+            return
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return value
+
+    def _set_local(self, key, value, ttl):
+        with self._lock:
+            self._local[key] = (value, time.monotonic() + ttl)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+    def get(self, ip_address, record_stats=True):
+        """
+        Retorna a localização em cache da sub-rede do IP: um dict (vazio se a
+        consulta falhou anteriormente) ou None se não houver nada em cache.
+        Com record_stats=False a consulta não entra nos contadores.
+        """
+        key = subnet_key(ip_address)
+        value = self._get_local(key)
+        if value is not None:
+            self._count('negative_hits' if not value else 'local_hits', record_stats)
+            return value
+
+        value = caches[self.cache_alias].get(key)
+        if value is None:
+            self._count('misses', record_stats)
+            return None
+
+        # Promove para a camada local com o tempo de vida correspondente
+        self._set_local(key, value, self.ttl if value else self.negative_ttl)
+        self._count('negative_hits' if not value else 'persistent_hits', record_stats)
+        return value
+
+    def set(self, ip_address, geo_data):
+        """
+        Armazena a localização da sub-rede nas duas camadas; um resultado
+        vazio é armazenado como cache negativo.
+        """
+        key = subnet_key(ip_address)
+        value = geo_data or {}
+        ttl = self.ttl if value else self.negative_ttl
+        self._set_local(key, value, ttl)
+        caches[self.cache_alias].set(key, value, ttl)
+
+    def stats(self):
+        """
+        Contadores de acertos por camada e taxa de acerto total.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['local_size'] = len(self._local)
+        lookups = stats['local_hits'] + stats['persistent_hits'] + stats['negative_hits'] + stats['misses']
+        stats['hit_rate'] = round((lookups - stats['misses']) / lookups * 100, 1) if lookups else 0.0
+        return stats
+
+
+geo_cache = GeoCache(
+    max_size=settings.ANALYTICS_CONFIG.get('GEOLOCATION_LOCAL_CACHE_SIZE', 4096),
+    ttl=settings.ANALYTICS_CONFIG.get('GEOLOCATION_CACHE_HOURS', 24) * 3600,
+    negative_ttl=settings.ANALYTICS_CONFIG.get('GEOLOCATION_NEGATIVE_CACHE_MINUTES', 30) * 60,
+)
@@ -0,0 +1,188 @@
+# analytics/geo_client.py
+# Cliente HTTP das APIs de geolocalização: sessão reutilizável, cota diária e circuit breaker
+import logging
+import threading
+import time
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from .models import GeolocationBudget
+
+logger = logging.getLogger(__name__)
+
+# Campos pedidos à API de fallback (ip-api.com)
+FALLBACK_FIELDS = 'status,country,countryCode,region,regionName,city,zip,lat,lon,isp,org'
+
+# Dias de histórico de cota mantidos no banco
+BUDGET_HISTORY_DAYS = 7
+
+
+class CircuitBreaker:
+    """
+    Interrompe as chamadas a um provedor após falhas consecutivas.
+
+    Depois de failure_threshold falhas seguidas o circuito abre e nenhuma
+    chamada é feita até cooldown segundos depois; então uma única chamada de
+    teste é liberada e, se ela funcionar, o circuito fecha novamente.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=300):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.cooldown:
+                # Libera uma chamada de teste e mantém o circuito aberto até o resultado
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"Circuito de geolocalização aberto após {self._failures} falhas")
+                self._opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+
+class GeoLocationClient:
+    """
+    Consulta as APIs de geolocalização (ipapi.co e, como alternativa, ip-api.com).
+
+    As requisições usam uma sessão HTTP com keep-alive e timeouts curtos. Cada
+    provedor tem um circuit breaker próprio e uma cota diária de requisições,
+    contada em GeolocationBudget para ser compartilhada entre os processos.
+    """
+
+    def __init__(self, primary_url, fallback_url, timeout=0.8, daily_budget=1000,
+                 failure_threshold=5, cooldown=300, pool_size=4):
+        self.urls = {'primary': primary_url, 'fallback': fallback_url}
+        self.timeout = timeout
+        self.daily_budget = daily_budget
+        self.breakers = {
+            provider: CircuitBreaker(failure_threshold, cooldown) for provider in self.urls
+        }
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'MotorCalcPro/1.0'
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _consume_budget(self, provider):
+        """
+        Reserva uma requisição na cota diária do provedor. Retorna False se a cota acabou.
+
+        O incremento é um UPDATE condicional (used < cota), atômico no banco,
+        então processos e threads concorrentes nunca ultrapassam a cota.
+        """
+        if not self.daily_budget:
+            return True
+        today = timezone.localdate()
+        budget = GeolocationBudget.objects.filter(provider=provider, date=today, used__lt=self.daily_budget)
+        if budget.update(used=F('used') + 1):
+            return True
+
+        # Primeira requisição do dia (ou cota esgotada)
+        _, created = GeolocationBudget.objects.get_or_create(
+            provider=provider, date=today, defaults={'used': 1}
+        )
+        if created:
+            GeolocationBudget.objects.filter(date__lt=today - timedelta(days=BUDGET_HISTORY_DAYS)).delete()
+            return True
+        # Outro processo pode ter criado o registro entre o UPDATE e o get_or_create
+        return bool(budget.update(used=F('used') + 1))
+
+    def _get_json(self, provider, ip_address, params=None):
+        """
+        Faz a requisição ao provedor, respeitando o circuit breaker e a cota.
+        Retorna o JSON da resposta ou None.
+        """
+        breaker = self.breakers[provider]
+        if not breaker.allow():
+            return None
+        if not self._consume_budget(provider):
+            logger.debug(f"Cota diária de geolocalização esgotada ({provider})")
+            return None
+
+        try:
+            response = self.session.get(
+                self.urls[provider].format(ip=ip_address),
+                params=params,
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            breaker.record_failure()
+            logger.error(f"Erro ao buscar geolocalização para IP {ip_address} ({provider}): {str(e)}")
+            return None
+
+        # Limite de requisições ou erro do servidor contam como falha do provedor
+        if response.status_code == 429 or response.status_code >= 500:
+            breaker.record_failure()
+            return None
+        breaker.record_success()
+
+        if response.status_code != 200:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    def lookup(self, ip_address):
+        """
+        Busca a geolocalização do IP no provedor principal e, se falhar, no
+        fallback. Retorna {} se nenhum dos dois responder.
+        """
+        data = self._get_json('primary', ip_address)
+        if data and not data.get('error'):
+            return data
+
+        data = self._get_json('fallback', ip_address, params={'fields': FALLBACK_FIELDS})
+        if data and data.get('status') == 'success':
+            # Converte para formato compatível
+            return {
+                'country_name': data.get('country', 'Brasil'),
+                'country_code': data.get('countryCode', 'BR'),
+                'region': data.get('regionName', ''),
+                'region_code': data.get('region', ''),
+                'city': data.get('city', ''),
+                'postal': data.get('zip', ''),
+                'latitude': data.get('lat'),
+                'longitude': data.get('lon'),
+                'org': data.get('org', ''),
+                'isp': data.get('isp', '')
+            }
+        return {}
+
+
+geolocation_client = GeoLocationClient(
+    primary_url=settings.ANALYTICS_CONFIG.get('GEOLOCATION_PRIMARY_URL', 'https://ipapi.co/{ip}/json/'),
+    fallback_url=settings.ANALYTICS_CONFIG.get('GEOLOCATION_FALLBACK_URL', 'http://ip-api.com/json/{ip}'),
+    timeout=settings.ANALYTICS_CONFIG.get('GEOLOCATION_TIMEOUT', 0.8),
+    daily_budget=settings.ANALYTICS_CONFIG.get('MAX_REQUESTS_PER_DAY', 1000),
+    failure_threshold=settings.ANALYTICS_CONFIG.get('GEOLOCATION_BREAKER_FAILURES', 5),
+    cooldown=settings.ANALYTICS_CONFIG.get('GEOLOCATION_BREAKER_COOLDOWN', 300),
+    pool_size=settings.ANALYTICS_CONFIG.get('GEOLOCATION_WORKERS', 2),
+)
@@ -0,0 +1,214 @@
+# analytics/geolocation.py
+# Consulta de geolocalização por IP e preenchimento assíncrono dos logs de acesso
+import ipaddress
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .geo_cache import geo_cache, subnet_key
+from .geo_client import geolocation_client
+from .heavy_hitters import tracker as heavy_hitters
+from .ip_database import lookup_ip_database
+from .live import live_counters
+from .models import AccessLog
+
+logger = logging.getLogger(__name__)
+
+# Nomes de estados brasileiros normalizados (nome sem acento ou sigla → nome oficial)
+STATE_NAMES = {
+    'sao paulo': 'São Paulo',
+    'sp': 'São Paulo',
+    'rio de janeiro': 'Rio de Janeiro',
+    'rj': 'Rio de Janeiro',
+    'minas gerais': 'Minas Gerais',
+    'mg': 'Minas Gerais',
+    'rio grande do sul': 'Rio Grande do Sul',
+    'rs': 'Rio Grande do Sul',
+    'parana': 'Paraná',
+    'pr': 'Paraná',
+    'santa catarina': 'Santa Catarina',
+    'sc': 'Santa Catarina',
+    'bahia': 'Bahia',
+    'ba': 'Bahia',
+    'pernambuco': 'Pernambuco',
+    'pe': 'Pernambuco',
+    'ceara': 'Ceará',
+    'ce': 'Ceará',
+    'goias': 'Goiás',
+    'go': 'Goiás',
+    'distrito federal': 'Distrito Federal',
+    'df': 'Distrito Federal',
+    'espirito santo': 'Espírito Santo',
+    'es': 'Espírito Santo',
+    'maranhao': 'Maranhão',
+    'ma': 'Maranhão',
+    'mato grosso': 'Mato Grosso',
+    'mt': 'Mato Grosso',
+    'mato grosso do sul': 'Mato Grosso do Sul',
+    'ms': 'Mato Grosso do Sul',
+    'para': 'Pará',
+    'pa': 'Pará',
+    'paraiba': 'Paraíba',
+    'pb': 'Paraíba',
+    'piaui': 'Piauí',
+    'pi': 'Piauí',
+    'rio grande do norte': 'Rio Grande do Norte',
+    'rn': 'Rio Grande do Norte',
+    'sergipe': 'Sergipe',
+    'se': 'Sergipe',
+    'alagoas': 'Alagoas',
+    'al': 'Alagoas',
+    'tocantins': 'Tocantins',
+    'to': 'Tocantins',
+    'rondonia': 'Rondônia',
+    'ro': 'Rondônia',
+    'acre': 'Acre',
+    'ac': 'Acre',
+    'amazonas': 'Amazonas',
+    'am': 'Amazonas',
+    'roraima': 'Roraima',
+    'rr': 'Roraima',
+    'amapa': 'Amapá',
+    'ap': 'Amapá',
+}
+
+
+def is_public_ip(ip_address):
+    """
+    Indica se o IP pode ser geolocalizado (endereços locais, privados ou
+    inválidos nunca são enviados às APIs externas)
+    """
+    try:
+        ip = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return False
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return not (ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_multicast or ip.is_unspecified)
+
+
+def get_geolocation(ip_address):
+    """
+    Busca dados de geolocalização na base local de faixas de IP, se configurada,
+    ou nas APIs externas (ipapi.co, com ip-api.com como alternativa)
+    """
+    local_data = lookup_ip_database(ip_address)
+    if local_data is not None:
+        return local_data
+    return geolocation_client.lookup(ip_address)
+
+
+def normalize_state_name(state_name):
+    """
+    Normaliza nomes de estados brasileiros
+    """
+    # Normaliza a string
+    normalized = state_name.lower().strip()
+    return STATE_NAMES.get(normalized, state_name)
+
+
+def geo_fields(geo_data):
+    """
+    Converte os dados de geolocalização nos campos correspondentes do AccessLog
+    """
+    return {
+        'country': geo_data.get('country_name', 'Brasil'),
+        'country_code': geo_data.get('country_code', 'BR'),
+        'state': normalize_state_name(geo_data.get('region', '')),
+        'state_code': geo_data.get('region_code', ''),
+        'city': geo_data.get('city', ''),
+        'postal_code': geo_data.get('postal', ''),
+        'latitude': geo_data.get('latitude'),
+        'longitude': geo_data.get('longitude'),
+        'isp': geo_data.get('org', ''),
+    }
+
+
+def lookup_geolocation(ip_address, record_stats=True):
+    """
+    Retorna a geolocalização do IP, consultando as APIs externas apenas se a
+    sub-rede não estiver em cache ({} se a consulta falhar)
+    """
+    geo_data = geo_cache.get(ip_address, record_stats)
+    if geo_data is None:
+        geo_data = get_geolocation(ip_address)
+        geo_cache.set(ip_address, geo_data)
+    return geo_data
+
+
+class GeoLocationQueue:
+    """
+    Fila limitada de enriquecimento de geolocalização processada em segundo plano.
+
+    O middleware apenas enfileira (ip, id do log); as threads de trabalho consultam
+    as APIs externas e preenchem os campos geográficos do AccessLog depois. Vários
+    logs da mesma sub-rede aguardando na fila compartilham uma única consulta. Com a fila
+    cheia o log é mantido sem geolocalização em vez de bloquear a requisição.
+    """
+
+    def __init__(self, maxsize=1000, workers=1):
+        self.maxsize = maxsize
+        self.workers = workers
+        self._queue = None
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _start(self):
+        self._queue = queue.Queue(maxsize=self.maxsize)
+        for i in range(self.workers):
+            threading.Thread(target=self._run, name=f'geolocation-{i}', daemon=True).start()
+
+    def enqueue(self, ip_address, log_id):
+        """
+        Agenda o preenchimento da geolocalização do log. Retorna False se a
+        fila estiver cheia ou se o IP não for público.
+        """
+        if not is_public_ip(ip_address):
+            return False
+        with self._lock:
+            if self._queue is None:
+                self._start()
+            key = subnet_key(ip_address)
+            if key in self._pending:
+                self._pending[key][1].append(log_id)
+                return True
+            try:
+                self._queue.put_nowait(key)
+            except queue.Full:
+                logger.warning(f"Fila de geolocalização cheia; log {log_id} ficará sem localização")
+                return False
+            self._pending[key] = (ip_address, [log_id])
+            return True
+
+    def _run(self):
+        while True:
+            key = self._queue.get()
+            with self._lock:
+                ip_address, log_ids = self._pending[key]
+            try:
+                close_old_connections()
+                # A requisição já contou a falta no cache
+                geo_data = lookup_geolocation(ip_address, record_stats=False)
+                with self._lock:
+                    ip_address, log_ids = self._pending.pop(key)
+                if geo_data and log_ids:
+                    fields = geo_fields(geo_data)
+                    AccessLog.objects.filter(pk__in=log_ids).update(**fields)
+                    heavy_hitters.record_location(fields['state'], fields['city'], len(log_ids))
+                    live_counters.record_state(fields['state'], len(log_ids))
+            except Exception as e:
+                with self._lock:
+                    self._pending.pop(key, None)
+                logger.error(f"Erro ao preencher geolocalização do IP {ip_address}: {str(e)}")
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+
+geolocation_queue = GeoLocationQueue(
+    maxsize=settings.ANALYTICS_CONFIG.get('GEOLOCATION_QUEUE_SIZE', 1000),
+    workers=settings.ANALYTICS_CONFIG.get('GEOLOCATION_WORKERS', 1),
+)
@@ -0,0 +1,262 @@
+# analytics/heavy_hitters.py
+# Contadores dos itens mais frequentes (Space-Saving) atualizados a cada acesso
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from ThreePhaseCoils.models import MotorConfiguration
+
+from .models import DailyStatsSummary
+
+logger = logging.getLogger(__name__)
+
+# Dimensões acompanhadas
+DIMENSIONS = ('states', 'cities', 'paths', 'configurations')
+
+# Parâmetros que identificam uma configuração de motor nas requisições
+CONFIGURATION_PARAMS = ('S', 'P', 'Camada', 'g_type', 'y')
+
+# Caminhos mais longos são truncados antes de serem contados
+MAX_PATH_LENGTH = 200
+
+# Maior valor aceito para S, P e y ao contar configurações
+MAX_CONFIGURATION_VALUE = 1000
+
+# Tentativas de gravar um dia quando outro processo o altera ao mesmo tempo
+FLUSH_ATTEMPTS = 5
+
+
+class SpaceSaving:
+    """
+    Resumo Space-Saving com no máximo capacity itens.
+
+    Cada item guarda (contagem, erro): a contagem nunca é menor que a
+    frequência real e a supera em no máximo o erro. Itens com frequência
+    acima de N/capacity estão sempre presentes. Resumos podem ser combinados.
+    """
+
+    def __init__(self, capacity=100, counters=None):
+        self.capacity = capacity
+        self.counters = {item: [count, error] for item, count, error in (counters or [])}
+
+    def offer(self, item, count=1):
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += count
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[item] = [count, 0]
+            return
+
+        # Substitui o item de menor contagem, herdando a contagem dele como erro
+        smallest = min(self.counters, key=lambda key: self.counters[key][0])
+        minimum = self.counters.pop(smallest)[0]
+        self.counters[item] = [minimum + count, minimum]
+
+    def merge(self, other):
+        """
+        Soma outro resumo a este, mantendo os capacity itens de maior contagem.
+        """
+        for item, (count, error) in other.counters.items():
+            counter = self.counters.setdefault(item, [0, 0])
+            counter[0] += count
+            counter[1] += error
+        if len(self.counters) > self.capacity:
+            kept = sorted(self.counters.items(), key=lambda entry: -entry[1][0])[:self.capacity]
+            self.counters = dict(kept)
+        return self
+
+    def top(self, k):
+        """
+        Os k itens mais frequentes como [(item, contagem, erro), ...].
+        """
+        ranked = sorted(self.counters.items(), key=lambda entry: -entry[1][0])[:k]
+        return [(item, count, error) for item, (count, error) in ranked]
+
+    def to_list(self):
+        return [[item, count, error] for item, count, error in self.top(self.capacity)]
+
+
+class HeavyHitterTracker:
+    """
+    Mantém um SpaceSaving por dia e dimensão em memória e os grava
+    periodicamente em DailyStatsSummary.heavy_hitters, somando aos valores
+    já gravados pelos demais processos.
+
+    Como o buffer de logs, só registra stop() para o encerramento do processo
+    quando a thread de gravação é iniciada.
+    """
+
+    def __init__(self, capacity=100, flush_seconds=60):
+        self.capacity = capacity
+        self.flush_seconds = flush_seconds
+        self._summaries = defaultdict(dict)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+
+    def record(self, dimension, item, count=1):
+        if not item:
+            return
+        with self._lock:
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(target=self._run, name='heavy-hitters', daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+            day = self._summaries[timezone.localdate()]
+            summary = day.get(dimension)
+            if summary is None:
+                summary = day[dimension] = SpaceSaving(self.capacity)
+            summary.offer(item, count)
+
+    def record_location(self, state, city, count=1):
+        self.record('states', state, count)
+        if city:
+            self.record('cities', f'{city}/{state}' if state else city, count)
+
+    def record_request(self, request):
+        """
+        Registra o caminho e, se a requisição tiver uma configuração de motor
+        válida, a configuração.
+        """
+        self.record('paths', request.path[:MAX_PATH_LENGTH])
+        params = request.POST if request.method == 'POST' else request.GET
+        configuration = configuration_label([params.get(name) for name in CONFIGURATION_PARAMS])
+        if configuration:
+            self.record('configurations', configuration)
+
+    def flush(self):
+        """
+        Soma os contadores em memória aos dos resumos diários e os zera.
+
+        Dias que não puderem ser gravados voltam para a memória e são
+        tentados de novo no próximo flush.
+        """
+        with self._lock:
+            pending, self._summaries = self._summaries, defaultdict(dict)
+        for date, dimensions in pending.items():
+            try:
+                saved = self._save(date, dimensions)
+            except Exception as e:
+                logger.error(f"Erro ao gravar os itens mais frequentes de {date}: {str(e)}")
+                saved = False
+            if not saved:
+                self._restore(date, dimensions)
+
+    def _save(self, date, dimensions):
+        """
+        Grava os contadores de um dia com controle otimista: o UPDATE só é
+        aplicado se updated_at não mudou desde a leitura.
+
+        Returns:
+            bool: True se gravou
+        """
+        for attempt in range(FLUSH_ATTEMPTS):
+            summary, _ = DailyStatsSummary.objects.get_or_create(date=date)
+            stored = summary.heavy_hitters or {}
+            for dimension, counters in dimensions.items():
+                merged = SpaceSaving(self.capacity, stored.get(dimension)).merge(counters)
+                stored[dimension] = merged.to_list()
+            updated = DailyStatsSummary.objects.filter(
+                pk=summary.pk, updated_at=summary.updated_at
+            ).update(heavy_hitters=stored, updated_at=timezone.now())
+            if updated:
+                return True
+        logger.warning(f"Resumo de {date} alterado concorrentemente; itens mais frequentes ficam para o próximo flush")
+        return False
+
+    def _restore(self, date, dimensions):
+        with self._lock:
+            day = self._summaries[date]
+            for dimension, counters in dimensions.items():
+                current = day.get(dimension)
+                day[dimension] = counters if current is None else counters.merge(current)
+
+    def reset(self):
+        """
+        Descarta os contadores em memória sem gravá-los.
+        """
+        with self._lock:
+            self._summaries = defaultdict(dict)
+
+    def stop(self):
+        """
+        Grava os contadores pendentes e encerra a gravação periódica.
+        Deve ser chamado enquanto o banco ainda está disponível.
+        """
+        with self._lock:
+            self._stopped = True
+        atexit.unregister(self.stop)
+        self.flush()
+
+    def _run(self):
+        while not self._stopped:
+            time.sleep(self.flush_seconds)
+            try:
+                close_old_connections()
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+def configuration_label(values):
+    """
+    Rótulo da configuração (S, P, Camada, g_type, y) ou None se algum valor
+    estiver ausente ou fora do catálogo de opções.
+    """
+    if not all(values):
+        return None
+    S, P, Camada, g_type, y = values
+    try:
+        S, P, y = int(S), int(P), int(y)
+    except ValueError:
+        return None
+    if not all(0 < value <= MAX_CONFIGURATION_VALUE for value in (S, P, y)):
+        return None
+    if Camada not in dict(MotorConfiguration.CAMADA_CHOICES) or g_type not in dict(MotorConfiguration.G_TYPE_CHOICES):
+        return None
+    return f'{S}/{P} {Camada} {g_type} y={y}'
+
+
+def _geographic_counters(summary, dimension):
+    """
+    Contadores de estados/cidades a partir de geographic_data, para dias sem
+    contadores Space-Saving gravados.
+    """
+    geographic_data = summary.geographic_data or {}
+    if dimension == 'states':
+        return [[s['state'], s['visits'], 0] for s in geographic_data.get('states', [])]
+    if dimension == 'cities':
+        return [
+            [f"{c['city']}/{c['state']}" if c['state'] else c['city'], c['visits'], 0]
+            for c in geographic_data.get('cities', [])
+        ]
+    return None
+
+
+def top_items(summaries, dimension, k):
+    """
+    Os k itens mais frequentes de uma dimensão no período, combinando os
+    resumos Space-Saving de cada dia.
+
+    Returns:
+        list: [(item, contagem, erro), ...]
+    """
+    combined = SpaceSaving(tracker.capacity)
+    for summary in summaries:
+        counters = (summary.heavy_hitters or {}).get(dimension) or _geographic_counters(summary, dimension)
+        if counters:
+            combined.merge(SpaceSaving(tracker.capacity, counters))
+    return combined.top(k)
+
+
+tracker = HeavyHitterTracker(
+    capacity=settings.ANALYTICS_CONFIG.get('HEAVY_HITTERS_CAPACITY', 100),
+    flush_seconds=settings.ANALYTICS_CONFIG.get('HEAVY_HITTERS_FLUSH_SECONDS', 60),
+)
@@ -0,0 +1,105 @@
+# analytics/hll.py
+# HyperLogLog: contagem aproximada de visitantes distintos, combinável entre dias
+import hashlib
+import math
+import zlib
+
+MIN_PRECISION = 4
+MAX_PRECISION = 16
+
+
+def precision_for_error(error):
+    """
+    Precisão (bits de índice) necessária para o erro relativo padrão desejado
+    (erro ≈ 1,04 / √(2^p)).
+    """
+    precision = math.ceil(math.log2((1.04 / error) ** 2))
+    return min(max(precision, MIN_PRECISION), MAX_PRECISION)
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """
+    Sketch HyperLogLog com hash de 64 bits.
+
+    Ocupa 2^precision bytes, estima a cardinalidade com erro padrão de
+    1,04/√(2^precision) e pode ser combinado (merge) com outros sketches,
+    inclusive de precisão diferente.
+    """
+
+    def __init__(self, precision=12, registers=None):
+        if not MIN_PRECISION <= precision <= MAX_PRECISION:
+            raise ValueError(f'Precisão fora do intervalo {MIN_PRECISION}–{MAX_PRECISION}: {precision}')
+        self.precision = precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(1 << precision)
+
+    def add(self, value):
+        x = _hash(value)
+        bits = 64 - self.precision
+        index = x >> bits
+        rest = x & ((1 << bits) - 1)
+        rank = bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Correção para cardinalidades pequenas (contagem linear)
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def reduced(self, precision):
+        """
+        Cópia do sketch com precisão menor, para combinar com sketches menos precisos.
+        """
+        if precision == self.precision:
+            return HyperLogLog(precision, self.registers)
+        if precision > self.precision:
+            raise ValueError('Não é possível aumentar a precisão de um sketch')
+
+        shift = self.precision - precision
+        reduced = HyperLogLog(precision)
+        for index, rank in enumerate(self.registers):
+            if not rank:
+                continue
+            # Os bits de índice descartados passam a ser os primeiros bits do restante do hash
+            dropped = index & ((1 << shift) - 1)
+            new_rank = shift - dropped.bit_length() + 1 if dropped else shift + rank
+            new_index = index >> shift
+            if new_rank > reduced.registers[new_index]:
+                reduced.registers[new_index] = new_rank
+        return reduced
+
+    def merge(self, other):
+        """
+        Retorna a união dos dois sketches (na menor das duas precisões).
+        """
+        precision = min(self.precision, other.precision)
+        a, b = self.reduced(precision), other.reduced(precision)
+        a.registers = bytearray(max(x, y) for x, y in zip(a.registers, b.registers))
+        return a
+
+    def to_bytes(self):
+        return bytes([self.precision]) + zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = bytes(data)
+        return cls(data[0], zlib.decompress(data[1:]))
+
+
+def merge_sketches(sketches):
+    """
+    União de vários sketches; None se a lista estiver vazia.
+    """
+    merged = None
+    for sketch in sketches:
+        merged = sketch if merged is None else merged.merge(sketch)
+    return merged
@@ -0,0 +1,343 @@
+# analytics/ip_database.py
+# Base local de faixas de IP → localização, consultada por busca binária
+import csv
+import ipaddress
+import json
+import logging
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_right
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Cabeçalho do arquivo de índice
+MAGIC = b'PCMGEO1\n'
+
+# Campos de cada localização, no mesmo formato retornado por get_geolocation
+LOCATION_FIELDS = (
+    'country_name', 'country_code', 'region', 'region_code',
+    'city', 'postal', 'latitude', 'longitude', 'org',
+)
+
+# Nomes de colunas aceitos no CSV de origem para cada campo
+COLUMN_ALIASES = {
+    'ip_start': ('ip_start', 'start_ip', 'ip_from', 'range_start'),
+    'ip_end': ('ip_end', 'end_ip', 'ip_to', 'range_end'),
+    'network': ('network', 'cidr'),
+    'ip_version': ('ip_version', 'version', 'family'),
+    'country_name': ('country_name',),
+    'country_code': ('country_code', 'countrycode', 'country'),
+    'region': ('region', 'region_name', 'regionname', 'state', 'stateprov'),
+    'region_code': ('region_code', 'state_code'),
+    'city': ('city',),
+    'postal': ('postal', 'postal_code', 'zip'),
+    'latitude': ('latitude', 'lat'),
+    'longitude': ('longitude', 'lon', 'lng'),
+    'org': ('org', 'isp', 'organization'),
+}
+
+# Ordem das colunas do CSV sem cabeçalho do DB-IP "IP to City Lite"
+DBIP_CITY_LITE_COLUMNS = (
+    'ip_start', 'ip_end', 'continent', 'country_code', 'region', 'city', 'latitude', 'longitude',
+)
+
+
+# Faixa dos endereços IPv4 mapeados em IPv6 (::ffff:0:0/96)
+IPV4_MAPPED_START = 0xFFFF << 32
+IPV4_MAPPED_END = IPV4_MAPPED_START + 2 ** 32 - 1
+
+
+def _parse_version(value):
+    """Versão do IP informada no CSV ('4', '6', 'ipv4', 'ipv6'); None se vazia."""
+    value = value.strip().lower().removeprefix('ipv')
+    if not value:
+        return None
+    if value not in ('4', '6'):
+        raise ValueError(f'versão de IP inválida: {value}')
+    return int(value)
+
+
+def _parse_ip(value, version=None):
+    """
+    Converte um IP em texto ou inteiro para (versão, inteiro).
+
+    Em texto a versão vem do próprio endereço. Inteiros não trazem a versão:
+    ela deve vir da linha (coluna ip_version) ou do arquivo (--versao) e,
+    se nenhuma for informada, é IPv4.
+    """
+    value = value.strip()
+    if value.isdigit():
+        version = version or 4
+        number = int(value)
+        if number >= 2 ** (32 if version == 4 else 128):
+            raise ValueError(f'{value} fora do intervalo IPv{version}')
+        return version, number
+    ip = ipaddress.ip_address(value)
+    if version is not None and ip.version != version:
+        raise ValueError(f'{value} não é um endereço IPv{version}')
+    return ip.version, int(ip)
+
+
+def _parse_float(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except ValueError:
+        return None
+
+
+def _resolve_columns(header):
+    """Mapeia os campos conhecidos para os índices das colunas do cabeçalho."""
+    normalized = [column.strip().lower() for column in header]
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[field] = normalized.index(alias)
+                break
+    return columns
+
+
+def read_ranges(source_path, version=None):
+    """
+    Lê as faixas de IP de um CSV.
+
+    O CSV pode ter cabeçalho (colunas ip_start/ip_end ou network, mais os campos
+    de LOCATION_FIELDS ou sinônimos) ou seguir o formato sem cabeçalho do DB-IP
+    "IP to City Lite". IPs podem estar em texto ou como inteiros; a versão dos
+    inteiros vem da coluna ip_version ou de version (a do arquivo todo).
+
+    Yields:
+        tuple: (versão, início, fim, localização)
+    """
+    with open(source_path, newline='', encoding='utf-8') as source:
+        reader = csv.reader(source)
+        first = next(reader, None)
+        if first is None:
+            return
+
+        try:
+            _parse_ip(first[0])
+            columns = {field: i for i, field in enumerate(DBIP_CITY_LITE_COLUMNS) if field in COLUMN_ALIASES}
+            rows = [first]
+        except ValueError:
+            columns = _resolve_columns(first)
+            rows = []
+            if 'network' not in columns and not ('ip_start' in columns and 'ip_end' in columns):
+                raise ValueError('O CSV precisa das colunas ip_start/ip_end ou network')
+
+        def value(row, field):
+            index = columns.get(field)
+            return row[index].strip() if index is not None and index < len(row) else ''
+
+        for line, row in enumerate(_chain(rows, reader), 1):
+            if not row:
+                continue
+            try:
+                row_version = _parse_version(value(row, 'ip_version')) or version
+                if value(row, 'ip_start'):
+                    start_version, start = _parse_ip(value(row, 'ip_start'), row_version)
+                    end_version, end = _parse_ip(value(row, 'ip_end'), row_version)
+                    if end_version != start_version:
+                        raise ValueError('início e fim de versões diferentes')
+                else:
+                    network = ipaddress.ip_network(value(row, 'network'), strict=False)
+                    start_version, start, end = network.version, int(network[0]), int(network[-1])
+            except ValueError as e:
+                logger.warning(f"Linha {line} ignorada na base de IPs: {str(e)}")
+                continue
+
+            country_code = value(row, 'country_code').upper()
+            country_name = value(row, 'country_name') or ('Brasil' if country_code == 'BR' else country_code)
+            location = (
+                country_name,
+                country_code,
+                value(row, 'region'),
+                value(row, 'region_code'),
+                value(row, 'city'),
+                value(row, 'postal'),
+                _parse_float(value(row, 'latitude')),
+                _parse_float(value(row, 'longitude')),
+                value(row, 'org'),
+            )
+            yield start_version, start, end, location
+
+
+def _chain(first_rows, reader):
+    yield from first_rows
+    yield from reader
+
+
+def build_index(source_path, index_path, version=None):
+    """
+    Gera o arquivo de índice a partir do CSV de faixas de IP.
+
+    O índice guarda, por versão de IP, os inícios e fins das faixas ordenados e o
+    número da localização de cada faixa (localizações repetidas são armazenadas
+    uma única vez). Faixas sobrepostas a uma anterior são descartadas. Faixas
+    IPv6 dentro de ::ffff:0:0/96 são guardadas como IPv4, que é como os
+    endereços mapeados são consultados.
+
+    Returns:
+        dict: {'ipv4', 'ipv6', 'locations', 'skipped'}
+    """
+    locations = {}
+    ranges = {4: [], 6: []}
+    for range_version, start, end, location in read_ranges(source_path, version):
+        if end < start:
+            continue
+        if range_version == 6 and IPV4_MAPPED_START <= start and end <= IPV4_MAPPED_END:
+            range_version, start, end = 4, start - IPV4_MAPPED_START, end - IPV4_MAPPED_START
+        location_id = locations.setdefault(location, len(locations))
+        ranges[range_version].append((start, end, location_id))
+
+    skipped = 0
+    for version in ranges:
+        ranges[version].sort()
+        kept = []
+        for start, end, location_id in ranges[version]:
+            if kept and start <= kept[-1][1]:
+                skipped += 1
+                continue
+            kept.append((start, end, location_id))
+        ranges[version] = kept
+
+    header = json.dumps({
+        'ipv4': len(ranges[4]),
+        'ipv6': len(ranges[6]),
+        'fields': LOCATION_FIELDS,
+        'locations': list(locations),
+    }, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    temp_path = f'{index_path}.tmp'
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    with open(temp_path, 'wb') as index:
+        index.write(MAGIC)
+        index.write(struct.pack('<I', len(header)))
+        index.write(header)
+        for position in range(3):
+            array('I', (r[position] for r in ranges[4])).tofile(index)
+        for position in range(2):
+            index.write(b''.join(r[position].to_bytes(16, 'big') for r in ranges[6]))
+        array('I', (r[2] for r in ranges[6])).tofile(index)
+    os.replace(temp_path, index_path)
+
+    return {
+        'ipv4': len(ranges[4]),
+        'ipv6': len(ranges[6]),
+        'locations': len(locations),
+        'skipped': skipped,
+    }
+
+
+class IPDatabase:
+    """
+    Índice de faixas de IP carregado em memória.
+
+    As faixas IPv4 ficam em arrays de inteiros de 32 bits e as IPv6 em listas
+    de inteiros; cada consulta é uma busca binária pelo início da faixa.
+    """
+
+    def __init__(self, index_path):
+        with open(index_path, 'rb') as index:
+            data = index.read()
+        if not data.startswith(MAGIC):
+            raise ValueError(f'Arquivo de índice inválido: {index_path}')
+
+        offset = len(MAGIC)
+        (header_size,) = struct.unpack_from('<I', data, offset)
+        offset += 4
+        header = json.loads(data[offset:offset + header_size])
+        offset += header_size
+
+        self.locations = [dict(zip(header['fields'], location)) for location in header['locations']]
+
+        def read_array(count):
+            nonlocal offset
+            values = array('I')
+            values.frombytes(data[offset:offset + count * values.itemsize])
+            offset += count * values.itemsize
+            return values
+
+        def read_ipv6(count):
+            nonlocal offset
+            values = [int.from_bytes(data[i:i + 16], 'big') for i in range(offset, offset + count * 16, 16)]
+            offset += count * 16
+            return values
+
+        v4, v6 = header['ipv4'], header['ipv6']
+        self.v4_starts, self.v4_ends, self.v4_locations = read_array(v4), read_array(v4), read_array(v4)
+        self.v6_starts, self.v6_ends = read_ipv6(v6), read_ipv6(v6)
+        self.v6_locations = read_array(v6)
+
+    def lookup(self, ip_address):
+        """
+        Retorna a localização do IP ou {} se ele não estiver em nenhuma faixa.
+        O resultado é compartilhado e não deve ser modificado.
+        """
+        try:
+            ip = ipaddress.ip_address(ip_address)
+        except ValueError:
+            return {}
+        if ip.version == 6 and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+
+        if ip.version == 4:
+            starts, ends, locations = self.v4_starts, self.v4_ends, self.v4_locations
+        else:
+            starts, ends, locations = self.v6_starts, self.v6_ends, self.v6_locations
+
+        number = int(ip)
+        i = bisect_right(starts, number) - 1
+        if i >= 0 and number <= ends[i]:
+            return self.locations[locations[i]]
+        return {}
+
+
+_database = None
+_database_mtime = None
+_database_lock = threading.Lock()
+
+
+def get_database():
+    """
+    Retorna o índice configurado em ANALYTICS_CONFIG['GEOLOCATION_DATABASE'],
+    recarregando-o quando o arquivo muda. Retorna None se não houver índice.
+    """
+    global _database, _database_mtime
+
+    index_path = settings.ANALYTICS_CONFIG.get('GEOLOCATION_DATABASE')
+    if not index_path:
+        return None
+    try:
+        mtime = os.stat(index_path).st_mtime
+    except OSError:
+        return None
+
+    if mtime != _database_mtime:
+        with _database_lock:
+            if mtime != _database_mtime:
+                try:
+                    _database = IPDatabase(index_path)
+                except (OSError, ValueError) as e:
+                    logger.error(f"Erro ao carregar a base de IPs {index_path}: {str(e)}")
+                    _database = None
+                _database_mtime = mtime
+    return _database
+
+
+def lookup_ip_database(ip_address):
+    """
+    Consulta a base local de IPs.
+
+    Returns:
+        dict | None: Localização ({} se o IP não estiver na base) ou None se não
+        houver base local configurada
+    """
+    database = get_database()
+    if database is None:
+        return None
+    return database.lookup(ip_address)
@@ -0,0 +1,206 @@
+# analytics/live.py
+# Contadores ao vivo (visitas, cálculos, estados ativos) compartilhados entre os processos por arquivos locais
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CALCULATION_TYPES = ('potencia', 'espiras', 'diagrama')
+
+
+class LiveCounters:
+    """
+    Contadores do dia mantidos em memória por processo.
+
+    Cada processo grava periodicamente seu instantâneo em um arquivo próprio
+    no diretório compartilhado; snapshot() soma os arquivos de todos os
+    processos, sem consultar o banco.
+    """
+
+    def __init__(self, directory, publish_seconds=2, active_minutes=5):
+        self.directory = Path(directory)
+        self.publish_seconds = publish_seconds
+        self.active_seconds = active_minutes * 60
+        self._path = None
+        self._pid = None
+        self._date = None
+        self._visits = 0
+        self._calculations = dict.fromkeys(CALCULATION_TYPES, 0)
+        self._states = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+
+    def _start_publisher(self):
+        """
+        Inicia a thread de publicação e define o arquivo do processo atual.
+
+        Refeito quando o pid muda: após um fork (servidor com preload) a
+        thread não existe no filho e cada worker precisa do próprio arquivo
+        e de contadores zerados. O arquivo é removido em stop(), registrado
+        para o encerramento do processo.
+        """
+        if self._pid == os.getpid() or self._stopped:
+            return
+        self._pid = os.getpid()
+        self._path = self.directory / f'{self._pid}-{uuid.uuid4().hex[:8]}.json'
+        self._date = None
+        self._reset_if_new_day(timezone.localdate())
+        self._thread = threading.Thread(target=self._run, name='analytics-live', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _reset_if_new_day(self, today):
+        if self._date != today:
+            self._date = today
+            self._visits = 0
+            self._calculations = dict.fromkeys(CALCULATION_TYPES, 0)
+            self._states = {}
+
+    def record(self, access_log):
+        """
+        Conta um acesso (e o cálculo e o estado, se houver).
+        """
+        with self._lock:
+            self._start_publisher()
+            self._reset_if_new_day(timezone.localdate())
+            self._visits += 1
+            if access_log.calculation_type in self._calculations:
+                self._calculations[access_log.calculation_type] += 1
+            if access_log.state:
+                self._touch_state(access_log.state, 1)
+            self._dirty = True
+
+    def record_calculation(self, calculation_type):
+        """
+        Conta um cálculo identificado depois do registro do acesso.
+        """
+        with self._lock:
+            self._start_publisher()
+            self._reset_if_new_day(timezone.localdate())
+            if calculation_type in self._calculations:
+                self._calculations[calculation_type] += 1
+                self._dirty = True
+
+    def record_state(self, state, count=1):
+        """
+        Marca o estado como ativo (geolocalização resolvida em segundo plano).
+        """
+        if not state:
+            return
+        with self._lock:
+            self._start_publisher()
+            self._reset_if_new_day(timezone.localdate())
+            self._touch_state(state, count)
+            self._dirty = True
+
+    def _touch_state(self, state, count):
+        entry = self._states.setdefault(state, [0, 0])
+        entry[0] += count
+        entry[1] = time.time()
+
+    def publish(self):
+        """
+        Grava o instantâneo deste processo (substituição atômica do arquivo).
+        """
+        with self._lock:
+            if not self._dirty or self._pid != os.getpid() or self._stopped:
+                return
+            path = self._path
+            data = {
+                'date': self._date.isoformat(),
+                'visits': self._visits,
+                'calculations': dict(self._calculations),
+                'states': {state: list(entry) for state, entry in self._states.items()},
+            }
+            self._dirty = False
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(data), encoding='utf-8')
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Erro ao gravar contadores ao vivo: {str(e)}")
+
+    def stop(self):
+        """
+        Encerra a publicação e remove o arquivo deste processo, para que os
+        contadores de um processo encerrado não continuem somados.
+        """
+        with self._lock:
+            self._stopped = True
+            path = self._path if self._pid == os.getpid() else None
+        atexit.unregister(self.stop)
+        if path is not None:
+            path.unlink(missing_ok=True)
+            path.with_suffix('.tmp').unlink(missing_ok=True)
+
+    def _run(self):
+        while not self._stopped:
+            time.sleep(self.publish_seconds)
+            self.publish()
+
+    def snapshot(self):
+        """
+        Soma dos instantâneos de hoje de todos os processos.
+
+        Arquivos de dias anteriores são removidos.
+
+        Returns:
+            dict: visitas, cálculos por tipo e estados com acessos nos
+            últimos active_minutes (com as visitas do dia)
+        """
+        self.publish()
+        today = timezone.localdate().isoformat()
+        active_since = time.time() - self.active_seconds
+        visits = 0
+        calculations = dict.fromkeys(CALCULATION_TYPES, 0)
+        states = {}
+
+        for path in self.directory.glob('*.json'):
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue
+            if data.get('date') != today:
+                path.unlink(missing_ok=True)
+                continue
+            visits += data['visits']
+            for calculation_type, count in data['calculations'].items():
+                calculations[calculation_type] = calculations.get(calculation_type, 0) + count
+            for state, (count, last_seen) in data['states'].items():
+                entry = states.setdefault(state, {'state': state, 'visits': 0, 'last_seen': 0})
+                entry['visits'] += count
+                entry['last_seen'] = max(entry['last_seen'], last_seen)
+
+        active_states = sorted(
+            (s for s in states.values() if s['last_seen'] >= active_since),
+            key=lambda s: -s['visits'],
+        )
+        return {
+            'date': today,
+            'visits': visits,
+            'calculations': calculations,
+            'total_calculations': sum(calculations.values()),
+            'active_states': [{'state': s['state'], 'visits': s['visits']} for s in active_states],
+            'timestamp': timezone.now().isoformat(),
+        }
+
+
+live_counters = LiveCounters(
+    directory=settings.ANALYTICS_CONFIG.get('LIVE_COUNTERS_DIR', Path(tempfile.gettempdir()) / 'procalcmotor-live'),
+    publish_seconds=settings.ANALYTICS_CONFIG.get('LIVE_PUBLISH_SECONDS', 2),
+    active_minutes=settings.ANALYTICS_CONFIG.get('LIVE_ACTIVE_MINUTES', 5),
+)
@@ -0,0 +1,56 @@
+"""
+Comando para gerar o índice local de geolocalização por faixas de IP.
+
+Uso:
+    python manage.py rebuild_ip_database dbip-city-lite.csv
+    python manage.py rebuild_ip_database faixas.csv --saida data/ip_ranges.idx
+    python manage.py rebuild_ip_database ip2location-ipv6.csv --versao 6
+
+O CSV pode ter cabeçalho (ip_start/ip_end ou network, country_code, region,
+city, latitude, longitude...) ou seguir o formato do DB-IP "IP to City Lite".
+IPs em forma de inteiro são IPv4, salvo se a linha tiver a coluna ip_version
+ou se --versao 6 for informado (arquivos só com faixas IPv6).
+O índice é gravado em ANALYTICS_CONFIG['GEOLOCATION_DATABASE'] e recarregado
+automaticamente pelo middleware.
+"""
+
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from analytics.ip_database import build_index
+
+
+class Command(BaseCommand):
+    help = 'Gera o índice local de geolocalização a partir de um CSV de faixas de IP'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', type=str, help='CSV com as faixas de IP')
+        parser.add_argument(
+            '--saida',
+            type=str,
+            help='Arquivo de índice (padrão: ANALYTICS_CONFIG["GEOLOCATION_DATABASE"])'
+        )
+        parser.add_argument(
+            '--versao',
+            type=int,
+            choices=[4, 6],
+            help='Versão dos IPs em forma de inteiro sem coluna ip_version (padrão: 4)'
+        )
+
+    def handle(self, *args, **options):
+        saida = options['saida'] or settings.ANALYTICS_CONFIG.get('GEOLOCATION_DATABASE')
+        if not saida:
+            raise CommandError('Informe --saida ou configure ANALYTICS_CONFIG["GEOLOCATION_DATABASE"]')
+
+        inicio = time.monotonic()
+        try:
+            resumo = build_index(options['arquivo'], saida, version=options['versao'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Erro ao gerar o índice: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Índice gerado em {saida}: {resumo["ipv4"]} faixas IPv4, {resumo["ipv6"]} faixas IPv6, '
+            f'{resumo["locations"]} localizações ({time.monotonic() - inicio:.1f}s)'
+        ))
+        if resumo['skipped']:
+            self.stdout.write(self.style.WARNING(f'⚠ {resumo["skipped"]} faixas sobrepostas ignoradas'))
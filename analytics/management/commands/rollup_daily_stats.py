@@ -0,0 +1,34 @@
+"""
+Comando para consolidar os logs de acesso em DailyStatsSummary.
+
+Uso:
+    python manage.py rollup_daily_stats
+    python manage.py rollup_daily_stats --rebuild
+
+Sem opções, apenas os dias ainda não finalizados (normalmente o dia atual e,
+logo após a meia-noite, o anterior) são agregados. Pode ser agendado no cron
+ou executado periodicamente no próprio processo com
+ANALYTICS_CONFIG['ROLLUP_INTERVAL_MINUTES'].
+"""
+
+import time
+from django.core.management.base import BaseCommand
+from analytics.rollup import rollup_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'Consolida os logs de acesso nos resumos diários de estatísticas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Refaz os resumos de todos os dias, inclusive os já finalizados'
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        dias = rollup_daily_stats(rebuild=options['rebuild'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {dias} dia(s) consolidado(s) ({time.monotonic() - inicio:.1f}s)'
+        ))
@@ -1,15 +1,40 @@
 # analytics/middleware.py
-import json
-import requests
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
-from django.core.cache import cache
+from django.urls import NoReverseMatch, reverse
+from .buffer import access_log_buffer
+from .geo_cache import geo_cache
+from .geolocation import geo_fields, geolocation_queue, is_public_ip, lookup_geolocation
+from .heavy_hitters import tracker as heavy_hitters
+from .ip_database import lookup_ip_database
+from .live import live_counters
 from .models import AccessLog
-from user_agents import parse
+from .rollup import ensure_periodic_rollup
+from .user_agent import classify_user_agent
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Mapeia URLs (POST) para tipos de cálculo
+CALCULATION_PATHS = {
+    '/calculo/': 'potencia',
+    '/espiras/': 'espiras',
+    '/diagrama/': 'diagrama',
+}
+
+
+def classify_access(request, access_log):
+    """
+    Marca o log como cálculo se a requisição for um POST para uma URL de cálculo.
+    Retorna True se o log foi alterado.
+    """
+    calc_type = CALCULATION_PATHS.get(request.path) if request.method == 'POST' else None
+    if not calc_type:
+        return False
+    access_log.access_type = 'calculation'
+    access_log.calculation_type = calc_type
+    return True
+
 
 class GeoLocationMiddleware(MiddlewareMixin):
     """
@@ -26,70 +51,95 @@ class GeoLocationMiddleware(MiddlewareMixin):
         '/__debug__/',
     ]
     
+    # Sites de admin cujas URLs também são ignoradas (prefixos obtidos do URLconf)
+    ADMIN_SITES = ['admin', 'analytics_admin']
+    
     # IPs locais que devem ser ignorados ou tratados diferentemente
     LOCAL_IPS = ['127.0.0.1', 'localhost', '::1']
     
+    _ignore_paths = None
+    
     def process_request(self, request):
         """
         Processa cada requisição e registra informações de geolocalização
         """
+        # Consolidação periódica (opcional) só em processos que atendem requisições;
+        # uma falha aqui não impede o registro do acesso nem derruba a requisição
+        try:
+            ensure_periodic_rollup()
+        except Exception as e:
+            logger.error(f"Erro ao iniciar a consolidação periódica: {str(e)}")
+        
         try:
             # Ignora caminhos específicos
-            if any(request.path.startswith(path) for path in self.IGNORE_PATHS):
+            if request.path.startswith(self.get_ignore_paths()):
                 return None
             
             # Obtém o IP real do cliente
             ip_address = self.get_client_ip(request)
             
+            # Detecta informações do dispositivo
+            user_agent_string = request.META.get('HTTP_USER_AGENT', '')[:500]
+            user_agent = classify_user_agent(user_agent_string)
+            
+            # Bots não são registrados, a menos que configurado
+            if user_agent.is_bot and not settings.ANALYTICS_CONFIG.get('TRACK_BOTS', False):
+                return None
+            
             # Se for desenvolvimento local, usa IP de teste
             if ip_address in self.LOCAL_IPS and settings.DEBUG:
                 ip_address = '177.67.80.100'  # IP de teste (São Paulo)
             
-            # Verifica se já temos dados em cache para este IP
-            cache_key = f'geo_location_{ip_address}'
-            geo_data = cache.get(cache_key)
-            
-            if not geo_data:
-                # Busca dados de geolocalização
-                geo_data = self.get_geolocation(ip_address)
-                # Armazena em cache por 24 horas
-                cache.set(cache_key, geo_data, 86400)
-            
-            # Detecta informações do dispositivo
-            user_agent_string = request.META.get('HTTP_USER_AGENT', '')
-            user_agent = parse(user_agent_string)
-            is_mobile = user_agent.is_mobile
-            is_bot = user_agent.is_bot
+            # A base local de IPs responde na hora; sem ela, usa a geolocalização em
+            # cache e, se não houver, busca depois (em segundo plano, por padrão).
+            # IPs locais e privados não são consultados nas APIs externas
+            geo_data = lookup_ip_database(ip_address)
+            pending_lookup = False
+            if geo_data is None and is_public_ip(ip_address):
+                if settings.ANALYTICS_CONFIG.get('GEOLOCATION_ASYNC', True):
+                    geo_data = geo_cache.get(ip_address)
+                    pending_lookup = geo_data is None
+                else:
+                    geo_data = lookup_geolocation(ip_address)
             
             # Cria registro de acesso
             access_log = AccessLog(
                 ip_address=ip_address,
-                user_agent=user_agent_string[:500],
+                user_agent=user_agent_string,
                 path=request.path,
-                is_mobile=is_mobile,
-                is_bot=is_bot,
-                session_key=request.session.session_key if hasattr(request, 'session') else '',
+                is_mobile=user_agent.is_mobile,
+                is_bot=user_agent.is_bot,
+                session_key=(request.session.session_key or '') if hasattr(request, 'session') else '',
                 referer=request.META.get('HTTP_REFERER', '')[:500],
             )
             
             # Adiciona dados de geolocalização
             if geo_data:
-                access_log.country = geo_data.get('country_name', 'Brasil')
-                access_log.country_code = geo_data.get('country_code', 'BR')
-                access_log.state = self.normalize_state_name(geo_data.get('region', ''))
-                access_log.state_code = geo_data.get('region_code', '')
-                access_log.city = geo_data.get('city', '')
-                access_log.postal_code = geo_data.get('postal', '')
-                access_log.latitude = geo_data.get('latitude')
-                access_log.longitude = geo_data.get('longitude')
-                access_log.isp = geo_data.get('org', '')
+                for field, value in geo_fields(geo_data).items():
+                    setattr(access_log, field, value)
+                if not access_log.is_bot:
+                    heavy_hitters.record_location(access_log.state, access_log.city)
             
             # Adiciona usuário se estiver autenticado
             if request.user.is_authenticated:
                 access_log.user = request.user
             
-            # Salva no banco de dados de forma assíncrona se possível
-            access_log.save()
+            # Classifica o acesso antes de gravar, evitando um UPDATE posterior
+            classify_access(request, access_log)
+            
+            # Contadores ao vivo do dashboard
+            if not access_log.is_bot:
+                live_counters.record(access_log)
+            
+            if settings.ANALYTICS_CONFIG.get('BUFFER_WRITES', True):
+                # Gravado em lote; a geolocalização pendente é agendada após a gravação
+                access_log_buffer.add(access_log, pending_geolocation=pending_lookup)
+            else:
+                access_log.save()
+                
+                # Agenda o preenchimento da geolocalização em segundo plano
+                if pending_lookup:
+                    geolocation_queue.enqueue(ip_address, access_log.pk)
             
             # Adiciona o log ao request para uso posterior
             request.access_log = access_log
@@ -99,6 +149,21 @@ class GeoLocationMiddleware(MiddlewareMixin):
         
         return None
     
+    def get_ignore_paths(self):
+        """
+        IGNORE_PATHS mais os prefixos dos sites de admin (dashboard, widgets,
+        mapa e SSE não contam como visitas)
+        """
+        if self._ignore_paths is None:
+            paths = list(self.IGNORE_PATHS)
+            for site in self.ADMIN_SITES:
+                try:
+                    paths.append(reverse(f'{site}:index'))
+                except NoReverseMatch:
+                    pass
+            self._ignore_paths = tuple(paths)
+        return self._ignore_paths
+    
     def get_client_ip(self, request):
         """
         Obtém o IP real do cliente, considerando proxies
@@ -109,132 +174,6 @@ class GeoLocationMiddleware(MiddlewareMixin):
         else:
             ip = request.META.get('REMOTE_ADDR')
         return ip
-    
-    def get_geolocation(self, ip_address):
-        """
-        Busca dados de geolocalização usando a API ipapi.co (gratuita)
-        """
-        try:
-            # API gratuita com limite de 1000 requisições/dia
-            response = requests.get(
-                f'https://ipapi.co/{ip_address}/json/',
-                timeout=5,
-                headers={'User-Agent': 'MotorCalcPro/1.0'}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Se a API retornar erro, tenta API alternativa
-                if data.get('error'):
-                    return self.get_geolocation_fallback(ip_address)
-                
-                return data
-            else:
-                return self.get_geolocation_fallback(ip_address)
-                
-        except Exception as e:
-            logger.error(f"Erro ao buscar geolocalização para IP {ip_address}: {str(e)}")
-            return self.get_geolocation_fallback(ip_address)
-    
-    def get_geolocation_fallback(self, ip_address):
-        """
-        API de fallback para geolocalização (ip-api.com - também gratuita)
-        """
-        try:
-            response = requests.get(
-                f'http://ip-api.com/json/{ip_address}',
-                timeout=5,
-                params={
-                    'fields': 'status,country,countryCode,region,regionName,city,zip,lat,lon,isp,org'
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 'success':
-                    # Converte para formato compatível
-                    return {
-                        'country_name': data.get('country', 'Brasil'),
-                        'country_code': data.get('countryCode', 'BR'),
-                        'region': data.get('regionName', ''),
-                        'region_code': data.get('region', ''),
-                        'city': data.get('city', ''),
-                        'postal': data.get('zip', ''),
-                        'latitude': data.get('lat'),
-                        'longitude': data.get('lon'),
-                        'org': data.get('org', ''),
-                        'isp': data.get('isp', '')
-                    }
-        except Exception as e:
-            logger.error(f"Erro na API de fallback: {str(e)}")
-        
-        return {}
-    
-    def normalize_state_name(self, state_name):
-        """
-        Normaliza nomes de estados brasileiros
-        """
-        state_mapping = {
-            'sao paulo': 'São Paulo',
-            'sp': 'São Paulo',
-            'rio de janeiro': 'Rio de Janeiro',
-            'rj': 'Rio de Janeiro',
-            'minas gerais': 'Minas Gerais',
-            'mg': 'Minas Gerais',
-            'rio grande do sul': 'Rio Grande do Sul',
-            'rs': 'Rio Grande do Sul',
-            'parana': 'Paraná',
-            'pr': 'Paraná',
-            'santa catarina': 'Santa Catarina',
-            'sc': 'Santa Catarina',
-            'bahia': 'Bahia',
-            'ba': 'Bahia',
-            'pernambuco': 'Pernambuco',
-            'pe': 'Pernambuco',
-            'ceara': 'Ceará',
-            'ce': 'Ceará',
-            'goias': 'Goiás',
-            'go': 'Goiás',
-            'distrito federal': 'Distrito Federal',
-            'df': 'Distrito Federal',
-            'espirito santo': 'Espírito Santo',
-            'es': 'Espírito Santo',
-            'maranhao': 'Maranhão',
-            'ma': 'Maranhão',
-            'mato grosso': 'Mato Grosso',
-            'mt': 'Mato Grosso',
-            'mato grosso do sul': 'Mato Grosso do Sul',
-            'ms': 'Mato Grosso do Sul',
-            'para': 'Pará',
-            'pa': 'Pará',
-            'paraiba': 'Paraíba',
-            'pb': 'Paraíba',
-            'piaui': 'Piauí',
-            'pi': 'Piauí',
-            'rio grande do norte': 'Rio Grande do Norte',
-            'rn': 'Rio Grande do Norte',
-            'sergipe': 'Sergipe',
-            'se': 'Sergipe',
-            'alagoas': 'Alagoas',
-            'al': 'Alagoas',
-            'tocantins': 'Tocantins',
-            'to': 'Tocantins',
-            'rondonia': 'Rondônia',
-            'ro': 'Rondônia',
-            'acre': 'Acre',
-            'ac': 'Acre',
-            'amazonas': 'Amazonas',
-            'am': 'Amazonas',
-            'roraima': 'Roraima',
-            'rr': 'Roraima',
-            'amapa': 'Amapá',
-            'ap': 'Amapá',
-        }
-        
-        # Normaliza a string
-        normalized = state_name.lower().strip()
-        return state_mapping.get(normalized, state_name)
 
 
 class CalculationTrackingMiddleware(MiddlewareMixin):
@@ -246,20 +185,18 @@ class CalculationTrackingMiddleware(MiddlewareMixin):
         """
         Intercepta views específicas de cálculo para registrar
         """
-        if request.method == 'POST':
-            # Mapeia URLs para tipos de cálculo
-            calculation_mapping = {
-                '/calculo/': 'potencia',
-                '/espiras/': 'espiras',
-                '/diagrama/': 'diagrama',
-            }
-            
-            calc_type = calculation_mapping.get(request.path)
-            
-            if calc_type and hasattr(request, 'access_log'):
-                # Atualiza o log existente
-                request.access_log.access_type = 'calculation'
-                request.access_log.calculation_type = calc_type
-                request.access_log.save(update_fields=['access_type', 'calculation_type'])
+        access_log = getattr(request, 'access_log', None)
         
-        return None
\ No newline at end of file
+        # Normalmente o log já foi classificado pelo GeoLocationMiddleware
+        if access_log is not None and not access_log.calculation_type:
+            if classify_access(request, access_log):
+                if not access_log.is_bot:
+                    live_counters.record_calculation(access_log.calculation_type)
+                if access_log.pk is not None:
+                    access_log.save(update_fields=['access_type', 'calculation_type'])
+        
+        # Caminhos e configurações de motor mais acessados
+        if access_log is not None and not access_log.is_bot:
+            heavy_hitters.record_request(request)
+        
+        return None
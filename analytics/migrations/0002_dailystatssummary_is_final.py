@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailystatssummary',
+            name='is_final',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_dailystatssummary_is_final'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailystatssummary',
+            name='state_sketches',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='dailystatssummary',
+            name='visitor_sketch',
+            field=models.BinaryField(blank=True, default=b''),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_dailystatssummary_sketches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailystatssummary',
+            name='heavy_hitters',
+            field=models.JSONField(default=dict),
+        ),
+    ]
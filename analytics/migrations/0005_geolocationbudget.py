@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-19 07:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_dailystatssummary_heavy_hitters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeolocationBudget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(max_length=20)),
+                ('date', models.DateField()),
+                ('used', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Cota de Geolocalização',
+                'verbose_name_plural': 'Cotas de Geolocalização',
+                'constraints': [models.UniqueConstraint(fields=('provider', 'date'), name='unique_geolocation_budget_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 07:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_geolocationbudget'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='accesslog',
+            name='date',
+            field=models.DateField(db_index=True, default=django.utils.timezone.localdate),
+        ),
+    ]
@@ -10,7 +10,7 @@ class AccessLog(models.Model):
     """
     # Informações temporais
     timestamp = models.DateTimeField(default=timezone.now, db_index=True)
-    date = models.DateField(auto_now_add=True, db_index=True)
+    date = models.DateField(default=timezone.localdate, db_index=True)
     
     # Informações da requisição
     ip_address = models.GenericIPAddressField()
@@ -115,6 +115,18 @@ class DailyStatsSummary(models.Model):
     mobile_visits = models.IntegerField(default=0)
     desktop_visits = models.IntegerField(default=0)
     
+    # Sketches HyperLogLog dos IPs do dia e por estado (base64), para contar
+    # visitantes únicos de períodos quaisquer
+    visitor_sketch = models.BinaryField(default=b'', blank=True)
+    state_sketches = models.JSONField(default=dict)
+    
+    # Itens mais frequentes do dia (Space-Saving) por dimensão: estados,
+    # cidades, caminhos e configurações de motor
+    heavy_hitters = models.JSONField(default=dict)
+    
+    # Dias anteriores ao atual são consolidados uma única vez
+    is_final = models.BooleanField(default=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -127,6 +139,26 @@ class DailyStatsSummary(models.Model):
         return f"Estatísticas de {self.date.strftime('%d/%m/%Y')}"
 
 
+class GeolocationBudget(models.Model):
+    """
+    Requisições feitas a cada provedor de geolocalização no dia (cota diária
+    compartilhada entre processos, incrementada com UPDATE atômico)
+    """
+    provider = models.CharField(max_length=20)
+    date = models.DateField()
+    used = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Cota de Geolocalização'
+        verbose_name_plural = 'Cotas de Geolocalização'
+        constraints = [
+            models.UniqueConstraint(fields=['provider', 'date'], name='unique_geolocation_budget_day'),
+        ]
+    
+    def __str__(self):
+        return f"{self.provider} em {self.date.strftime('%d/%m/%Y')}: {self.used}"
+
+
 class GeographicRegion(models.Model):
     """
     Modelo para armazenar informações sobre regiões geográficas do Brasil
@@ -0,0 +1,305 @@
+# analytics/rollup.py
+# Consolidação incremental dos logs de acesso em DailyStatsSummary
+import base64
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .hll import HyperLogLog, merge_sketches, precision_for_error
+from .models import AccessLog, DailyStatsSummary
+
+logger = logging.getLogger(__name__)
+
+# Intervalo mínimo (s) entre atualizações do dia atual disparadas pelos relatórios
+REFRESH_SECONDS = 30
+
+# Quantidade de estados e cidades guardados em top_states/top_cities
+TOP_STATES = 5
+TOP_CITIES = 10
+
+COUNT_FIELDS = [
+    'total_visits', 'unique_visitors', 'total_calculations',
+    'potencia_calculations', 'espiras_calculations', 'diagrama_calculations',
+    'mobile_visits', 'desktop_visits',
+]
+
+SUMMARY_FIELDS = [
+    'total_visits', 'unique_visitors', 'total_calculations',
+    'potencia_calculations', 'espiras_calculations', 'diagrama_calculations',
+    'mobile_visits', 'desktop_visits',
+    'geographic_data', 'top_states', 'top_cities', 'visitor_sketch', 'state_sketches',
+    'is_final', 'updated_at',
+]
+
+
+def _float(value):
+    return float(value) if value is not None else None
+
+
+def aggregate_days(start_date, end_date):
+    """
+    Agrega os logs (sem bots) de start_date a end_date, inclusive.
+
+    Os totais de todos os dias saem de uma única consulta agrupada por data, a
+    distribuição geográfica de outra, agrupada por data/estado/cidade, e os
+    visitantes únicos (com os sketches HyperLogLog) de uma terceira.
+
+    Returns:
+        dict: {data: {campo: valor}} com os campos de DailyStatsSummary
+    """
+    logs = AccessLog.objects.filter(date__gte=start_date, date__lte=end_date, is_bot=False)
+    calculation = Q(access_type='calculation')
+
+    days = {}
+    totals = logs.values('date').annotate(
+        total_visits=Count('id'),
+        total_calculations=Count('id', filter=calculation),
+        potencia_calculations=Count('id', filter=Q(calculation_type='potencia')),
+        espiras_calculations=Count('id', filter=Q(calculation_type='espiras')),
+        diagrama_calculations=Count('id', filter=Q(calculation_type='diagrama')),
+        mobile_visits=Count('id', filter=Q(is_mobile=True)),
+        desktop_visits=Count('id', filter=Q(is_mobile=False)),
+    )
+    for row in totals:
+        date = row.pop('date')
+        days[date] = dict(row, geographic_data={'states': [], 'cities': []})
+
+    states = defaultdict(dict)
+    locations = logs.values('date', 'country_code', 'state', 'state_code', 'city').annotate(
+        visits=Count('id'),
+        calculations=Count('id', filter=calculation),
+        latitude=Max('latitude'),
+        longitude=Max('longitude'),
+    )
+    for row in locations:
+        geographic_data = days[row['date']]['geographic_data']
+        if row['state']:
+            key = (row['country_code'], row['state'])
+            state = states[row['date']].get(key)
+            if state is None:
+                state = states[row['date']][key] = {
+                    'state': row['state'], 'state_code': row['state_code'],
+                    'country_code': row['country_code'], 'visits': 0, 'calculations': 0,
+                }
+                geographic_data['states'].append(state)
+            state['visits'] += row['visits']
+            state['calculations'] += row['calculations']
+        if row['city']:
+            geographic_data['cities'].append({
+                'city': row['city'], 'state': row['state'], 'country_code': row['country_code'],
+                'latitude': _float(row['latitude']), 'longitude': _float(row['longitude']),
+                'visits': row['visits'], 'calculations': row['calculations'],
+            })
+
+    # Visitantes únicos exatos do dia e sketches para combinar períodos
+    precision = precision_for_error(settings.ANALYTICS_CONFIG.get('UNIQUE_VISITORS_ERROR', 0.02))
+    ips = defaultdict(set)
+    day_sketches = defaultdict(lambda: HyperLogLog(precision))
+    state_sketches = defaultdict(lambda: defaultdict(lambda: HyperLogLog(precision)))
+    for date, state, ip_address in logs.values_list('date', 'state', 'ip_address').distinct():
+        ips[date].add(ip_address)
+        day_sketches[date].add(ip_address)
+        if state:
+            state_sketches[date][state].add(ip_address)
+
+    for date, day in days.items():
+        day['unique_visitors'] = len(ips[date])
+        day['visitor_sketch'] = day_sketches[date].to_bytes()
+        day['state_sketches'] = {
+            state: base64.b64encode(sketch.to_bytes()).decode('ascii')
+            for state, sketch in state_sketches[date].items()
+        }
+
+    for day in days.values():
+        geographic_data = day['geographic_data']
+        day['top_states'] = [
+            {'state': s['state'], 'count': s['visits']}
+            for s in sorted(geographic_data['states'], key=lambda s: -s['visits'])[:TOP_STATES]
+        ]
+        day['top_cities'] = [
+            {'city': c['city'], 'state': c['state'], 'count': c['visits']}
+            for c in sorted(geographic_data['cities'], key=lambda c: -c['visits'])[:TOP_CITIES]
+        ]
+    return days
+
+
+def _pending_start(today):
+    """
+    Primeiro dia que ainda precisa ser consolidado: o dia não finalizado mais
+    antigo, o dia seguinte ao último finalizado ou, sem resumos, o primeiro log.
+    """
+    oldest_open = DailyStatsSummary.objects.filter(
+        is_final=False
+    ).order_by('date').values_list('date', flat=True).first()
+    if oldest_open is not None:
+        return oldest_open
+    last_final = DailyStatsSummary.objects.filter(is_final=True).aggregate(last=Max('date'))['last']
+    if last_final is not None:
+        return last_final + timedelta(days=1)
+    first_log = AccessLog.objects.order_by('date').values_list('date', flat=True).first()
+    return first_log or today
+
+
+def rollup_daily_stats(rebuild=False):
+    """
+    Atualiza DailyStatsSummary a partir dos logs de acesso.
+
+    Dias anteriores a hoje são consolidados uma única vez e marcados como
+    finalizados; nas execuções seguintes só os dias ainda abertos (normalmente
+    apenas hoje) são reagregados. Com rebuild=True todos os dias são refeitos.
+
+    Returns:
+        int: Número de dias atualizados
+    """
+    today = timezone.localdate()
+    if rebuild:
+        first_log = AccessLog.objects.order_by('date').values_list('date', flat=True).first()
+        start = first_log or today
+    else:
+        start = _pending_start(today)
+    if start > today:
+        start = today
+
+    days = aggregate_days(start, today)
+
+    # Dias do intervalo sem acessos também são registrados (zerados)
+    summaries = []
+    day = start
+    while day <= today:
+        values = days.get(day, {})
+        summary = DailyStatsSummary(date=day, is_final=day < today, **values)
+        summaries.append(summary)
+        day += timedelta(days=1)
+
+    DailyStatsSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['date'],
+        update_fields=SUMMARY_FIELDS,
+    )
+    return len(summaries)
+
+
+def start_periodic_rollup(interval_minutes):
+    """
+    Executa rollup_daily_stats a cada interval_minutes em uma thread do processo.
+    """
+    def run():
+        while True:
+            time.sleep(interval_minutes * 60)
+            try:
+                close_old_connections()
+                rollup_daily_stats()
+            except Exception as e:
+                logger.error(f"Erro ao consolidar estatísticas diárias: {str(e)}")
+            finally:
+                close_old_connections()
+
+    thread = threading.Thread(target=run, name='analytics-rollup', daemon=True)
+    thread.start()
+    return thread
+
+
+_periodic_rollup_pid = None
+_periodic_rollup_lock = threading.Lock()
+
+
+def ensure_periodic_rollup():
+    """
+    Inicia a consolidação periódica se ROLLUP_INTERVAL_MINUTES estiver definido.
+
+    Chamada pelo middleware a cada requisição, para que a thread só exista em
+    processos que atendem requisições (e não em migrate, shell, etc.); o pid
+    é conferido para que workers criados por fork iniciem a sua.
+    """
+    global _periodic_rollup_pid
+    if _periodic_rollup_pid == os.getpid():
+        return
+    with _periodic_rollup_lock:
+        if _periodic_rollup_pid == os.getpid():
+            return
+        _periodic_rollup_pid = os.getpid()
+        interval = settings.ANALYTICS_CONFIG.get('ROLLUP_INTERVAL_MINUTES')
+        if interval:
+            start_periodic_rollup(interval)
+
+
+def summaries_between(start_date, end_date):
+    """
+    Resumos diários do período, com o dia atual atualizado antes da leitura
+    (no máximo uma vez a cada REFRESH_SECONDS, mesmo com vários relatórios
+    sendo carregados ao mesmo tempo).
+    """
+    if end_date >= timezone.localdate() and cache.add('analytics_rollup_refresh', True, REFRESH_SECONDS):
+        rollup_daily_stats()
+    return DailyStatsSummary.objects.filter(date__gte=start_date, date__lte=end_date).order_by('date')
+
+
+def combine_summaries(summaries):
+    """
+    Soma os resumos diários de um período.
+
+    Os visitantes únicos do período (total e por estado) são estimados pela
+    união dos sketches HyperLogLog de cada dia; resumos sem sketch entram com
+    a soma dos visitantes únicos diários.
+
+    Returns:
+        dict: {'totals': {campo: soma}, 'states': [...], 'cities': [...]}
+    """
+    summaries = list(summaries)
+    totals = dict.fromkeys(COUNT_FIELDS, 0)
+    states = {}
+    cities = {}
+    day_sketches = []
+    state_sketches = defaultdict(list)
+    unsketched_visitors = 0
+
+    for summary in summaries:
+        for field in COUNT_FIELDS:
+            totals[field] += getattr(summary, field)
+
+        if summary.visitor_sketch:
+            day_sketches.append(HyperLogLog.from_bytes(summary.visitor_sketch))
+        else:
+            unsketched_visitors += summary.unique_visitors
+        for state, sketch in summary.state_sketches.items():
+            state_sketches[state].append(HyperLogLog.from_bytes(base64.b64decode(sketch)))
+
+        for state in summary.geographic_data.get('states', []):
+            key = (state['country_code'], state['state'])
+            entry = states.setdefault(key, dict(state, visits=0, calculations=0))
+            entry['visits'] += state['visits']
+            entry['calculations'] += state['calculations']
+
+        for city in summary.geographic_data.get('cities', []):
+            key = (city['country_code'], city['state'], city['city'])
+            entry = cities.setdefault(key, dict(city, visits=0, calculations=0))
+            entry['visits'] += city['visits']
+            entry['calculations'] += city['calculations']
+            if city['latitude'] is not None:
+                entry['latitude'], entry['longitude'] = city['latitude'], city['longitude']
+
+    # Um único dia já tem a contagem exata
+    if len(summaries) > 1 and day_sketches:
+        totals['unique_visitors'] = merge_sketches(day_sketches).count() + unsketched_visitors
+    for (country_code, state), entry in states.items():
+        if state in state_sketches:
+            entry['unique_visitors'] = merge_sketches(state_sketches[state]).count()
+
+    return {'totals': totals, 'states': list(states.values()), 'cities': list(cities.values())}
+
+
+def unique_visitors_between(start_date, end_date):
+    """
+    Estimativa dos visitantes únicos do período a partir dos sketches diários.
+    """
+    return combine_summaries(summaries_between(start_date, end_date))['totals']['unique_visitors']
@@ -0,0 +1,186 @@
+# analytics/spatial.py
+# Agrupamento espacial (grade por nível de zoom) das cidades para o mapa de calor
+import math
+
+from django.core.cache import cache
+
+from .rollup import combine_summaries, summaries_between
+
+# Níveis de zoom pré-calculados (zoom do Leaflet); acima do máximo as cidades vêm individualmente
+MIN_ZOOM = 2
+MAX_ZOOM = 12
+
+# Células da grade por tile do mapa em cada direção
+CELLS_PER_TILE = 4
+
+# Limite de agrupamentos por resposta; acima dele a grade usada é a de um zoom menor
+MAX_CLUSTERS = 1500
+
+# Tempo de cache (s) da grade calculada para um período
+GRID_CACHE_SECONDS = 300
+
+
+def cell_size(zoom):
+    """
+    Tamanho (graus) da célula da grade no zoom, com CELLS_PER_TILE células por tile.
+    """
+    return 360.0 / (2 ** zoom * CELLS_PER_TILE)
+
+
+def build_grid(cities):
+    """
+    Agrupa as cidades em células para cada nível de zoom.
+
+    Cada agrupamento tem o centróide ponderado pelas visitas, os totais de
+    visitas e cálculos, o número de cidades e o nome da cidade com mais visitas.
+
+    Returns:
+        dict: {zoom: [agrupamento, ...]} de MIN_ZOOM a MAX_ZOOM + 1 (cidades individuais)
+    """
+    located = [c for c in cities if c['latitude'] is not None and c['longitude'] is not None]
+    leaves = [
+        {
+            'latitude': round(city['latitude'], 5),
+            'longitude': round(city['longitude'], 5),
+            'total_visits': city['visits'],
+            'calculations': city['calculations'],
+            'cities': 1,
+            'label': f"{city['city']}/{city['state']}",
+        }
+        for city in located
+    ]
+    grid = {zoom: merge_clusters(leaves, cell_size(zoom)) for zoom in range(MIN_ZOOM, MAX_ZOOM + 1)}
+    grid[MAX_ZOOM + 1] = leaves
+    return grid
+
+
+def period_grid(period, start_date, end_date, country_code='BR'):
+    """
+    Estados e grade de agrupamentos do período, calculados a partir dos
+    resumos diários e mantidos em cache.
+
+    Returns:
+        dict: {'states': [...], 'grid': {zoom: [...]}, 'total_cities', 'total_visits'}
+    """
+    cache_key = f'analytics_map_grid_{period}_{country_code}'
+    data = cache.get(cache_key)
+    if data is not None:
+        return data
+
+    combined = combine_summaries(summaries_between(start_date.date(), end_date.date()))
+    cities = [c for c in combined['cities'] if c['country_code'] == country_code]
+    data = {
+        'states': [
+            {
+                'state': state['state'],
+                'state_code': state['state_code'],
+                'total_visits': state['visits'],
+                'calculations': state['calculations'],
+            }
+            for state in combined['states'] if state['country_code'] == country_code
+        ],
+        'grid': build_grid(cities),
+        'total_cities': len(cities),
+        'total_visits': sum(city['visits'] for city in cities),
+    }
+    cache.set(cache_key, data, GRID_CACHE_SECONDS)
+    return data
+
+
+def _wrap_longitude(longitude):
+    return (longitude + 180.0) % 360.0 - 180.0
+
+
+def parse_bbox(value):
+    """
+    Converte 'oeste,sul,leste,norte' em tupla de floats; None se ausente ou inválido.
+
+    O Leaflet envia longitudes fora de ±180 depois de arrastar o mapa além do
+    antimeridiano; elas são trazidas para -180..180 (uma caixa com 360° ou
+    mais de largura cobre todas as longitudes).
+    """
+    try:
+        west, south, east, north = (float(v) for v in value.split(','))
+    except (AttributeError, ValueError):
+        return None
+    if not all(math.isfinite(v) for v in (west, south, east, north)):
+        return None
+    south, north = max(south, -90.0), min(north, 90.0)
+    if east - west >= 360.0:
+        return -180.0, south, 180.0, north
+    return _wrap_longitude(west), south, _wrap_longitude(east), north
+
+
+def _in_bbox(cluster, bbox):
+    west, south, east, north = bbox
+    if not south <= cluster['latitude'] <= north:
+        return False
+    if west <= east:
+        return west <= cluster['longitude'] <= east
+    # Caixa atravessando o antimeridiano
+    return cluster['longitude'] >= west or cluster['longitude'] <= east
+
+
+def merge_clusters(clusters, size):
+    """
+    Agrupa agrupamentos em células de size graus (centróide ponderado pelas
+    visitas, rótulo do agrupamento com mais visitas).
+    """
+    cells = {}
+    for cluster in clusters:
+        key = (math.floor(cluster['longitude'] / size), math.floor(cluster['latitude'] / size))
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = {
+                'lat_sum': 0.0, 'lng_sum': 0.0, 'weight': 0,
+                'total_visits': 0, 'calculations': 0, 'cities': 0, 'top': None,
+            }
+        weight = max(cluster['total_visits'], 1)
+        cell['lat_sum'] += cluster['latitude'] * weight
+        cell['lng_sum'] += cluster['longitude'] * weight
+        cell['weight'] += weight
+        cell['total_visits'] += cluster['total_visits']
+        cell['calculations'] += cluster['calculations']
+        cell['cities'] += cluster['cities']
+        if cell['top'] is None or cluster['total_visits'] > cell['top']['total_visits']:
+            cell['top'] = cluster
+    return [
+        {
+            'latitude': round(cell['lat_sum'] / cell['weight'], 5),
+            'longitude': round(cell['lng_sum'] / cell['weight'], 5),
+            'total_visits': cell['total_visits'],
+            'calculations': cell['calculations'],
+            'cities': cell['cities'],
+            'label': cell['top']['label'],
+        }
+        for cell in cells.values()
+    ]
+
+
+def clusters_for_view(grid, zoom, bbox=None):
+    """
+    Agrupamentos do zoom dentro da caixa visível.
+
+    Se houver mais de MAX_CLUSTERS, usa a grade do zoom anterior até caber; no
+    zoom mínimo, as células continuam sendo agrupadas (dobrando de tamanho)
+    em vez de descartar agrupamentos.
+
+    Returns:
+        tuple: (zoom efetivamente usado, lista de agrupamentos)
+    """
+    zoom = min(max(zoom, MIN_ZOOM), MAX_ZOOM + 1)
+    while True:
+        clusters = grid[zoom]
+        if bbox is not None:
+            clusters = [c for c in clusters if _in_bbox(c, bbox)]
+        if len(clusters) <= MAX_CLUSTERS:
+            return zoom, clusters
+        if zoom == MIN_ZOOM:
+            break
+        zoom -= 1
+
+    size = cell_size(MIN_ZOOM)
+    while len(clusters) > MAX_CLUSTERS:
+        size *= 2
+        clusters = merge_clusters(clusters, size)
+    return zoom, clusters
@@ -0,0 +1,59 @@
+# analytics/test_runner.py
+# Executor de testes que isola o rastreamento de acessos do banco real
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from .buffer import access_log_buffer
+from .geo_client import geolocation_client
+from .heavy_hitters import tracker as heavy_hitters
+from .live import live_counters
+
+
+class AnalyticsTestRunner(DiscoverRunner):
+    """
+    Executor padrão com o rastreamento de acessos ajustado para testes.
+
+    As requisições do cliente de testes gravam os logs na hora (sem buffer),
+    as APIs externas de geolocalização não são chamadas, os contadores ao
+    vivo vão para um diretório temporário e o que ficar pendente nos
+    componentes em segundo plano é gravado no banco de testes antes de ele
+    ser destruído, nunca no banco real.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._analytics_settings = override_settings(ANALYTICS_CONFIG={
+            **settings.ANALYTICS_CONFIG,
+            'BUFFER_WRITES': False,
+        })
+        self._analytics_settings.enable()
+        # Nenhuma consulta às APIs externas de geolocalização (nem à cota diária real)
+        self._geolocation_stub = mock.patch.object(geolocation_client, 'lookup', return_value={})
+        self._geolocation_stub.start()
+        # Contadores ao vivo em um diretório próprio da execução
+        self._live_directory = tempfile.TemporaryDirectory()
+        self._live_stub = mock.patch.object(live_counters, 'directory', Path(self._live_directory.name))
+        self._live_stub.start()
+        # Sem gravação periódica durante os testes (a thread disputaria o lock do
+        # SQLite com as transações dos testes); os contadores ficam em memória
+        # até teardown_databases, e os anteriores à execução são descartados
+        heavy_hitters.reset()
+        heavy_hitters.stop()
+
+    def teardown_databases(self, old_config, **kwargs):
+        access_log_buffer.stop()
+        heavy_hitters.stop()
+        super().teardown_databases(old_config, **kwargs)
+
+    def teardown_test_environment(self, **kwargs):
+        live_counters.stop()
+        self._live_stub.stop()
+        self._live_directory.cleanup()
+        self._geolocation_stub.stop()
+        self._analytics_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,656 @@
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .buffer import AccessLogBuffer
+from .dashboard import calc_types_widget, daily_widget, devices_widget, period_range, totals_widget
+from .geo_cache import GeoCache, subnet_key
+from .geo_client import GeoLocationClient
+from .geolocation import GeoLocationQueue, is_public_ip
+from .heavy_hitters import HeavyHitterTracker, SpaceSaving, configuration_label
+from .hll import HyperLogLog, merge_sketches, precision_for_error
+from .ip_database import IPDatabase, build_index
+from .live import LiveCounters
+from .middleware import GeoLocationMiddleware
+from . import rollup
+from .models import AccessLog, DailyStatsSummary, GeolocationBudget
+from .spatial import MIN_ZOOM, build_grid, clusters_for_view, parse_bbox
+from . import user_agent as user_agent_module
+from .user_agent import classify_user_agent
+
+
+class IgnorePathsTests(TestCase):
+    def test_admin_sites_are_ignored(self):
+        paths = GeoLocationMiddleware(lambda request: None).get_ignore_paths()
+        self.assertIn('/admin/', paths)
+        self.assertIn('/analytics-admin/', paths)
+
+    def test_analytics_admin_requests_are_not_logged(self):
+        self.client.get('/analytics-admin/analytics/api/widget/totals/')
+        self.assertFalse(AccessLog.objects.exists())
+
+
+class PeriodRangeTests(TestCase):
+    def test_uses_local_dates(self):
+        # 01h UTC de 11/03 ainda é 22h de 10/03 em São Paulo
+        now = datetime(2026, 3, 11, 1, 0, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            period, start_date, end_date = period_range('7days')
+        self.assertEqual(period, '7days')
+        self.assertEqual(end_date.date(), date(2026, 3, 10))
+        self.assertEqual(start_date.date(), date(2026, 3, 3))
+
+    def test_unknown_period_falls_back_to_default(self):
+        self.assertEqual(period_range('10anos')[0], '7days')
+
+
+class SpaceSavingTests(TestCase):
+    def test_frequent_items_survive_eviction(self):
+        summary = SpaceSaving(capacity=5)
+        for i in range(200):
+            summary.offer('a')
+            summary.offer(f'raro-{i}')
+        item, count, error = summary.top(1)[0]
+        self.assertEqual(item, 'a')
+        self.assertGreaterEqual(count, 200)
+        self.assertLessEqual(count - error, 200)
+
+    def test_merge_adds_counts_and_keeps_capacity(self):
+        a = SpaceSaving(3, [['x', 10, 0], ['y', 5, 0], ['z', 1, 0]])
+        b = SpaceSaving(3, [['x', 4, 1], ['w', 7, 0]])
+        a.merge(b)
+        self.assertEqual(a.top(3), [('x', 14, 1), ('w', 7, 0), ('y', 5, 0)])
+        self.assertEqual(len(a.counters), 3)
+
+    def test_list_round_trip(self):
+        summary = SpaceSaving(10, [['x', 3, 1], ['y', 2, 0]])
+        self.assertEqual(SpaceSaving(10, summary.to_list()).top(10), summary.top(10))
+
+
+class HeavyHitterTrackerTests(TestCase):
+    def test_configuration_label_validates_values(self):
+        self.assertEqual(configuration_label(['36', '4', 'dupla', 'g=P', '8']), '36/4 dupla g=P y=8')
+        self.assertIsNone(configuration_label(['36', '4', 'dupla', 'g=P', '8; drop']))
+        self.assertIsNone(configuration_label(['36', '4', 'tripla', 'g=P', '8']))
+        self.assertIsNone(configuration_label(['0', '4', 'dupla', 'g=P', '8']))
+        self.assertIsNone(configuration_label(['36', None, 'dupla', 'g=P', '8']))
+
+    def test_flush_merges_into_daily_summary(self):
+        tracker = HeavyHitterTracker(capacity=10)
+        tracker._thread = object()  # sem thread de gravação periódica
+        tracker.record('paths', '/calculo/', 3)
+        tracker.flush()
+        tracker.record('paths', '/calculo/', 2)
+        tracker.flush()
+        summary = DailyStatsSummary.objects.get()
+        self.assertEqual(summary.heavy_hitters['paths'], [['/calculo/', 5, 0]])
+
+    def test_failed_flush_keeps_counters(self):
+        tracker = HeavyHitterTracker(capacity=10)
+        tracker._thread = object()
+        tracker.record('paths', '/calculo/', 3)
+        with mock.patch.object(HeavyHitterTracker, '_save', side_effect=Exception('database is locked')):
+            with self.assertLogs('analytics.heavy_hitters', 'ERROR'):
+                tracker.flush()
+        self.assertFalse(DailyStatsSummary.objects.exists())
+        tracker.record('paths', '/calculo/', 1)
+        tracker.flush()
+        self.assertEqual(DailyStatsSummary.objects.get().heavy_hitters['paths'], [['/calculo/', 4, 0]])
+
+
+    def test_stop_flushes_and_ends_periodic_writes(self):
+        tracker = HeavyHitterTracker(capacity=10)
+        tracker.stop()
+        tracker.record('paths', '/descartado/')
+        self.assertIsNone(tracker._thread)
+        tracker.reset()
+        tracker.stop()
+        self.assertFalse(DailyStatsSummary.objects.exists())
+
+        tracker.record('paths', '/calculo/', 2)
+        tracker.stop()
+        self.assertEqual(DailyStatsSummary.objects.get().heavy_hitters['paths'], [['/calculo/', 2, 0]])
+
+
+class LiveCountersTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_snapshot_sums_processes(self):
+        counters = LiveCounters(self.directory.name, publish_seconds=3600)
+        counters.record(AccessLog(calculation_type='potencia', state='Bahia'))
+        counters.publish()
+
+        # Worker criado por fork: outro pid, arquivo e contadores próprios
+        with mock.patch('analytics.live.os.getpid', return_value=-1):
+            counters.record(AccessLog(state='Bahia'))
+            counters.record(AccessLog(calculation_type='espiras'))
+            counters.publish()
+            snapshot = counters.snapshot()
+
+        self.assertEqual(len(list(counters.directory.glob('*.json'))), 2)
+        self.assertEqual(snapshot['visits'], 3)
+        self.assertEqual(snapshot['calculations'], {'potencia': 1, 'espiras': 1, 'diagrama': 0})
+        self.assertEqual(snapshot['active_states'], [{'state': 'Bahia', 'visits': 2}])
+
+
+    def test_stop_removes_the_process_file(self):
+        counters = LiveCounters(self.directory.name, publish_seconds=3600)
+        counters.record(AccessLog(state='Bahia'))
+        counters.publish()
+        self.assertEqual(len(list(counters.directory.glob('*.json'))), 1)
+        counters.stop()
+        self.assertEqual(list(counters.directory.glob('*.json')), [])
+        self.assertEqual(counters.snapshot()['visits'], 0)
+
+
+class StubGeolocationHandler(BaseHTTPRequestHandler):
+    status = 200
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append(self.path)
+        body = json.dumps({'region': 'Bahia', 'city': 'Salvador', 'country_code': 'BR'}).encode()
+        self.send_response(self.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GeoLocationClientTests(TestCase):
+    def setUp(self):
+        StubGeolocationHandler.status = 200
+        StubGeolocationHandler.requests = []
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubGeolocationHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+        self.client_kwargs = {
+            'primary_url': base + '/primary/{ip}/',
+            'fallback_url': base + '/fallback/{ip}',
+            'timeout': 2,
+        }
+
+    def test_daily_budget_limits_requests(self):
+        client = GeoLocationClient(daily_budget=2, **self.client_kwargs)
+        for _ in range(4):
+            client._get_json('primary', '200.1.2.3')
+        self.assertEqual(len(StubGeolocationHandler.requests), 2)
+        self.assertEqual(GeolocationBudget.objects.get(provider='primary').used, 2)
+
+    def test_breaker_opens_after_failures(self):
+        StubGeolocationHandler.status = 500
+        client = GeoLocationClient(daily_budget=0, failure_threshold=3, cooldown=60, **self.client_kwargs)
+        for _ in range(5):
+            self.assertEqual(client.lookup('200.1.2.3'), {})
+        # 3 falhas em cada provedor abrem os dois circuitos
+        self.assertEqual(len(StubGeolocationHandler.requests), 6)
+        self.assertTrue(client.breakers['primary'].is_open)
+        self.assertTrue(client.breakers['fallback'].is_open)
+
+    def test_lookup_returns_primary_data(self):
+        client = GeoLocationClient(daily_budget=10, **self.client_kwargs)
+        self.assertEqual(client.lookup('200.1.2.3')['city'], 'Salvador')
+        self.assertEqual(StubGeolocationHandler.requests, ['/primary/200.1.2.3/'])
+
+
+class SpatialTests(TestCase):
+    def city(self, name, latitude, longitude, visits):
+        return {
+            'city': name, 'state': 'SP', 'latitude': latitude, 'longitude': longitude,
+            'visits': visits, 'calculations': 1,
+        }
+
+    def test_parse_bbox_wraps_longitudes(self):
+        self.assertEqual(parse_bbox('-410,-30,-400,-20'), (-50.0, -30.0, -40.0, -20.0))
+        self.assertEqual(parse_bbox('-200,-100,300,100'), (-180.0, -90.0, 180.0, 90.0))
+        self.assertIsNone(parse_bbox('a,b,c,d'))
+        self.assertIsNone(parse_bbox('nan,0,1,1'))
+
+    def test_wrapped_bbox_keeps_clusters(self):
+        grid = build_grid([self.city('São Paulo', -23.55, -46.63, 10)])
+        zoom, clusters = clusters_for_view(grid, MIN_ZOOM, parse_bbox('-410,-30,-400,-20'))
+        self.assertEqual(len(clusters), 1)
+
+    def test_min_zoom_aggregates_instead_of_truncating(self):
+        cities = [self.city(f'C{i}', -30 + i * 0.5, -60 + i * 0.5, i + 1) for i in range(40)]
+        grid = build_grid(cities)
+        with mock.patch('analytics.spatial.MAX_CLUSTERS', 3):
+            zoom, clusters = clusters_for_view(grid, MIN_ZOOM)
+        self.assertEqual(zoom, MIN_ZOOM)
+        self.assertLessEqual(len(clusters), 3)
+        self.assertEqual(sum(c['total_visits'] for c in clusters), sum(c['visits'] for c in cities))
+        self.assertEqual(sum(c['cities'] for c in clusters), 40)
+
+
+class RollupTests(TestCase):
+    def log(self, day, ip, state='', calculation_type=''):
+        log = AccessLog.objects.create(
+            ip_address=ip, path='/', state=state, city='Salvador' if state else '',
+            access_type='calculation' if calculation_type else 'page_view',
+            calculation_type=calculation_type,
+        )
+        AccessLog.objects.filter(pk=log.pk).update(date=day)
+
+    def test_rollup_finalizes_past_days(self):
+        today = timezone.localdate()
+        yesterday = today - timedelta(days=1)
+        self.log(yesterday, '200.1.1.1', 'Bahia', 'potencia')
+        self.log(yesterday, '200.1.1.1', 'Bahia')
+        self.log(today, '200.1.1.2')
+
+        self.assertEqual(rollup.rollup_daily_stats(), 2)
+        past = DailyStatsSummary.objects.get(date=yesterday)
+        self.assertTrue(past.is_final)
+        self.assertEqual((past.total_visits, past.unique_visitors, past.potencia_calculations), (2, 1, 1))
+        self.assertEqual(past.geographic_data['states'][0]['visits'], 2)
+        self.assertFalse(DailyStatsSummary.objects.get(date=today).is_final)
+
+        # Só o dia atual é reagregado nas execuções seguintes
+        self.assertEqual(rollup.rollup_daily_stats(), 1)
+
+    def test_rollup_preserves_heavy_hitters(self):
+        today = timezone.localdate()
+        DailyStatsSummary.objects.create(date=today, heavy_hitters={'paths': [['/', 3, 0]]})
+        self.log(today, '200.1.1.1')
+        rollup.rollup_daily_stats()
+        summary = DailyStatsSummary.objects.get(date=today)
+        self.assertEqual(summary.total_visits, 1)
+        self.assertEqual(summary.heavy_hitters, {'paths': [['/', 3, 0]]})
+
+    def test_combine_summaries_estimates_period_uniques(self):
+        today = timezone.localdate()
+        for offset in range(3):
+            for ip in ('200.1.1.1', '200.1.1.2', f'200.1.2.{offset}'):
+                self.log(today - timedelta(days=offset), ip, 'Bahia')
+        rollup.rollup_daily_stats()
+        combined = rollup.combine_summaries(DailyStatsSummary.objects.all())
+        self.assertEqual(combined['totals']['total_visits'], 9)
+        self.assertEqual(combined['totals']['unique_visitors'], 5)
+        self.assertEqual(combined['states'][0]['unique_visitors'], 5)
+
+
+class PeriodicRollupTests(TestCase):
+    def setUp(self):
+        rollup._periodic_rollup_pid = None
+        self.addCleanup(setattr, rollup, '_periodic_rollup_pid', None)
+
+    @override_settings(ANALYTICS_CONFIG={**settings.ANALYTICS_CONFIG, 'ROLLUP_INTERVAL_MINUTES': 10})
+    def test_started_once_on_first_request(self):
+        with mock.patch.object(rollup, 'start_periodic_rollup') as start:
+            self.client.get('/analytics-admin/')
+            self.client.get('/analytics-admin/')
+        start.assert_called_once_with(10)
+
+    @override_settings(ANALYTICS_CONFIG={**settings.ANALYTICS_CONFIG, 'ROLLUP_INTERVAL_MINUTES': 0})
+    def test_disabled_by_default(self):
+        with mock.patch.object(rollup, 'start_periodic_rollup') as start:
+            self.client.get('/analytics-admin/')
+        start.assert_not_called()
+
+    def test_failure_does_not_break_the_request(self):
+        with mock.patch('analytics.middleware.ensure_periodic_rollup', side_effect=RuntimeError('sem thread')):
+            with self.assertLogs('analytics.middleware', 'ERROR') as logs:
+                response = self.client.get('/', HTTP_USER_AGENT=UserAgentTests.DESKTOP)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('sem thread', logs.output[0])
+        self.assertTrue(AccessLog.objects.exists())
+
+
+class IPDatabaseTests(TestCase):
+    def build(self, content, version=None):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        source = f'{directory.name}/faixas.csv'
+        with open(source, 'w', encoding='utf-8') as file:
+            file.write(content)
+        summary = build_index(source, f'{directory.name}/faixas.idx', version=version)
+        return summary, IPDatabase(f'{directory.name}/faixas.idx')
+
+    def test_text_and_integer_ranges(self):
+        summary, database = self.build(
+            'ip_start,ip_end,ip_version,country_code,region,city\n'
+            '200.1.0.0,200.1.255.255,,BR,Bahia,Salvador\n'
+            '3372220416,3372285951,4,BR,São Paulo,Campinas\n'
+            # ::1.2.3.0/120 em forma de inteiro: menor que 2**32, mas IPv6
+            '16909056,16909311,6,BR,Paraná,Curitiba\n'
+            '2804:100::,2804:1ff:ffff:ffff:ffff:ffff:ffff:ffff,,BR,Ceará,Fortaleza\n'
+        )
+        self.assertEqual((summary['ipv4'], summary['ipv6']), (2, 2))
+        self.assertEqual(database.lookup('200.1.2.3')['city'], 'Salvador')
+        self.assertEqual(database.lookup('201.0.20.3')['city'], 'Campinas')
+        self.assertEqual(database.lookup('::102:304')['city'], 'Curitiba')
+        self.assertEqual(database.lookup('1.2.3.4'), {})
+        self.assertEqual(database.lookup('2804:1a0::1')['city'], 'Fortaleza')
+        self.assertEqual(database.lookup('10.0.0.1'), {})
+
+    def test_version_option_for_integer_files(self):
+        summary, database = self.build(
+            'ip_start,ip_end,country_code,region,city\n'
+            '16909056,16909311,BR,Paraná,Curitiba\n'
+            # ::ffff:200.1.0.0/112 (IPv4 mapeado) é guardado como IPv4
+            '281474037252096,281474037317631,BR,Bahia,Salvador\n',
+            version=6,
+        )
+        self.assertEqual((summary['ipv4'], summary['ipv6']), (1, 1))
+        self.assertEqual(database.lookup('::102:304')['city'], 'Curitiba')
+        self.assertEqual(database.lookup('200.1.2.3')['city'], 'Salvador')
+        self.assertEqual(database.lookup('::ffff:200.1.2.3')['city'], 'Salvador')
+
+    def test_overlapping_ranges_are_skipped(self):
+        summary, database = self.build(
+            'network,country_code,city\n'
+            '200.1.0.0/16,BR,Salvador\n'
+            '200.1.128.0/17,BR,Feira de Santana\n'
+        )
+        self.assertEqual(summary['skipped'], 1)
+        self.assertEqual(database.lookup('200.1.200.1')['city'], 'Salvador')
+
+
+class GeoLocationQueueTests(TransactionTestCase):
+    # As threads de trabalho usam a própria conexão: os logs precisam estar gravados
+    def setUp(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.lookups = []
+        patcher = mock.patch('analytics.geolocation.lookup_geolocation', side_effect=self.lookup)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for name in ('heavy_hitters', 'live_counters'):
+            patcher = mock.patch(f'analytics.geolocation.{name}')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def lookup(self, ip_address, record_stats=True):
+        self.lookups.append(ip_address)
+        self.started.set()
+        self.release.wait(5)
+        return {'region': 'Bahia', 'city': 'Salvador'}
+
+    def test_local_and_private_addresses_are_not_enqueued(self):
+        for ip in ('127.0.0.1', '::1', '10.0.0.5', '192.168.1.1', '::ffff:192.168.1.1', 'invalido'):
+            self.assertFalse(is_public_ip(ip), ip)
+        self.assertTrue(is_public_ip('200.1.2.3'))
+
+        geo_queue = GeoLocationQueue(maxsize=10, workers=1)
+        self.assertFalse(geo_queue.enqueue('127.0.0.1', 1))
+        self.assertIsNone(geo_queue._queue)
+
+    @mock.patch('analytics.middleware.lookup_ip_database', return_value=None)
+    def test_middleware_only_enqueues_public_addresses(self, lookup_ip_database):
+        with mock.patch('analytics.middleware.geolocation_queue') as geo_queue:
+            self.client.get('/')
+            geo_queue.enqueue.assert_not_called()
+            self.client.get('/', REMOTE_ADDR='200.1.2.3')
+        geo_queue.enqueue.assert_called_once_with('200.1.2.3', AccessLog.objects.get(ip_address='200.1.2.3').pk)
+
+    def test_same_subnet_shares_one_lookup(self):
+        geo_queue = GeoLocationQueue(maxsize=1, workers=1)
+        logs = [
+            AccessLog.objects.create(ip_address=ip, path='/')
+            for ip in ('200.1.2.3', '200.1.2.4', '201.1.2.3', '202.1.2.3')
+        ]
+
+        self.assertTrue(geo_queue.enqueue('200.1.2.3', logs[0].pk))
+        self.assertTrue(self.started.wait(5))
+        # A consulta está em andamento: o log da mesma sub-rede aproveita o resultado
+        self.assertTrue(geo_queue.enqueue('200.1.2.4', logs[1].pk))
+        self.assertTrue(geo_queue.enqueue('201.1.2.3', logs[2].pk))
+        # Fila cheia: o log fica sem localização em vez de bloquear
+        self.assertFalse(geo_queue.enqueue('202.1.2.3', logs[3].pk))
+
+        self.release.set()
+        geo_queue._queue.join()
+        self.assertEqual(self.lookups, ['200.1.2.3', '201.1.2.3'])
+        self.assertEqual(
+            list(AccessLog.objects.order_by('pk').values_list('city', flat=True)),
+            ['Salvador', 'Salvador', 'Salvador', '']
+        )
+
+
+class AccessLogBufferTests(TransactionTestCase):
+    # Sem transação do teste: a falha do bulk_create não pode invalidar as gravações seguintes
+    def setUp(self):
+        patcher = mock.patch('analytics.buffer.geolocation_queue')
+        self.geolocation_queue = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def buffer(self, max_size):
+        buffer = AccessLogBuffer(max_size=max_size, flush_seconds=3600)
+        self.addCleanup(buffer.stop)
+        return buffer
+
+    def test_writes_when_full_and_schedules_geolocation(self):
+        buffer = self.buffer(max_size=3)
+        buffer.add(AccessLog(ip_address='200.1.2.3', path='/a'), pending_geolocation=True)
+        buffer.add(AccessLog(ip_address='200.1.2.4', path='/b'))
+        self.assertEqual(AccessLog.objects.count(), 0)
+
+        buffer.add(AccessLog(ip_address='200.1.2.5', path='/c'))
+        self.assertEqual(AccessLog.objects.count(), 3)
+        log = AccessLog.objects.get(path='/a')
+        self.geolocation_queue.enqueue.assert_called_once_with('200.1.2.3', log.pk)
+        self.assertEqual(buffer.flush(), 0)
+
+    def test_invalid_record_does_not_drop_the_batch(self):
+        buffer = self.buffer(max_size=100)
+        buffer.add(AccessLog(ip_address='200.1.2.3', path='/a'), pending_geolocation=True)
+        buffer.add(AccessLog(ip_address=None, path='/invalido'), pending_geolocation=True)
+        buffer.add(AccessLog(ip_address='200.1.2.5', path='/c'))
+
+        with self.assertLogs('analytics.buffer', 'ERROR'):
+            self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(sorted(AccessLog.objects.values_list('path', flat=True)), ['/a', '/c'])
+        self.assertEqual(self.geolocation_queue.enqueue.call_count, 1)
+
+    def test_date_is_taken_when_the_request_is_logged(self):
+        buffer = self.buffer(max_size=100)
+        before_midnight = timezone.make_aware(datetime(2026, 3, 10, 23, 59, 59))
+        buffer.add(AccessLog(ip_address='200.1.2.3', path='/', timestamp=before_midnight))
+        with mock.patch('django.utils.timezone.now', return_value=before_midnight + timedelta(seconds=5)):
+            self.assertEqual(buffer.stop(), 1)
+        self.assertEqual(AccessLog.objects.get().date, date(2026, 3, 10))
+
+    def test_stop_writes_pending_logs_and_later_adds_immediately(self):
+        buffer = self.buffer(max_size=100)
+        buffer.add(AccessLog(ip_address='200.1.2.3', path='/a'))
+        self.assertEqual(buffer.stop(), 1)
+        buffer.add(AccessLog(ip_address='200.1.2.4', path='/b'))
+        self.assertEqual(AccessLog.objects.count(), 2)
+
+
+class UserAgentTests(TestCase):
+    IPHONE = (
+        'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 '
+        '(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1'
+    )
+    DESKTOP = (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    )
+
+    def test_prefilter_catches_bots_without_parser(self):
+        with mock.patch('analytics.user_agent.parse') as parse:
+            for user_agent in ('Googlebot/2.1 (+http://www.google.com/bot.html)', 'curl/8.5.0', 'python-requests/2.31'):
+                self.assertTrue(classify_user_agent(user_agent).is_bot, user_agent)
+            parse.assert_not_called()
+
+    def test_ambiguous_tokens_are_left_to_the_parser(self):
+        classify_user_agent.cache_clear()
+        for token in ('Preview', 'Monitor', 'HeadlessMode', 'Java/17'):
+            user_agent = f'{self.DESKTOP} {token}'
+            with mock.patch('analytics.user_agent.parse', wraps=user_agent_module.parse) as parse:
+                info = classify_user_agent(user_agent)
+            parse.assert_called_once_with(user_agent)
+            self.assertFalse(info.is_bot, token)
+
+    def test_browsers_are_parsed_and_memoized(self):
+        classify_user_agent.cache_clear()
+        iphone = classify_user_agent(self.IPHONE)
+        self.assertEqual((iphone.is_mobile, iphone.is_bot), (True, False))
+        desktop = classify_user_agent(self.DESKTOP)
+        self.assertEqual((desktop.is_mobile, desktop.is_bot, desktop.family), (False, False, 'Chrome'))
+
+        with mock.patch('analytics.user_agent.parse') as parse:
+            self.assertEqual(classify_user_agent(self.IPHONE), iphone)
+            parse.assert_not_called()
+
+    def test_bots_are_not_logged(self):
+        self.client.get('/', HTTP_USER_AGENT='Googlebot/2.1')
+        self.assertFalse(AccessLog.objects.exists())
+        self.client.get('/', HTTP_USER_AGENT=self.DESKTOP)
+        self.assertEqual(AccessLog.objects.get().user_agent, self.DESKTOP)
+
+
+class GeoCacheTests(TestCase):
+    def test_subnet_keys(self):
+        self.assertEqual(subnet_key('200.1.2.3'), subnet_key('200.1.2.250'))
+        self.assertNotEqual(subnet_key('200.1.2.3'), subnet_key('200.1.3.3'))
+        self.assertEqual(subnet_key('::ffff:200.1.2.3'), subnet_key('200.1.2.9'))
+        self.assertEqual(subnet_key('2804:14c:1:2::1'), subnet_key('2804:14c:1:ffff::1'))
+        self.assertNotEqual(subnet_key('2804:14c:1::1'), subnet_key('2804:14c:2::1'))
+
+    def test_negative_results_are_cached(self):
+        geo = GeoCache()
+        self.assertIsNone(geo.get('200.1.2.3'))
+        geo.set('200.1.2.3', None)
+        self.assertEqual(geo.get('200.1.2.4'), {})
+        stats = geo.stats()
+        self.assertEqual((stats['misses'], stats['negative_hits']), (1, 1))
+
+    def test_persistent_hits_are_promoted_to_local(self):
+        GeoCache().set('200.1.2.3', {'city': 'Salvador'})
+        geo = GeoCache()
+        self.assertEqual(geo.get('200.1.2.3'), {'city': 'Salvador'})
+        self.assertEqual(geo.get('200.1.2.3'), {'city': 'Salvador'})
+        stats = geo.stats()
+        self.assertEqual((stats['persistent_hits'], stats['local_hits'], stats['local_size']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 100.0)
+
+    def test_local_layer_is_bounded(self):
+        geo = GeoCache(max_size=2)
+        for ip in ('200.1.1.1', '200.1.2.1', '200.1.3.1'):
+            geo.set(ip, {'city': ip})
+        self.assertEqual(geo.stats()['local_size'], 2)
+        # A sub-rede descartada da memória ainda está no cache persistente
+        self.assertEqual(geo.get('200.1.1.1'), {'city': '200.1.1.1'})
+        self.assertEqual(geo.stats()['persistent_hits'], 1)
+
+
+class DashboardCountsTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        rows = [
+            (0, '200.1.1.1', 'potencia', True, False),
+            (0, '200.1.1.1', '', False, False),
+            (0, '200.1.1.2', 'espiras', False, False),
+            (0, '200.1.1.3', '', False, True),
+            (1, '200.1.1.1', 'diagrama', True, False),
+            (1, '200.1.1.4', 'diagrama', False, False),
+        ]
+        for offset, ip, calculation_type, is_mobile, is_bot in rows:
+            log = AccessLog.objects.create(
+                ip_address=ip, path='/', calculation_type=calculation_type, is_mobile=is_mobile, is_bot=is_bot,
+                access_type='calculation' if calculation_type else 'page_view',
+            )
+            AccessLog.objects.filter(pk=log.pk).update(date=self.today - timedelta(days=offset))
+
+    def test_single_query_matches_separate_counts(self):
+        days = rollup.aggregate_days(self.today - timedelta(days=1), self.today)
+        for date, day in days.items():
+            logs = AccessLog.objects.filter(date=date, is_bot=False)
+            self.assertEqual(day['total_visits'], logs.count())
+            self.assertEqual(day['total_calculations'], logs.filter(access_type='calculation').count())
+            for calculation_type in ('potencia', 'espiras', 'diagrama'):
+                self.assertEqual(
+                    day[f'{calculation_type}_calculations'], logs.filter(calculation_type=calculation_type).count()
+                )
+            self.assertEqual(day['mobile_visits'], logs.filter(is_mobile=True).count())
+            self.assertEqual(day['desktop_visits'], logs.filter(is_mobile=False).count())
+            self.assertEqual(day['unique_visitors'], logs.values('ip_address').distinct().count())
+
+    def test_count_widgets_read_one_grouped_query(self):
+        _, start_date, end_date = period_range('7days')
+        # A primeira leitura atualiza o dia atual (no máximo a cada REFRESH_SECONDS)
+        daily_widget(start_date, end_date)
+        with CaptureQueriesContext(connection) as queries:
+            daily = daily_widget(start_date, end_date)
+            calculations = calc_types_widget(start_date, end_date)
+            devices = devices_widget(start_date, end_date)
+
+        summary_queries = [q['sql'] for q in queries if 'analytics_dailystatssummary' in q['sql']]
+        self.assertEqual(len(summary_queries), 3)
+        self.assertFalse(any('visitor_sketch' in sql or 'geographic_data' in sql for sql in summary_queries))
+        self.assertEqual([day['visits'] for day in daily['daily_visits'][-2:]], [2, 3])
+        self.assertEqual(calculations['calculations_by_type'], {'potencia': 1, 'espiras': 1, 'diagrama': 2})
+        self.assertEqual((devices['mobile_visits'], devices['desktop_visits']), (2, 3))
+
+    def test_totals_estimate_period_uniques(self):
+        rollup.rollup_daily_stats()
+        totals = totals_widget(*period_range('7days')[1:])
+        # 200.1.1.1 nos dois dias; o bot não conta
+        self.assertEqual((totals['total_visits'], totals['unique_visitors'], totals['total_calculations']), (5, 3, 4))
+
+    def test_changelist_shows_today_from_summary(self):
+        rollup.rollup_daily_stats()
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'senha')
+        self.client.force_login(user)
+        response = self.client.get('/admin/analytics/accesslog/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.context['today_visits'], response.context['today_calculations'],
+             response.context['today_unique_ips']),
+            (3, 2, 2)
+        )
+
+
+class HyperLogLogTests(TestCase):
+    def sketch(self, values, precision=12):
+        sketch = HyperLogLog(precision)
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    def test_estimate_within_expected_error(self):
+        self.assertEqual(precision_for_error(0.02), 12)
+        # 3 erros padrão (1,04/√4096 ≈ 1,6%)
+        sketch = self.sketch(f'10.0.{i // 256}.{i % 256}' for i in range(20000))
+        self.assertAlmostEqual(sketch.count(), 20000, delta=1000)
+        self.assertEqual(self.sketch(['200.1.1.1', '200.1.1.2', '200.1.1.1']).count(), 2)
+
+    def test_merge_equals_sketch_of_union(self):
+        first = [f'ip-{i}' for i in range(3000)]
+        second = [f'ip-{i}' for i in range(2000, 6000)]
+        merged = merge_sketches([self.sketch(first), self.sketch(second)])
+        self.assertEqual(merged.registers, self.sketch(first + second).registers)
+
+    def test_reduced_equals_sketch_built_at_lower_precision(self):
+        values = [f'ip-{i}' for i in range(5000)]
+        self.assertEqual(self.sketch(values, 12).reduced(8).registers, self.sketch(values, 8).registers)
+        merged = self.sketch(values[:2500], 12).merge(self.sketch(values[2500:], 10))
+        self.assertEqual(merged.precision, 10)
+        self.assertEqual(merged.registers, self.sketch(values, 10).registers)
+        with self.assertRaises(ValueError):
+            self.sketch(values, 8).reduced(12)
+
+    def test_bytes_round_trip(self):
+        sketch = self.sketch(f'ip-{i}' for i in range(1000))
+        restored = HyperLogLog.from_bytes(sketch.to_bytes())
+        self.assertEqual((restored.precision, restored.registers), (sketch.precision, sketch.registers))
+        self.assertLess(len(sketch.to_bytes()), len(sketch.registers))
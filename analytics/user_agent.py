@@ -0,0 +1,40 @@
+# analytics/user_agent.py
+# Classificação do User-Agent com cache, evitando o parser completo a cada requisição
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from user_agents import parse
+
+# Quantidade de User-Agents distintos mantidos em cache
+UA_CACHE_SIZE = 2048
+
+# Trechos que identificam robôs/ferramentas sem precisar do parser completo.
+# Só entram termos exclusivos de robôs; trechos ambíguos (preview, monitor,
+# headless, java/...) também aparecem em navegadores e ficam com o parser
+BOT_PREFILTER = re.compile(
+    r'bot\b|bot/|crawl|spider|slurp|scrapy|curl/|wget/|python-requests|python-urllib|aiohttp|'
+    r'go-http-client|okhttp|apache-httpclient|chrome-lighthouse|facebookexternalhit|pingdom',
+    re.IGNORECASE
+)
+
+UserAgentInfo = namedtuple('UserAgentInfo', ['is_mobile', 'is_bot', 'family'])
+
+
+@lru_cache(maxsize=UA_CACHE_SIZE)
+def classify_user_agent(user_agent_string):
+    """
+    Classifica o User-Agent em (is_mobile, is_bot, family).
+
+    Robôs óbvios são identificados pelo pré-filtro; os demais passam pelo
+    parser do user_agents. O resultado é memorizado por string de User-Agent.
+    """
+    if BOT_PREFILTER.search(user_agent_string):
+        return UserAgentInfo(is_mobile=False, is_bot=True, family='Bot')
+
+    user_agent = parse(user_agent_string)
+    return UserAgentInfo(
+        is_mobile=user_agent.is_mobile,
+        is_bot=user_agent.is_bot,
+        family=user_agent.browser.family,
+    )
@@ -25,7 +25,10 @@ def track_calculation(request, calculation_type, details=None):
         # Atualiza o log existente
         request.access_log.access_type = 'calculation'
         request.access_log.calculation_type = calculation_type
-        request.access_log.save(update_fields=['access_type', 'calculation_type'])
+        
+        # Logs ainda no buffer são gravados já com o tipo atualizado
+        if request.access_log.pk is not None:
+            request.access_log.save(update_fields=['access_type', 'calculation_type'])
         
         # Se quiser salvar detalhes adicionais, pode criar um modelo separado
         # ou usar um campo JSON no AccessLog
@@ -4,6 +4,7 @@
 Django settings for setup project - COM ANALYTICS GEOGRÁFICO
 """
 
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -119,9 +120,15 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache em disco dos diagramas de bobinagem (SVG)
+DIAGRAMA_CACHE_DIR = MEDIA_ROOT / 'diagramas'
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Executor de testes (os logs de acesso dos testes não chegam ao banco real)
+TEST_RUNNER = 'analytics.test_runner.AnalyticsTestRunner'
+
 # Content Security Policy (CSP)
 CSP_SCRIPT_SRC = (
     "'self'",
@@ -190,5 +197,32 @@ ANALYTICS_CONFIG = {
     'ENABLE_TRACKING': True,  # Habilita/desabilita rastreamento
     'TRACK_BOTS': False,  # Se deve rastrear bots/crawlers
     'GEOLOCATION_CACHE_HOURS': 24,  # Tempo de cache para dados de geolocalização
+    'GEOLOCATION_NEGATIVE_CACHE_MINUTES': 30,  # Tempo de cache para consultas que falharam
+    'GEOLOCATION_LOCAL_CACHE_SIZE': 4096,  # Sub-redes mantidas no cache em memória de cada processo
     'MAX_REQUESTS_PER_DAY': 1000,  # Limite de requisições para API de geolocalização
+    'GEOLOCATION_PRIMARY_URL': 'https://ipapi.co/{ip}/json/',  # API principal de geolocalização
+    'GEOLOCATION_FALLBACK_URL': 'http://ip-api.com/json/{ip}',  # API alternativa
+    'GEOLOCATION_TIMEOUT': 0.8,  # Timeout (s) de cada requisição às APIs
+    'GEOLOCATION_BREAKER_FAILURES': 5,  # Falhas seguidas que interrompem as chamadas a uma API
+    'GEOLOCATION_BREAKER_COOLDOWN': 300,  # Tempo (s) sem chamar a API após interromper
+    'GEOLOCATION_ASYNC': True,  # Busca a geolocalização em segundo plano, fora da requisição
+    'GEOLOCATION_QUEUE_SIZE': 1000,  # Tamanho máximo da fila de geolocalização pendente
+    'GEOLOCATION_WORKERS': 2,  # Threads que processam a fila de geolocalização
+    # Índice local de faixas de IP (gerado com rebuild_ip_database); se existir, substitui as APIs externas
+    'GEOLOCATION_DATABASE': BASE_DIR / 'data' / 'ip_ranges.idx',
+    'BUFFER_WRITES': True,  # Grava os logs de acesso em lote (bulk_create)
+    'BUFFER_SIZE': 50,  # Logs acumulados antes de gravar
+    'BUFFER_FLUSH_SECONDS': 5,  # Intervalo máximo entre gravações
+    'UNIQUE_VISITORS_ERROR': 0.02,  # Erro relativo aceito na contagem de visitantes únicos de períodos (HyperLogLog)
+    'HEAVY_HITTERS_CAPACITY': 100,  # Itens acompanhados por dimensão nos contadores de mais acessados
+    'HEAVY_HITTERS_FLUSH_SECONDS': 60,  # Intervalo de gravação dos contadores nos resumos diários
+    # Diretório (temporário, fora do código) onde cada processo publica seus contadores ao vivo
+    'LIVE_COUNTERS_DIR': Path(tempfile.gettempdir()) / 'procalcmotor-live',
+    'LIVE_PUBLISH_SECONDS': 2,  # Intervalo de publicação dos contadores de cada processo
+    'LIVE_ACTIVE_MINUTES': 5,  # Estados com acessos nesse intervalo aparecem como ativos
+    'LIVE_STREAM_SECONDS': 5,  # Intervalo entre os eventos enviados ao dashboard (SSE)
+    # Duração máxima (s) de uma conexão SSE; o navegador reconecta em seguida. Em servidores WSGI
+    # síncronos cada conexão ocupa um worker durante esse tempo
+    'LIVE_STREAM_DURATION': 30,
+    'ROLLUP_INTERVAL_MINUTES': 0,  # Consolida os resumos diários no próprio processo (0 = desativado, use o comando)
 }
\ No newline at end of file
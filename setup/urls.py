@@ -16,9 +16,11 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from analytics.admin import analytics_admin_site
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('analytics-admin/', analytics_admin_site.urls),
     path('',include('home.urls')),
     path('',include('ThreePhaseCoils.urls')),
     path('',include('ThreePhasePower.urls')),